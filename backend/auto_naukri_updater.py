@@ -13,7 +13,9 @@ import json
 import threading
 import schedule
 from datetime import datetime, timedelta
-from db import init_db, add_career_skills, get_career_skills, get_career_count
+from db import init_db, add_career_skills_bulk, get_career_skills, get_career_count
+from skill_aliases import canonicalize_skills
+from skill_embeddings import refresh_skill_index_safely
 import subprocess
 import os
 
@@ -335,7 +337,7 @@ class AutoNaukriUpdater:
             if self.is_valid_skill_term(skill):
                 cleaned.append(skill)
         
-        return list(set(cleaned))  # Remove duplicates
+        return canonicalize_skills(cleaned)  # Map variants to one name and remove duplicates
     
     def is_valid_skill_term(self, term):
         """Dynamically validate if a term is a valid skill without hardcoded lists"""
@@ -410,20 +412,22 @@ class AutoNaukriUpdater:
         # Add new jobs to database
         if all_new_jobs:
             print(f"\n💾 Adding {len(all_new_jobs)} new careers to database...")
-            added_count = 0
+            stats = {"careers_created": 0, "links_created": 0}
             
-            for job in all_new_jobs:
-                try:
-                    if add_career_skills(job['title'], job['skills']):
-                        added_count += 1
-                        print(f"  ✅ Added: {job['title']} ({len(job['skills'])} skills)")
-                except Exception as e:
-                    print(f"  ❌ Failed to add {job['title']}: {e}")
+            try:
+                stats = add_career_skills_bulk((job['title'], job['skills']) for job in all_new_jobs)
+            except Exception as e:
+                print(f"  ❌ Failed to add new careers: {e}")
+            added_count = stats["careers_created"]
             
             final_career_count = get_career_count()
             print(f"\n📈 Database updated successfully!")
             print(f"   • New careers added: {added_count}")
+            print(f"   • New career-skill links: {stats['links_created']}")
             print(f"   • Total careers: {final_career_count}")
+
+            if stats["links_created"]:
+                refresh_skill_index_safely()
             
             # Retrain ML model if significant new data added
             if added_count >= self.min_new_careers_for_retrain:
@@ -0,0 +1,111 @@
+"""
+Type-ahead completions for skills and career titles.
+
+Names are held in memory as a sorted array of keys, one key per word start
+("machine learning" is reachable from "mach" and from "learn"), so a prefix is
+a pair of binary searches. Matches are ranked by popularity: for skills, the
+number of careers that list them; for careers, the number of skills mapped to
+them. The very short prefixes that match large ranges have their top
+completions precomputed. Indexes are rebuilt when the taxonomy version moves.
+"""
+import heapq
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from career_skills_db import get_read_connection
+from skill_aliases import normalize_skill
+
+AUTOCOMPLETE_TYPES = ("skill", "career")
+MAX_LIMIT = 50
+# Prefixes up to this length get their top MAX_LIMIT completions precomputed
+PRECOMPUTED_PREFIX_LEN = 2
+
+
+class PrefixIndex:
+    def __init__(self, popularity):
+        """`popularity` maps display name -> popularity count."""
+        self.names = list(popularity)
+        self.popularity = [popularity[name] for name in self.names]
+
+        rows = []
+        for entry_id, name in enumerate(self.names):
+            key = normalize_skill(name)
+            start = 0
+            for word in key.split(" "):
+                rows.append((key[start:], entry_id))
+                start += len(word) + 1
+        rows.sort()
+        self.keys = [key for key, _ in rows]
+        self.ids = [entry_id for _, entry_id in rows]
+
+        short = defaultdict(set)
+        for key, entry_id in rows:
+            for length in range(1, PRECOMPUTED_PREFIX_LEN + 1):
+                if len(key) >= length:
+                    short[key[:length]].add(entry_id)
+        self.top_by_prefix = {prefix: self._top(ids, MAX_LIMIT) for prefix, ids in short.items()}
+        self.top_overall = self._top(range(len(self.names)), MAX_LIMIT)
+
+    def _rank(self, entry_id):
+        name = self.names[entry_id]
+        return (-self.popularity[entry_id], len(name), name)
+
+    def _top(self, ids, limit):
+        return heapq.nsmallest(limit, ids, key=self._rank)
+
+    def complete(self, query, limit=10):
+        """Up to `limit` (name, popularity) pairs whose name has a word starting with `query`."""
+        limit = min(limit, MAX_LIMIT)
+        query = normalize_skill(query)
+        if not query:
+            top = self.top_overall[:limit]
+        elif query in self.top_by_prefix or len(query) <= PRECOMPUTED_PREFIX_LEN:
+            top = self.top_by_prefix.get(query, [])[:limit]
+        else:
+            lo = bisect_left(self.keys, query)
+            hi = bisect_left(self.keys, query + "\U0010ffff", lo)
+            top = self._top(set(self.ids[lo:hi]), limit)
+        return [(self.names[i], self.popularity[i]) for i in top]
+
+
+def _load_popularity():
+    """Careers per skill and skills per career, from the career_skill link table."""
+    conn = get_read_connection()
+    skill_popularity = dict(conn.execute("""
+        SELECT s.name, COUNT(*) FROM career_skill cs JOIN skills s ON s.id = cs.skill_id
+        GROUP BY cs.skill_id
+    """))
+    career_popularity = dict(conn.execute("""
+        SELECT c.title, COUNT(*) FROM career_skill cs JOIN careers c ON c.id = cs.career_id
+        GROUP BY cs.career_id
+    """))
+    return {"skill": skill_popularity, "career": career_popularity}
+
+
+_indexes = None  # (taxonomy_version, {"skill": PrefixIndex, "career": PrefixIndex})
+_build_lock = threading.Lock()
+
+
+def get_autocomplete_indexes():
+    """Current prefix indexes, rebuilt only when the taxonomy version has changed."""
+    global _indexes
+    from skills_taxonomy import current_taxonomy_version
+
+    version = current_taxonomy_version()
+    indexes = _indexes
+    if indexes is not None and indexes[0] == version:
+        return indexes[1]
+    with _build_lock:
+        if _indexes is None or _indexes[0] != version:
+            popularity = _load_popularity()
+            _indexes = (version, {kind: PrefixIndex(popularity[kind]) for kind in AUTOCOMPLETE_TYPES})
+        return _indexes[1]
+
+
+def autocomplete(kind, query, limit=10):
+    """[{"name", "popularity"}] completions of `query` for kind "skill" or "career"."""
+    if kind not in AUTOCOMPLETE_TYPES:
+        raise ValueError(f"type must be one of {AUTOCOMPLETE_TYPES}")
+    index = get_autocomplete_indexes()[kind]
+    return [{"name": name, "popularity": count} for name, count in index.complete(query, limit)]
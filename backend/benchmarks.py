@@ -0,0 +1,985 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the performance-sensitive paths of the backend.
+
+Usage:
+    python benchmarks.py                 # run everything
+    python benchmarks.py segmenter ...   # run selected benchmarks
+"""
+import re
+import sys
+import time
+
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    """Register a bench_* function under its short name."""
+    BENCHMARKS[func.__name__[len("bench_"):]] = func
+    return func
+
+
+def best_of(func, *args, repeat=3, **kwargs):
+    """Best wall-clock time of `repeat` calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# ---------- Resume section segmentation ----------
+def _legacy_extract_experience(text):
+    """The regex-based extractor that segment_sections() replaced, kept for comparison."""
+    experience = []
+    exp_section = re.search(r'(?i)(professional experience|work experience)(.*?)(education|projects|certifications|achievements|skills|$)', text, re.DOTALL)
+    if not exp_section:
+        return experience
+    for block in re.split(r'(?=\b[A-Z][a-zA-Z\s]+ \| )', exp_section.group(2)):
+        if len(block.strip()) < 30:
+            continue
+        role_match = re.search(r'^([A-Z][a-zA-Z\s]+)\s*\|\s*([A-Za-z&\s\.]+)', block)
+        duration_match = re.search(r'([A-Za-z]{3,9}\s*\d{4})\s*[-–]\s*([A-Za-z]{3,9}\s*\d{4}|Present)', block)
+        if role_match:
+            experience.append((role_match.group(1), duration_match))
+    return experience
+
+
+@benchmark
+def bench_segmenter():
+    """
+    Adversarial resume texts at doubling sizes. A linear extractor keeps the
+    time ratio between consecutive sizes near 2x; the legacy regexes go quadratic.
+    """
+    from resume_parser import extract_experience, extract_education
+
+    adversarial = {
+        # One huge line of capitalised words: every word start re-scans the run
+        "single_line_no_separator": lambda n: "Work Experience " + "Word " * n,
+        # Separators everywhere, no section terminator
+        "separator_storm": lambda n: "Professional Experience\n" + "Role Title | Company " * (n // 4),
+        # Long whitespace runs between fragments
+        "whitespace_runs": lambda n: "Work Experience" + (" " * 50 + "Manager") * (n // 10),
+    }
+    sizes = [5_000, 10_000, 20_000, 40_000]
+
+    for name, make in adversarial.items():
+        print(f"\n{name}")
+        print(f"{'words':>8} {'legacy (s)':>12} {'segmenter (s)':>14}")
+        for n in sizes:
+            text = make(n)
+            legacy = best_of(_legacy_extract_experience, text, repeat=1) if n <= 20_000 else float("nan")
+            new = best_of(lambda t: (extract_experience(t), extract_education(t)), text)
+            print(f"{n:>8} {legacy:>12.4f} {new:>14.4f}")
+
+
+# ---------- DOCX extraction ----------
+def _random_png(path, width, height):
+    """Write an incompressible RGB PNG so the DOCX carries a realistically heavy image."""
+    import os
+    import zlib
+    import struct
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    rows = b"".join(b"\x00" + os.urandom(width * 3) for _ in range(height))
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(rows, 1)))
+        f.write(chunk(b"IEND", b""))
+
+
+@benchmark
+def bench_docx():
+    """Streaming zip reader vs python-docx on a resume with tables and a large embedded image."""
+    import os
+    import tempfile
+    import tracemalloc
+    import docx
+    from text_extraction import extract_text_from_docx
+
+    def python_docx_text(path):
+        return "\n".join(p.text for p in docx.Document(path).paragraphs)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        image_path = os.path.join(tmp, "photo.png")
+        docx_path = os.path.join(tmp, "resume.docx")
+        _random_png(image_path, 2000, 2000)
+
+        document = docx.Document()
+        document.sections[0].header.paragraphs[0].text = "Priya Nair | priya@example.com"
+        document.add_picture(image_path)
+        for i in range(2000):
+            document.add_paragraph(f"Led project {i} delivering dashboards in Power BI and SQL.")
+        table = document.add_table(rows=200, cols=2)
+        for r, row in enumerate(table.rows):
+            row.cells[0].text = f"Skill group {r}"
+            row.cells[1].text = "Python, Django, AWS"
+        document.save(docx_path)
+        print(f"document size: {os.path.getsize(docx_path) / 1e6:.1f} MB")
+
+        for label, func in (("python-docx", python_docx_text), ("streaming", extract_text_from_docx)):
+            seconds = best_of(func, docx_path)
+            tracemalloc.start()
+            text = func(docx_path)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{label:>12}: {seconds:.3f}s  peak {peak / 1e6:.1f} MB  "
+                  f"{len(text)} chars  table text found: {'Skill group 199' in text}")
+
+
+# ---------- Long-resume embedding ----------
+_FILLER_ROLE = (
+    "{title} | Acme Corporation\nJan 2015 - Dec 2018\n"
+    "Coordinated weekly meetings with stakeholders, prepared status reports, onboarded new "
+    "team members, maintained documentation and supported day to day operations across "
+    "several regional offices while tracking budgets and vendor relationships.\n"
+)
+
+
+def _synthetic_long_resume(career_skills, filler_roles=8):
+    """A senior-candidate resume whose distinguishing skills only appear after a long history."""
+    history = "".join(_FILLER_ROLE.format(title=f"Associate {i}") for i in range(filler_roles))
+    return (
+        "Priya Nair\npriya@example.com\n"
+        f"PROFESSIONAL EXPERIENCE\n{history}"
+        f"SKILLS\n{', '.join(career_skills)}\n"
+    )
+
+
+@benchmark
+def bench_embedding(samples=200, top_n=5):
+    """
+    Truncation vs chunked pooling on long synthetic resumes built from the FAISS
+    metadata: recall@top_n of the source career and mean latency per resume.
+    """
+    import random
+    from ml_model.dl_pipeline import DLPipeline, POOLING_METHODS
+
+    pipeline = DLPipeline(embedding_mode="truncate", use_cache=False)
+    if not pipeline.metadata:
+        print("FAISS index not available; run train_index.py first")
+        return
+
+    rng = random.Random(0)
+    cases = []
+    for idx in rng.sample(range(len(pipeline.metadata)), min(samples, len(pipeline.metadata))):
+        _, title, skills = pipeline.metadata[idx]
+        skills_list = skills.split(",") if isinstance(skills, str) else list(skills)
+        cases.append((title, _synthetic_long_resume(skills_list[:25])))
+
+    configs = [("truncate", "mean")] + [("chunked", pooling) for pooling in POOLING_METHODS]
+    print(f"{'mode':>18} {f'recall@{top_n}':>10} {'ms/resume':>10}")
+    for mode, pooling in configs:
+        pipeline.embedding_mode, pipeline.pooling = mode, pooling
+        hits = 0
+        start = time.perf_counter()
+        for title, resume in cases:
+            results = pipeline.search_jobs(resume, top_n=top_n)
+            hits += any(r["title"] == title for r in results)
+        elapsed = (time.perf_counter() - start) / len(cases) * 1000
+        label = mode if mode == "truncate" else f"{mode}/{pooling}"
+        print(f"{label:>18} {hits / len(cases):>10.2f} {elapsed:>10.1f}")
+
+
+# ---------- Fuzzy skill lookup ----------
+_SKILL_WORDS = [
+    "data", "cloud", "web", "mobile", "network", "security", "machine", "learning", "analytics",
+    "design", "marketing", "project", "management", "python", "java", "sql", "server", "testing",
+    "automation", "devops", "finance", "accounting", "sales", "content", "research", "database",
+    "frontend", "backend", "systems", "platform", "quality", "support", "digital", "media",
+]
+
+
+def _synthetic_vocabulary(size, rng):
+    vocab = set()
+    while len(vocab) < size:
+        words = rng.sample(_SKILL_WORDS, rng.randint(1, 3))
+        vocab.add(" ".join(words) + (f" {rng.randint(1, 999)}" if rng.random() < 0.7 else ""))
+    return sorted(vocab)
+
+
+def _typo(text, rng):
+    i = rng.randrange(len(text))
+    return text[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + text[i + 1:]
+
+
+@benchmark
+def bench_fuzzy(queries=200):
+    """Per-query latency of the linear fuzzywuzzy scan vs the trigram index (single and batch)."""
+    import random
+    from fuzzywuzzy import process
+    from skills_taxonomy import SkillIndex
+
+    rng = random.Random(0)
+    print(f"{'vocab':>8} {'scan ms/q':>10} {'index ms/q':>11} {'batch ms/q':>11} {'top-1 agree':>12}")
+    for size in (10_000, 100_000):
+        vocab = _synthetic_vocabulary(size, rng)
+        index = SkillIndex(vocab)
+        sample = [_typo(rng.choice(vocab), rng) for _ in range(queries)]
+        scan_sample = sample[:20]  # the linear scan is too slow to run all queries at 100k
+
+        def scan(qs):
+            return [process.extract(q, vocab, limit=5, scorer=process.fuzz.ratio) for q in qs]
+
+        scan_ms = best_of(scan, scan_sample, repeat=1) / len(scan_sample) * 1000
+        index_ms = best_of(lambda qs: [index.search(q) for q in qs], sample) / len(sample) * 1000
+        batch_ms = best_of(index.search_batch, sample) / len(sample) * 1000
+
+        agree = sum(
+            bool(s) and bool(i) and s[0][1] == i[0][1]
+            for s, i in zip(scan(scan_sample), (index.search(q) for q in scan_sample))
+        )
+        print(f"{size:>8} {scan_ms:>10.2f} {index_ms:>11.3f} {batch_ms:>11.3f} "
+              f"{agree:>7}/{len(scan_sample)}")
+
+
+# ---------- career_skills_db access layer ----------
+def _legacy_get_skills_by_career(db_path, career):
+    """The connect / CREATE TABLE / query / close pattern every accessor used before pooling."""
+    import sqlite3
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE IF NOT EXISTS skills (id INTEGER PRIMARY KEY AUTOINCREMENT, career TEXT NOT NULL, skill TEXT NOT NULL)")
+    conn.commit()
+    conn.close()
+    conn = sqlite3.connect(db_path)
+    skills = [row[0] for row in conn.execute("SELECT skill FROM skills WHERE career = ?", (career,))]
+    conn.close()
+    return skills
+
+
+def _legacy_add_career_skills(db_path, career, skills):
+    import sqlite3
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE IF NOT EXISTS skills (id INTEGER PRIMARY KEY AUTOINCREMENT, career TEXT NOT NULL, skill TEXT NOT NULL)")
+    conn.commit()
+    conn.close()
+    conn = sqlite3.connect(db_path)
+    for skill in skills:
+        conn.execute("INSERT INTO skills (career, skill) VALUES (?, ?)", (career, skill))
+    conn.commit()
+    conn.close()
+
+
+@benchmark
+def bench_sqlite(reads=2000, writes=200):
+    """ops/sec of career_skills_db reads and writes: connection-per-call vs the pooled, tuned layer."""
+    import os
+    import sqlite3
+    import tempfile
+    import career_skills_db
+
+    careers = [f"Career {i}" for i in range(200)]
+    skills = [f"skill {i}" for i in range(10)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for label in ("legacy", "pooled"):
+            db_path = os.path.join(tmp, f"{label}.db")
+            seed = sqlite3.connect(db_path)
+            seed.execute("CREATE TABLE skills (id INTEGER PRIMARY KEY AUTOINCREMENT, career TEXT NOT NULL, skill TEXT NOT NULL)")
+            seed.executemany("INSERT INTO skills (career, skill) VALUES (?, ?)",
+                             [(c, s) for c in careers for s in skills])
+            seed.commit()
+            seed.close()
+
+            if label == "legacy":
+                read = lambda c: _legacy_get_skills_by_career(db_path, c)
+                write = lambda c: _legacy_add_career_skills(db_path, c, skills)
+            else:
+                career_skills_db.DB_NAME = db_path
+                career_skills_db.init_db()  # migrates the seeded rows to the normalized schema
+                read = career_skills_db.get_skills_by_career
+                write = lambda c: career_skills_db.add_career_skills(c, skills)
+
+            start = time.perf_counter()
+            for i in range(reads):
+                read(careers[i % len(careers)])
+            read_ops = reads / (time.perf_counter() - start)
+            start = time.perf_counter()
+            for i in range(writes):
+                write(f"New career {i}")
+            write_ops = writes / (time.perf_counter() - start)
+            results[label] = (read_ops, write_ops)
+
+        print(f"{'layer':>8} {'reads/s':>10} {'writes/s':>10}")
+        for label, (read_ops, write_ops) in results.items():
+            print(f"{label:>8} {read_ops:>10.0f} {write_ops:>10.0f}")
+
+
+
+@benchmark
+def bench_read_snapshot(rounds=200):
+    """career_skills_db reads on a copy of career_skills.db: on-disk connection vs the in-memory serving snapshot."""
+    import os
+    import shutil
+    import tempfile
+    import career_skills_db
+
+    source = os.path.join(os.path.dirname(os.path.abspath(__file__)), "career_skills.db")
+    with tempfile.TemporaryDirectory() as tmp:
+        career_skills_db.DB_NAME = shutil.copy(source, os.path.join(tmp, "career_skills.db"))
+        careers = career_skills_db.get_all_careers()[:50]
+        skills = career_skills_db.get_all_skills()[:200]
+        reads = {
+            "skills of a career": lambda i: career_skills_db.get_skills_by_career(careers[i % len(careers)]),
+            "careers by skills": lambda i: career_skills_db.search_careers_by_skills(skills[i % 150:i % 150 + 5]),
+            "career count": lambda i: career_skills_db.get_career_count(),
+        }
+
+        def run(read):
+            for i in range(rounds):
+                read(i)
+
+        results = {name: [best_of(run, read) / rounds] for name, read in reads.items()}
+        start = time.perf_counter()
+        career_skills_db.start_read_snapshot()
+        load_seconds = time.perf_counter() - start
+        try:
+            for name, read in reads.items():
+                results[name].append(best_of(run, read) / rounds)
+        finally:
+            career_skills_db.stop_read_snapshot()
+
+    print(f"{os.path.getsize(source) / 1e6:.1f} MB database, snapshot loaded in {load_seconds * 1000:.1f} ms")
+    print(f"{'read':>20} {'disk us':>9} {'memory us':>10}")
+    for name, (disk, memory) in results.items():
+        print(f"{name:>20} {disk * 1e6:>9.1f} {memory * 1e6:>10.1f}")
+
+# ---------- Career/skill listing ----------
+@benchmark
+def bench_career_skills():
+    """get_career_skills on a migrated copy of career_skills.db: legacy comma-joined table vs link queries."""
+    import os
+    import shutil
+    import tempfile
+    import career_skills_db
+    from itertools import groupby
+    from operator import itemgetter
+
+    source = os.path.join(os.path.dirname(os.path.abspath(__file__)), "career_skills.db")
+    with tempfile.TemporaryDirectory() as tmp:
+        career_skills_db.DB_NAME = shutil.copy(source, os.path.join(tmp, "career_skills.db"))
+        conn = career_skills_db.get_connection()  # migrates, keeping legacy_career_skills
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'legacy_career_skills'").fetchone():
+            print("career_skills.db has no legacy table to compare against")
+            return
+
+        def legacy():
+            # The pre-normalization read: one comma-joined row per career
+            rows = conn.execute("SELECT career_title, skills FROM legacy_career_skills").fetchall()
+            return [(career, skills.split(",")) for career, skills in rows]
+
+        def join_sorted():
+            # The first normalized query: every link joined, then sorted by title and rowid
+            rows = conn.execute("""
+                SELECT c.title, s.name FROM career_skill cs
+                JOIN careers c ON c.id = cs.career_id JOIN skills s ON s.id = cs.skill_id
+                ORDER BY c.title, cs.rowid
+            """).fetchall()
+            return [(career, [skill for _, skill in group]) for career, group in groupby(rows, key=itemgetter(0))]
+
+        def indexed():
+            return career_skills_db._group_career_skills(conn.execute(career_skills_db.CAREER_SKILLS_SQL).fetchall())
+
+        assert indexed() == join_sorted()
+        career_skills_db.get_career_skills()
+        timings = {
+            "legacy table": best_of(legacy),
+            "join + ORDER BY": best_of(join_sorted),
+            "indexed query": best_of(indexed),
+            "get_career_skills": best_of(career_skills_db.get_career_skills),
+        }
+        links = conn.execute("SELECT COUNT(*) FROM career_skill").fetchone()[0]
+        careers = conn.execute("SELECT COUNT(*) FROM careers").fetchone()[0]
+
+    print(f"{careers} careers, {links} links")
+    print(f"{'read':>20} {'ms':>9}")
+    for label, seconds in timings.items():
+        print(f"{label:>20} {seconds * 1000:>9.2f}")
+    print("(get_career_skills = cached for the current taxonomy version)")
+
+
+# ---------- Career search by skills ----------
+def _legacy_search_careers_by_skills(user_skills, min_match=1):
+    """The scan-every-career implementation that the inverted-index search replaced."""
+    from career_skills_db import get_career_skills
+    from skill_aliases import canonicalize_skills
+
+    user_skills_lower = canonicalize_skills(user_skills)
+    matches = []
+    for career, skills in get_career_skills():
+        career_skills = [skill.lower() for skill in skills]
+        matching_skills = [skill for skill in career_skills if skill in user_skills_lower]
+        if len(matching_skills) >= min_match:
+            matches.append({
+                'career': career,
+                'match_count': len(matching_skills),
+                'matching_skills': matching_skills,
+                'total_skills': len(career_skills),
+                'match_percentage': (len(matching_skills) / len(career_skills)) * 100 if career_skills else 0
+            })
+    matches.sort(key=lambda x: (x['match_count'], x['match_percentage']), reverse=True)
+    return matches
+
+
+@benchmark
+def bench_career_search(queries=20, skills_per_career=20, vocabulary=5000):
+    """search_careers_by_skills: full scan vs inverted index (+ heap top-10) at 1k and 100k careers."""
+    import os
+    import random
+    import sqlite3
+    import tempfile
+    import career_skills_db
+
+    rng = random.Random(0)
+    vocab = [f"skill {i}" for i in range(vocabulary)]
+    print(f"{'careers':>8} {'scan ms/q':>10} {'index ms/q':>11} {'top-10 ms/q':>12} {'identical':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_careers in (1_000, 100_000):
+            career_skills_db.DB_NAME = os.path.join(tmp, f"careers_{n_careers}.db")
+            career_skills_db.init_db()
+            conn = sqlite3.connect(career_skills_db.DB_NAME)
+            conn.executemany("INSERT INTO careers (id, title) VALUES (?, ?)",
+                             [(i, f"Career {i}") for i in range(n_careers)])
+            conn.executemany("INSERT INTO skills (id, name) VALUES (?, ?)", enumerate(vocab))
+            conn.executemany(
+                "INSERT OR IGNORE INTO career_skill (career_id, skill_id) VALUES (?, ?)",
+                ((i, rng.randrange(vocabulary)) for i in range(n_careers) for _ in range(skills_per_career))
+            )
+            conn.commit()
+            conn.close()
+
+            samples = [rng.sample(vocab, 5) for _ in range(queries)]
+            scan_samples = samples[:3] if n_careers > 10_000 else samples
+            scan_ms = best_of(lambda: [_legacy_search_careers_by_skills(q) for q in scan_samples],
+                              repeat=1) / len(scan_samples) * 1000
+            index_ms = best_of(lambda: [career_skills_db.search_careers_by_skills(q) for q in samples]) / queries * 1000
+            top_ms = best_of(lambda: [career_skills_db.search_careers_by_skills(q, top_k=10) for q in samples]) / queries * 1000
+            identical = all(
+                _legacy_search_careers_by_skills(q) == career_skills_db.search_careers_by_skills(q)
+                and _legacy_search_careers_by_skills(q)[:10] == career_skills_db.search_careers_by_skills(q, top_k=10)
+                for q in scan_samples
+            )
+            print(f"{n_careers:>8} {scan_ms:>10.1f} {index_ms:>11.2f} {top_ms:>12.2f} {str(identical):>10}")
+
+
+# ---------- Career/skill ingestion ----------
+def _legacy_ingest(db_path, pairs):
+    """Pre-bulk path: a connection per career and a SELECT before every INSERT."""
+    import sqlite3
+    for career, skills in pairs:
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE IF NOT EXISTS skills (id INTEGER PRIMARY KEY AUTOINCREMENT, career TEXT NOT NULL, skill TEXT NOT NULL)")
+        for skill in skills:
+            if not conn.execute("SELECT id FROM skills WHERE career = ? AND skill = ?", (career, skill)).fetchone():
+                conn.execute("INSERT INTO skills (career, skill) VALUES (?, ?)", (career, skill))
+        conn.commit()
+        conn.close()
+
+
+@benchmark
+def bench_ingest(careers=300):
+    """Loading the O*NET career/skill rows: per-row legacy writes vs per-career calls vs the bulk API."""
+    import os
+    import sqlite3
+    import tempfile
+    import career_skills_db
+
+    source = sqlite3.connect(os.path.join(os.path.dirname(os.path.abspath(__file__)), "career_skills.db"))
+    pairs = [(title, skills.split(",")) for title, skills in
+             source.execute("SELECT career_title, skills FROM career_skills WHERE skills IS NOT NULL")]
+    source.close()
+    links = sum(len(skills) for _, skills in pairs)
+    print(f"{len(pairs)} careers, {links} career-skill links")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The legacy path is quadratic (unindexed SELECT per row): time a prefix and scale
+        subset = pairs[:careers]
+        legacy = best_of(_legacy_ingest, os.path.join(tmp, "legacy.db"), subset, repeat=1) * len(pairs) / len(subset)
+
+        def per_career():
+            for career, skills in pairs:
+                career_skills_db.add_career_skills(career, skills)
+
+        timings = {}
+        for label, load in (("per-career", per_career),
+                            ("bulk", lambda: career_skills_db.add_career_skills_bulk(pairs))):
+            career_skills_db.DB_NAME = os.path.join(tmp, f"{label}.db")
+            career_skills_db.init_db()
+            start = time.perf_counter()
+            load()
+            timings[label] = time.perf_counter() - start
+
+    print(f"{'path':>12} {'seconds':>9} {'links/s':>10}")
+    print(f"{'legacy':>12} {legacy:>9.1f} {links / legacy:>10.0f}   (extrapolated from {len(subset)} careers)")
+    for label, seconds in timings.items():
+        print(f"{label:>12} {seconds:>9.2f} {links / seconds:>10.0f}")
+
+
+@benchmark
+def bench_job_ingest(jobs=20000, skills_per_job=8, vocabulary=3000):
+    """Storing scraped jobs in career_guidance.db: add_job per job vs add_jobs_bulk."""
+    import os
+    import random
+    import tempfile
+
+    rng = random.Random(0)
+    vocab = [f"skill {i}" for i in range(vocabulary)]
+
+    def make_jobs(n, prefix):
+        return [{
+            "title": f"{prefix} job {i}", "company": f"company {i % 500}", "location": "Remote",
+            "description": "Build and ship things. " * 20, "url": f"https://example.com/{prefix}/{i}",
+            "source": "bench", "search_query": "developer",
+            "skills_required": rng.sample(vocab, skills_per_job),
+        } for i in range(n)]
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Files written relative to the cwd stay inside tmp
+        os.chdir(tmp)
+        try:
+            from database import DatabaseManager
+            manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+
+            # add_job runs a duplicate check and a query per skill for every job: time a prefix and scale
+            subset = make_jobs(jobs // 20, "single")
+            start = time.perf_counter()
+            for job in subset:
+                job.pop("search_query")
+                manager.add_job(job)
+            per_job = (time.perf_counter() - start) * jobs / len(subset)
+
+            stats = manager.add_jobs_bulk(make_jobs(jobs, "bulk"))
+        finally:
+            os.chdir(cwd)
+
+    print(f"{'path':>10} {'seconds':>9} {'jobs/s':>10}")
+    print(f"{'add_job':>10} {per_job:>9.1f} {jobs / per_job:>10.0f}   (extrapolated from {len(subset)} jobs)")
+    print(f"{'bulk':>10} {stats['seconds']:>9.2f} {stats['jobs_per_second']:>10.0f}")
+
+
+@benchmark
+def bench_job_search(jobs=100000, skills_per_job=8, vocabulary=3000, queries=50, query_skills=5):
+    """get_jobs_by_skills on a synthetic jobs database: legacy join vs ranked query, with and without the index."""
+    import os
+    import random
+    import tempfile
+    from sqlalchemy import select, text
+    from sqlalchemy.orm import Session
+
+    rng = random.Random(0)
+    vocab = [f"skill {i}" for i in range(vocabulary)]
+    # Skewed skill popularity, like real postings
+    weights = [1.0 / (rank + 1) for rank in range(vocabulary)]
+    searches = [rng.sample(vocab[:200], query_skills) for _ in range(queries)]
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Files written relative to the cwd stay inside tmp
+        os.chdir(tmp)
+        try:
+            from database import DatabaseManager, Job, Skill
+            manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            manager.add_jobs_bulk({
+                "title": f"job {i}", "company": f"company {i % 500}", "source": "bench",
+                "skills_required": rng.choices(vocab, weights, k=skills_per_job),
+            } for i in range(jobs))
+
+            def legacy(skills):
+                # The previous implementation: one row per matching skill, unordered,
+                # then the skills of each job lazily loaded
+                with Session(manager.engine) as session:
+                    rows = session.execute(
+                        select(Job).join(Job.skills).where(Skill.name.in_(skills)).limit(20)
+                    ).scalars().all()
+                    for job in rows:
+                        job.skills
+
+            def ranked(skills):
+                page = manager.get_jobs_by_skills(skills, limit=20)
+                last_count, last_job = page[-1][1], page[-1][0]
+                manager.get_jobs_by_skills(skills, limit=20, after=(last_count, last_job.id))
+
+            timings = {}
+            for label, search in (("legacy", legacy), ("ranked", ranked)):
+                timings[label] = best_of(lambda: [search(q) for q in searches]) / queries
+            with manager.engine.begin() as conn:
+                conn.execute(text("DROP INDEX ix_job_skills_skill_job"))
+            timings["ranked, no index"] = best_of(lambda: [ranked(q) for q in searches]) / queries
+        finally:
+            os.chdir(cwd)
+
+    print(f"{jobs} jobs, {queries} queries of {query_skills} skills")
+    print(f"{'query':>18} {'ms/query':>9}")
+    for label, seconds in timings.items():
+        print(f"{label:>18} {seconds * 1000:>9.2f}")
+    print("(ranked = two pages of 20, fully ranked by match count, skills eager-loaded)")
+
+
+
+@benchmark
+def bench_job_fts(jobs=100000, queries=50):
+    """search_jobs (FTS5, BM25-ranked) vs a LIKE scan over title and description."""
+    import os
+    import random
+    import tempfile
+    from itertools import accumulate
+    from sqlalchemy import or_, select
+    from sqlalchemy.orm import Session
+
+    rng = random.Random(0)
+    words = [f"w{i}" for i in range(20000)]
+    # Cumulative once: choices() would otherwise re-accumulate 20k weights per job
+    cum_weights = list(accumulate(1.0 / (rank + 1) for rank in range(len(words))))
+    roles = ["python developer", "data analyst", "devops engineer", "product manager", "ml engineer",
+             "frontend developer", "java developer", "qa engineer", "data scientist", "sre"]
+    # Mid-frequency description words: a few hundred matches each
+    terms = [f"w{rng.randint(200, 2000)}" for _ in range(queries)]
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Files written relative to the cwd stay inside tmp
+        os.chdir(tmp)
+        try:
+            from database import DatabaseManager, Job
+            manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            manager.add_jobs_bulk(({
+                "title": f"{rng.choice(roles)} {i}", "company": f"company {i % 500}",
+                "location": rng.choice(["Remote", "Bangalore", "Pune", "London"]),
+                "source": rng.choice(["LinkedIn", "Indeed", "Naukri"]),
+                "description": " ".join(rng.choices(words, cum_weights=cum_weights, k=60)),
+            } for i in range(jobs)), dedupe=False)
+
+            def like(term):
+                with Session(manager.engine) as session:
+                    pattern = f"%{term}%"
+                    session.execute(
+                        select(Job.id, Job.title).where(or_(Job.title.like(pattern), Job.description.like(pattern)))
+                        .limit(20)
+                    ).all()
+
+            timings = {
+                "LIKE scan": best_of(lambda: [like(t) for t in terms]) / queries,
+                "fts": best_of(lambda: [manager.search_jobs(t) for t in terms]) / queries,
+                "fts + filters": best_of(
+                    lambda: [manager.search_jobs(t, source="naukri", location="pune") for t in terms]) / queries,
+            }
+        finally:
+            os.chdir(cwd)
+
+    print(f"{jobs} jobs, {queries} single-word queries, 20 results each")
+    print(f"{'query':>14} {'ms/query':>9}")
+    for label, seconds in timings.items():
+        print(f"{label:>14} {seconds * 1000:>9.2f}")
+    print("(LIKE = first 20 substring matches, unranked; fts = all word matches ranked by BM25, with highlights)")
+
+
+
+@benchmark
+def bench_job_list(jobs=200000, page_size=20, depths=(1, 100, 1000, 5000)):
+    """list_jobs keyset pages vs OFFSET pages at increasing depth, unfiltered and filtered by source."""
+    import os
+    import random
+    import tempfile
+    from sqlalchemy import select
+
+    rng = random.Random(0)
+    # A few hundred distinct dates, so the cursor often lands inside a run of ties
+    dates = [f"2024-{month:02d}-{day:02d}" for month in range(1, 13) for day in range(1, 29)]
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Files written relative to the cwd stay inside tmp
+        os.chdir(tmp)
+        try:
+            from database import DatabaseManager, Job, JOB_LIST_COLUMNS, JOB_LIST_FILTERS, JOB_LIST_SORT
+            manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            manager.add_jobs_bulk(({
+                "title": f"job {i}", "company": f"company {i % 500}",
+                "source": rng.choice(["LinkedIn", "Indeed", "Naukri", "Remote OK"]),
+                "posted_date": rng.choice(dates),
+            } for i in range(jobs)), dedupe=False)
+
+            def offset_page(depth, source):
+                conditions = [JOB_LIST_FILTERS["is_active"] == 1]
+                if source:
+                    conditions.append(JOB_LIST_FILTERS["source"] == source)
+                with manager.engine.connect() as conn:
+                    conn.execute(
+                        select(*JOB_LIST_COLUMNS).where(*conditions)
+                        .order_by(JOB_LIST_SORT.desc(), Job.id.desc())
+                        .offset((depth - 1) * page_size).limit(page_size)
+                    ).all()
+
+            timings = {}
+            for source in (None, "naukri"):
+                # Cursor of the page before each depth, collected by walking the pages once
+                cursors, after = {}, None
+                for number in range(1, max(depths) + 1):
+                    if number in depths:
+                        cursors[number] = after
+                    _, after = manager.list_jobs(source=source, limit=page_size, after=after)
+                for depth in depths:
+                    timings[(source or "all", depth)] = (
+                        best_of(offset_page, depth, source),
+                        best_of(manager.list_jobs, source=source, limit=page_size, after=cursors[depth]),
+                    )
+        finally:
+            os.chdir(cwd)
+
+    print(f"{jobs} jobs, pages of {page_size}")
+    print(f"{'filter':>8} {'page':>6} {'offset ms':>10} {'keyset ms':>10}")
+    for (label, depth), (offset_seconds, keyset_seconds) in timings.items():
+        print(f"{label:>8} {depth:>6} {offset_seconds * 1000:>10.2f} {keyset_seconds * 1000:>10.2f}")
+
+
+@benchmark
+def bench_skill_trends(jobs=100000, skills_per_job=8, vocabulary=3000, days=60):
+    """skill_trends from the skill_demand counters vs GROUP BY over job_skills; ingest cost of the counter triggers."""
+    import datetime
+    import os
+    import random
+    import tempfile
+    from itertools import accumulate
+    from sqlalchemy import text
+
+    rng = random.Random(0)
+    vocab = [f"skill {i}" for i in range(vocabulary)]
+    cum_weights = list(accumulate(1.0 / (rank + 1) for rank in range(vocabulary)))
+    today = datetime.date(2024, 6, 30)
+    start = datetime.datetime.combine(today, datetime.time()) - datetime.timedelta(days=days - 1)
+
+    def make_jobs(prefix):
+        return ({
+            "title": f"{prefix} job {i}", "company": f"company {i % 500}",
+            "source": rng.choice(["LinkedIn", "Indeed", "Naukri"]),
+            "created_at": start + datetime.timedelta(days=rng.randrange(days)),
+            "skills_required": rng.choices(vocab, cum_weights=cum_weights, k=skills_per_job),
+        } for i in range(jobs))
+
+    # What the counters replace: the same windows computed from every job_skills row
+    rescan_sql = text("""
+        SELECT s.name, SUM(date(j.created_at) >= :current) AS current, SUM(date(j.created_at) < :current) AS previous
+        FROM job_skills js JOIN jobs j ON j.id = js.job_id JOIN skills s ON s.id = js.skill_id
+        WHERE date(j.created_at) >= :previous
+        GROUP BY s.id ORDER BY current DESC LIMIT 20
+    """)
+    window = {"current": (today - datetime.timedelta(days=29)).isoformat(),
+              "previous": (today - datetime.timedelta(days=59)).isoformat()}
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Files written relative to the cwd stay inside tmp
+        os.chdir(tmp)
+        try:
+            from database import DatabaseManager
+            ingest = {}
+            plain = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'plain.db')}")
+            with plain.engine.begin() as conn:
+                for name in ("insert", "delete", "update"):
+                    conn.execute(text(f"DROP TRIGGER skill_demand_{name}"))
+            ingest["no counters"] = plain.add_jobs_bulk(make_jobs("plain"), dedupe=False)["seconds"]
+            manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            ingest["counters"] = manager.add_jobs_bulk(make_jobs("bench"), dedupe=False)["seconds"]
+
+            def rescan():
+                with manager.engine.connect() as conn:
+                    conn.execute(rescan_sql, window).all()
+
+            timings = {
+                "GROUP BY job_skills": best_of(rescan),
+                "counters, 30 days": best_of(manager.skill_trends, days=30, today=today),
+                "counters, all time": best_of(manager.skill_trends, days=0),
+            }
+        finally:
+            os.chdir(cwd)
+
+    print(f"{jobs} jobs over {days} days, {skills_per_job} skills each")
+    print(f"{'ingest':>20} {'seconds':>9}")
+    for label, seconds in ingest.items():
+        print(f"{label:>20} {seconds:>9.2f}")
+    print(f"{'trends query':>20} {'ms':>9}")
+    for label, seconds in timings.items():
+        print(f"{label:>20} {seconds * 1000:>9.2f}")
+    print("(counters, 30 days = top 20 and fastest-growing 20 against the 30 days before)")
+
+
+@benchmark
+def bench_training_export(jobs=50000, skills_per_job=8, vocabulary=3000):
+    """ML training data export: the legacy ORM query + json.dump vs iter_training_records streamed to NDJSON/Parquet."""
+    import json
+    import os
+    import random
+    import tempfile
+    import tracemalloc
+
+    rng = random.Random(0)
+    vocab = [f"skill {i}" for i in range(vocabulary)]
+    words = [f"w{i}" for i in range(5000)]
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Files written relative to the cwd stay inside tmp
+        os.chdir(tmp)
+        try:
+            from database import DatabaseManager, Job
+            from snapshots import export_training_data
+            manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            manager.add_jobs_bulk(({
+                "title": f"job {i}", "company": f"company {i % 500}", "source": "bench",
+                "description": " ".join(rng.choices(words, k=150)),
+                "skills_required": rng.sample(vocab, skills_per_job),
+            } for i in range(jobs)), dedupe=False)
+
+            def legacy():
+                # The previous prepare_ml_training_data
+                db = manager.SessionLocal()
+                rows = db.query(Job).join(Job.skills).all()
+                data = [{"job_id": job.id, "title": job.title, "description": job.description,
+                         "skills": [skill.name for skill in job.skills]} for job in rows]
+                db.close()
+                with open("legacy.json", "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                return len(data)
+
+            results = {}
+            for label, export in (
+                ("legacy json", legacy),
+                ("ndjson", lambda: export_training_data("train.ndjson", manager.iter_training_records())),
+                ("parquet", lambda: export_training_data("train.parquet", manager.iter_training_records())),
+            ):
+                tracemalloc.start()
+                start = time.perf_counter()
+                count = export()
+                seconds = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                results[label] = (count, seconds, peak)
+        finally:
+            os.chdir(cwd)
+
+    print(f"{jobs} jobs, {skills_per_job} skills each")
+    print(f"{'export':>12} {'records':>8} {'seconds':>8} {'peak MB':>8}")
+    for label, (count, seconds, peak) in results.items():
+        print(f"{label:>12} {count:>8} {seconds:>8.2f} {peak / 2 ** 20:>8.1f}")
+    print("(peak = Python allocations traced by tracemalloc; timings include tracing overhead)")
+
+
+
+# ---------- Event loop lag under load ----------
+def _measure_loop_lag(clients, requests_per_client, handler, cleanup=None, interval=0.005):
+    """
+    Run `clients` concurrent coroutines awaiting handler(i) while a monitor
+    sleeps `interval` in a loop; lag is how late each wake-up was. `cleanup`
+    is awaited on the same loop at the end. Returns (lags, wall-clock seconds).
+    """
+    import asyncio
+
+    async def run():
+        lags, done = [], asyncio.Event()
+
+        async def monitor():
+            while not done.is_set():
+                start = time.perf_counter()
+                await asyncio.sleep(interval)
+                lags.append(time.perf_counter() - start - interval)
+
+        async def client(n):
+            for i in range(requests_per_client):
+                await handler(n + i)
+
+        watcher = asyncio.create_task(monitor())
+        await asyncio.sleep(interval)
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*(client(n) for n in range(clients)))
+            elapsed = time.perf_counter() - start
+        finally:
+            done.set()
+            await watcher
+            if cleanup is not None:
+                await cleanup()
+        return lags, elapsed
+
+    return asyncio.run(run())
+
+
+@benchmark
+def bench_loop_lag(clients=20, requests_per_client=30, careers=2000, jobs=50000):
+    """Event-loop lag while handlers read the databases: blocking calls vs the async data-access path."""
+    import os
+    import random
+    import tempfile
+    import career_skills_db
+
+    rng = random.Random(0)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Files written relative to the cwd stay inside tmp
+        os.chdir(tmp)
+        try:
+            from database import DatabaseManager
+            career_skills_db.DB_NAME = os.path.join(tmp, "career_skills.db")
+            career_skills_db.add_career_skills_bulk(
+                (f"career {i}", [f"skill {rng.randrange(3000)}" for _ in range(15)]) for i in range(careers)
+            )
+            manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            manager.add_jobs_bulk(({
+                "title": f"{rng.choice(['python', 'java', 'data', 'cloud'])} engineer {i}",
+                "company": f"company {i % 500}", "source": rng.choice(["LinkedIn", "Indeed"]),
+                "posted_date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                "description": f"work on {rng.choice(['apis', 'pipelines', 'dashboards'])} with the team",
+            } for i in range(jobs)), dedupe=False)
+
+            # What the handlers read: the chatbot's career/skill table, a job
+            # search and a job listing page. "blocking" is an async def handler
+            # calling the sync functions, as the endpoints did before.
+            async def blocking(n):
+                if n % 3 == 0:
+                    career_skills_db.get_career_skills()
+                elif n % 3 == 1:
+                    manager.search_jobs("python engineer", limit=20)
+                else:
+                    manager.list_jobs(source="linkedin", limit=20)
+
+            async def non_blocking(n):
+                if n % 3 == 0:
+                    await career_skills_db.get_career_skills_async()
+                elif n % 3 == 1:
+                    await manager.search_jobs_async("python engineer", limit=20)
+                else:
+                    await manager.list_jobs_async(source="linkedin", limit=20)
+
+            async def close_pools():
+                await manager.dispose_async()
+                await career_skills_db.close_async_connections()
+
+            results = {
+                "blocking": _measure_loop_lag(clients, requests_per_client, blocking),
+                "async": _measure_loop_lag(clients, requests_per_client, non_blocking, close_pools),
+            }
+        finally:
+            os.chdir(cwd)
+
+    requests = clients * requests_per_client
+    print(f"{clients} concurrent clients, {requests} requests; loop wake-up lag in ms")
+    print(f"{'path':>9} {'p50':>7} {'p99':>7} {'max':>7} {'req/s':>7}")
+    for label, (lags, elapsed) in results.items():
+        lags = sorted(lags) or [0.0]
+        p50, p99 = lags[len(lags) // 2], lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+        print(f"{label:>9} {p50 * 1000:>7.2f} {p99 * 1000:>7.2f} {lags[-1] * 1000:>7.2f} {requests / elapsed:>7.0f}")
+
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark '{name}'. Available: {', '.join(BENCHMARKS)}")
+            sys.exit(1)
+        print(f"=== {name} ===")
+        BENCHMARKS[name]()
@@ -1,198 +1,716 @@
+import os
+import heapq
+import asyncio
 import sqlite3
 import json
-from typing import List, Dict, Any, Optional
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from itertools import count, groupby, islice
+from operator import itemgetter
+from typing import List, Dict, Any, Iterable, Optional
+from urllib.request import pathname2url
+from skill_aliases import canonicalize_skills, init_alias_table
 
 DB_NAME = "career_skills.db"
 
+# Applied to every connection. WAL lets readers run alongside the writer and,
+# with synchronous=NORMAL, commits no longer fsync on every transaction.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",   # 256 MB memory-mapped reads
+    "PRAGMA cache_size=-65536",     # 64 MB page cache
+    "PRAGMA temp_store=MEMORY",
+)
+# Size of each connection's prepared-statement cache
+STATEMENT_CACHE_SIZE = 256
+# Careers per transaction in add_career_skills_bulk
+INGEST_BATCH_SIZE = 1000
+# aiosqlite connections per event loop for async_connection()
+ASYNC_POOL_SIZE = 8
+# Seconds between checks of the on-disk taxonomy version in serving mode
+READ_SNAPSHOT_INTERVAL = 2.0
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = set()
+
+def get_connection() -> sqlite3.Connection:
+    """
+    Thread-local connection to DB_NAME, opened once per thread with the tuned
+    pragmas. Statements are prepared once and reused from the connection's
+    statement cache, so callers should pass parameters rather than format SQL.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.key != (DB_NAME, os.getpid()):
+        conn = sqlite3.connect(DB_NAME, cached_statements=STATEMENT_CACHE_SIZE)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        _local.conn, _local.key = conn, (DB_NAME, os.getpid())
+    if DB_NAME not in _schema_ready:
+        _create_schema(conn)
+    return conn
+
+@contextmanager
+def transaction():
+    """Cursor on the thread's connection; commits on success, rolls back on error."""
+    conn = get_connection()
+    with conn:
+        yield conn.cursor()
+
+class _ReadSnapshot:
+    """
+    Read-only in-memory copy of DB_NAME at one taxonomy version. The copy
+    lives in SQLite's memdb VFS under a unique name, so every thread can open
+    its own connection to the same bytes; `keeper` holds it in memory.
+    """
+
+    def __init__(self, version: int, uri: str, keeper: sqlite3.Connection):
+        self.version = version
+        self.uri = uri
+        self.keeper = keeper
+
+_snapshot_ids = count()
+_read_snapshot = None  # current _ReadSnapshot in serving mode, else None
+_snapshot_stop = None  # threading.Event stopping the refresher
+# Held while swapping or dropping the snapshot and while a reader connects to
+# it, so nobody connects to a URI whose keeper is already closed: that would
+# create a new, empty memdb database
+_snapshot_lock = threading.Lock()
+
+def _load_read_snapshot() -> _ReadSnapshot:
+    """Copy DB_NAME into a new in-memory database with VACUUM INTO."""
+    get_connection()  # creates/migrates the schema
+    uri = f"file:/career_skills_snapshot_{os.getpid()}_{next(_snapshot_ids)}?vfs=memdb"
+    keeper = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    # Not the backup API: it copies the WAL flag of the header, and a memdb
+    # database in WAL mode cannot be opened by a second connection.
+    # VACUUM INTO writes a rollback-journal copy; it needs a URI connection.
+    source = sqlite3.connect(f"file:{pathname2url(os.path.abspath(DB_NAME))}", uri=True)
+    try:
+        source.execute("VACUUM INTO ?", (uri,))
+    finally:
+        source.close()
+    # The copy is a consistent point in time; take its version from the copy itself
+    return _ReadSnapshot(get_taxonomy_version(keeper), uri, keeper)
+
+def _refresh_read_snapshot(stop: threading.Event, interval: float):
+    """Reload and swap the snapshot whenever a writer bumps the on-disk version."""
+    global _read_snapshot
+    disk = sqlite3.connect(DB_NAME)
+    while not stop.wait(interval):
+        snapshot = _read_snapshot
+        try:
+            if snapshot is None or get_taxonomy_version(disk) == snapshot.version:
+                continue
+            fresh = _load_read_snapshot()
+        except Exception as e:
+            # Keep serving the current copy; try again next interval
+            print(f"Error refreshing career_skills snapshot: {e}")
+            continue
+        with _snapshot_lock:
+            if stop.is_set():
+                fresh.keeper.close()
+                break
+            # A single reference assignment: readers see the old or the new copy, never a mix
+            _read_snapshot = fresh
+            # Connections already open on the old copy keep it alive until their thread reconnects
+            snapshot.keeper.close()
+    disk.close()
+
+def start_read_snapshot(interval: float = READ_SNAPSHOT_INTERVAL) -> int:
+    """
+    Serving mode: load DB_NAME into memory and answer the read helpers from
+    that copy, so reads never touch the filesystem. A background thread checks
+    the on-disk taxonomy version every `interval` seconds and swaps in a fresh
+    copy when a writer has bumped it. Writes still go to disk.
+    Returns the loaded taxonomy version.
+    """
+    global _read_snapshot, _snapshot_stop
+    stop_read_snapshot()
+    snapshot = _load_read_snapshot()
+    with _snapshot_lock:
+        _read_snapshot = snapshot
+    _snapshot_stop = threading.Event()
+    threading.Thread(target=_refresh_read_snapshot, args=(_snapshot_stop, interval),
+                     name="career-skills-snapshot", daemon=True).start()
+    return snapshot.version
+
+def stop_read_snapshot():
+    """
+    Leave serving mode: reads go back to DB_NAME on disk. The in-memory copy is
+    freed once every thread has dropped its connection to it, which each thread
+    does on its next read.
+    """
+    global _read_snapshot, _snapshot_stop
+    if _snapshot_stop is not None:
+        _snapshot_stop.set()
+        _snapshot_stop = None
+    with _snapshot_lock:
+        snapshot, _read_snapshot = _read_snapshot, None
+        if snapshot is not None:
+            snapshot.keeper.close()
+    _close_read_connection()
+
+def _close_read_connection():
+    """Close this thread's connection to an in-memory snapshot, if it has one."""
+    conn = getattr(_local, "read_conn", None)
+    if conn is not None:
+        conn.close()
+        _local.read_conn, _local.read_uri = None, None
+
+def snapshot_version() -> Optional[int]:
+    """Taxonomy version of the in-memory copy being served, or None outside serving mode."""
+    snapshot = _read_snapshot
+    return snapshot.version if snapshot is not None else None
+
+def get_read_connection() -> sqlite3.Connection:
+    """
+    Connection for read-only queries: in serving mode a thread-local
+    connection to the current in-memory snapshot (reopened after a swap),
+    otherwise get_connection().
+    """
+    snapshot = _read_snapshot
+    conn = getattr(_local, "read_conn", None)
+    if snapshot is None:
+        # Left serving mode: release the old copy
+        if conn is not None:
+            _close_read_connection()
+        return get_connection()
+    if conn is not None and _local.read_uri == snapshot.uri:
+        return conn
+    _close_read_connection()
+    with _snapshot_lock:
+        # Re-read under the lock: the snapshot seen above may have been swapped out since
+        snapshot = _read_snapshot
+        if snapshot is None:
+            return get_connection()
+        conn = sqlite3.connect(snapshot.uri, uri=True, cached_statements=STATEMENT_CACHE_SIZE)
+    conn.execute("PRAGMA query_only=1")
+    _local.read_conn, _local.read_uri = conn, snapshot.uri
+    return conn
+
+class _AsyncConnectionPool:
+    """Up to `size` aiosqlite connections to one database, reused across requests."""
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self._slots = asyncio.Semaphore(size)
+        self._idle = []
+
+    async def _open(self):
+        import aiosqlite
+
+        if self.path not in _schema_ready:
+            # Schema creation/migration is a one-off; keep it off the event loop
+            await asyncio.to_thread(get_connection)
+        conn = await aiosqlite.connect(self.path, cached_statements=STATEMENT_CACHE_SIZE)
+        for pragma in CONNECTION_PRAGMAS:
+            await conn.execute(pragma)
+        return conn
+
+    @asynccontextmanager
+    async def connection(self):
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else await self._open()
+            try:
+                yield conn
+            except BaseException:
+                await conn.rollback()
+                raise
+            finally:
+                self._idle.append(conn)
+
+    async def close(self):
+        while self._idle:
+            await self._idle.pop().close()
+
+_async_pools = {}
+
+def async_connection():
+    """
+    Async context manager yielding a pooled aiosqlite connection to DB_NAME,
+    for code running on an event loop. Pools are per loop and database file;
+    connections get the same pragmas as get_connection(). Each aiosqlite
+    connection runs a worker thread, so call close_async_connections() before
+    the loop ends or the process will not exit.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _async_pools.get((DB_NAME, loop))
+    if pool is None:
+        pool = _async_pools[(DB_NAME, loop)] = _AsyncConnectionPool(DB_NAME, ASYNC_POOL_SIZE)
+    return pool.connection()
+
+async def close_async_connections():
+    """Close the pooled async connections of the running event loop (on shutdown)."""
+    loop = asyncio.get_running_loop()
+    for key in [key for key in _async_pools if key[1] is loop]:
+        await _async_pools.pop(key).close()
+
+def _create_schema(conn):
+    """Create (or migrate to) the normalized schema once per process and database file."""
+    with _schema_lock:
+        if DB_NAME in _schema_ready:
+            return
+        conn.execute("BEGIN")
+        try:
+            c = conn.cursor()
+            legacy = _rename_legacy_tables(c)
+            c.execute("""
+                CREATE TABLE IF NOT EXISTS careers (
+                    id INTEGER PRIMARY KEY,
+                    title TEXT NOT NULL UNIQUE,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            c.execute("""
+                CREATE TABLE IF NOT EXISTS skills (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL UNIQUE
+                )
+            """)
+            # rowid order is insertion order, which readers use to list a career's skills
+            c.execute("""
+                CREATE TABLE IF NOT EXISTS career_skill (
+                    career_id INTEGER NOT NULL REFERENCES careers(id) ON DELETE CASCADE,
+                    skill_id INTEGER NOT NULL REFERENCES skills(id) ON DELETE CASCADE,
+                    importance REAL NOT NULL DEFAULT 1.0,
+                    source TEXT NOT NULL DEFAULT 'manual',
+                    PRIMARY KEY (career_id, skill_id)
+                )
+            """)
+            c.execute("CREATE INDEX IF NOT EXISTS idx_career_skill_skill ON career_skill(skill_id, career_id)")
+            # Index entries end with the rowid, so this lists each career's links in
+            # insertion order without a sort (get_career_skills, iter_career_skill_links)
+            c.execute("CREATE INDEX IF NOT EXISTS idx_career_skill_career ON career_skill(career_id)")
+            c.execute("CREATE INDEX IF NOT EXISTS idx_career_skill_source ON career_skill(source)")
+            # Case-insensitive skill lookups (search_careers_by_skills)
+            c.execute("CREATE INDEX IF NOT EXISTS idx_skills_lower_name ON skills(lower(name))")
+            # Read-only stand-in for the old comma-joined table (train_index, train_model)
+            c.execute("""
+                CREATE VIEW IF NOT EXISTS career_skills AS
+                SELECT c.id AS id,
+                       c.title AS career_title,
+                       (SELECT GROUP_CONCAT(name) FROM (
+                            SELECT s.name FROM career_skill cs JOIN skills s ON s.id = cs.skill_id
+                            WHERE cs.career_id = c.id ORDER BY s.name
+                       )) AS skills,
+                       c.updated_at AS updated_at
+                FROM careers c
+                WHERE EXISTS (SELECT 1 FROM career_skill cs WHERE cs.career_id = c.id)
+            """)
+            init_version_table(c)
+            init_alias_table(c)
+            if legacy:
+                _migrate_legacy_rows(c, legacy)
+                bump_taxonomy_version(c)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        _schema_ready.add(DB_NAME)
+
+def _rename_legacy_tables(c) -> List[str]:
+    """
+    Move the pre-normalization tables out of the way:
+    skills(career, skill) -> legacy_skills, career_skills(career_title, skills) -> legacy_career_skills.
+    They are kept as a backup after their rows are migrated.
+    """
+    renamed = []
+    tables = {row[0] for row in c.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if "skills" in tables:
+        columns = {row[1] for row in c.execute("PRAGMA table_info(skills)")}
+        if "career" in columns:
+            c.execute("ALTER TABLE skills RENAME TO legacy_skills")
+            renamed.append("legacy_skills")
+    if "career_skills" in tables:
+        c.execute("ALTER TABLE career_skills RENAME TO legacy_career_skills")
+        renamed.append("legacy_career_skills")
+    return renamed
+
+def _migrate_legacy_rows(c, legacy_tables: List[str]):
+    """Copy rows from the renamed legacy tables into careers / skills / career_skill."""
+    if "legacy_skills" in legacy_tables:
+        c.execute("INSERT OR IGNORE INTO careers (title) SELECT DISTINCT career FROM legacy_skills")
+        c.execute("INSERT OR IGNORE INTO skills (name) SELECT DISTINCT skill FROM legacy_skills")
+        c.execute("""
+            INSERT OR IGNORE INTO career_skill (career_id, skill_id, source)
+            SELECT c.id, s.id, 'scraper'
+            FROM legacy_skills l
+            JOIN careers c ON c.title = l.career
+            JOIN skills s ON s.name = l.skill
+            ORDER BY l.id
+        """)
+    if "legacy_career_skills" in legacy_tables:
+        rows = c.execute(
+            "SELECT career_title, skills FROM legacy_career_skills WHERE career_title IS NOT NULL ORDER BY id"
+        ).fetchall()
+        _link_career_skills(c, [
+            (title, [s.strip() for s in (skills_str or "").split(",") if s.strip()], 1.0) for title, skills_str in rows
+        ], source="onet")
+    print(f"Migrated {', '.join(legacy_tables)} to the normalized career/skill schema")
+
+def _ids_for(c, table: str, column: str, values) -> Dict[str, int]:
+    """name -> id for `values` in careers/skills, inserting the missing ones."""
+    values = list(dict.fromkeys(values))
+    c.executemany(f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)", [(v,) for v in values])
+    ids = {}
+    for start in range(0, len(values), 500):
+        chunk = values[start:start + 500]
+        placeholders = ",".join("?" * len(chunk))
+        ids.update(c.execute(f"SELECT {column}, id FROM {table} WHERE {column} IN ({placeholders})", chunk))
+    return ids
+
+def _link_career_skills(c, entries, source: str):
+    """
+    Insert (career, [skills], importance) entries as career_skill links.
+    `importance` is either a number for all skills or a {skill: importance} dict.
+    Returns (careers created, links created).
+    """
+    changes = c.connection.total_changes
+    career_ids = _ids_for(c, "careers", "title", [career for career, _, _ in entries])
+    careers_created = c.connection.total_changes - changes
+    skill_ids = _ids_for(c, "skills", "name", [skill for _, skills, _ in entries for skill in skills])
+    links = []
+    for career, skills, importance in entries:
+        for skill in skills:
+            weight = importance.get(skill, 1.0) if isinstance(importance, dict) else importance
+            links.append((career_ids[career], skill_ids[skill], weight, source))
+    c.executemany(
+        "INSERT OR IGNORE INTO career_skill (career_id, skill_id, importance, source) VALUES (?, ?, ?, ?)",
+        links
+    )
+    links_created = max(c.rowcount, 0)
+    c.executemany(
+        "UPDATE careers SET updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+        [(i,) for i in set(career_ids.values())]
+    )
+    return careers_created, links_created
+
+def _delete_orphans(c):
+    c.execute("DELETE FROM careers WHERE id NOT IN (SELECT career_id FROM career_skill)")
+    c.execute("DELETE FROM skills WHERE id NOT IN (SELECT skill_id FROM career_skill)")
+
 def init_db():
     """Initialize the career skills database."""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS skills (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            career TEXT NOT NULL,
-            skill TEXT NOT NULL
+    get_connection()
+
+def init_version_table(cursor):
+    """Create the single-row taxonomy version counter if missing."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS taxonomy_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
         )
     """)
-    conn.commit()
-    conn.close()
+    cursor.execute("INSERT OR IGNORE INTO taxonomy_version (id, version) VALUES (1, 0)")
+
+def bump_taxonomy_version(cursor):
+    """
+    Increment the taxonomy version inside the caller's transaction.
+    Every writer of career/skill data calls this so other processes can
+    notice the change with a single-row read.
+    """
+    init_version_table(cursor)
+    cursor.execute("UPDATE taxonomy_version SET version = version + 1 WHERE id = 1")
+
+def get_taxonomy_version(conn=None) -> int:
+    """
+    Current taxonomy version (0 if nothing has been written yet).
+    """
+    if conn is None:
+        conn = get_connection()
+    try:
+        row = conn.execute("SELECT version FROM taxonomy_version WHERE id = 1").fetchone()
+        return row[0] if row else 0
+    except sqlite3.OperationalError:
+        return 0
+
+# One row per career in title order (the careers.title unique index), its
+# skills aggregated in insertion order from idx_career_skill_career: nothing
+# is sorted and only ~one row per career crosses into Python.
+CAREER_SKILLS_SQL = """
+    SELECT c.title, (
+        SELECT json_group_array(s.name)
+        FROM career_skill cs INDEXED BY idx_career_skill_career
+        JOIN skills s ON s.id = cs.skill_id
+        WHERE cs.career_id = c.id
+    )
+    FROM careers c
+    WHERE EXISTS (SELECT 1 FROM career_skill cs WHERE cs.career_id = c.id)
+    ORDER BY c.title
+"""
+
+# (key, result) of the last get_career_skills(); the key changes with the taxonomy version
+_career_skills_cache = (None, None)
+
+def _group_career_skills(rows):
+    return [(career, json.loads(skills)) for career, skills in rows]
 
 def get_career_skills():
     """
     Returns a list of (career_title, [skills]) from the database.
+    The result is built once per taxonomy version; callers get their own lists.
     """
-    init_db()
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT career, GROUP_CONCAT(skill) FROM skills GROUP BY career")
-    rows = c.fetchall()
-    conn.close()
-    return [(r[0], r[1].split(",")) if r[1] else (r[0], []) for r in rows]
+    global _career_skills_cache
+    conn = get_read_connection()
+    snapshot = _read_snapshot
+    key = ("snapshot", _local.read_uri) if snapshot is not None else (DB_NAME, get_taxonomy_version(conn))
+    cached_key, careers = _career_skills_cache
+    if cached_key != key:
+        careers = _group_career_skills(conn.execute(CAREER_SKILLS_SQL).fetchall())
+        _career_skills_cache = (key, careers)
+    return [(career, list(skills)) for career, skills in careers]
 
-def add_career_skills(career, skills):
+async def get_career_skills_async():
+    """get_career_skills() for code running on an event loop."""
+    if _read_snapshot is not None:
+        # In memory, but grouping every link is still CPU work: keep it off the loop
+        return await asyncio.to_thread(get_career_skills)
+    async with async_connection() as conn:
+        async with conn.execute(CAREER_SKILLS_SQL) as c:
+            rows = await c.fetchall()
+    return _group_career_skills(rows)
+
+def add_career_skills(career, skills, source: str = "scraper", importance: float = 1.0):
     """
     Adds a career and its skills to the database.
-    Avoids duplicates.
+    Skills are stored under their canonical names.
     """
-    init_db()
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    for skill in skills:
-        skill = skill.strip()
-        if skill:
-            c.execute("INSERT INTO skills (career, skill) VALUES (?, ?)", (career, skill))
-    conn.commit()
-    conn.close()
+    add_career_skills_bulk([(career, skills)], source, importance)
+    return True
+
+def add_career_skills_bulk(pairs: Iterable, source: str = "scraper", importance: float = 1.0,
+                           batch_size: int = INGEST_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Set-based ingestion of an iterable of (career, skills) pairs.
+    Pairs are consumed lazily in batches of `batch_size`; each batch is one
+    transaction of executemany INSERT OR IGNOREs, so links that already exist
+    are skipped by the unique constraints rather than checked row by row.
+    Returns counts: pairs read, careers and career-skill links actually created.
+    """
+    pairs = iter(pairs)
+    stats = {"pairs": 0, "careers_created": 0, "links_created": 0}
+    while True:
+        batch = list(islice(pairs, batch_size))
+        if not batch:
+            break
+        with transaction() as c:
+            careers_created, links_created = _link_career_skills(c, [
+                (career.strip(), canonicalize_skills(skills), importance) for career, skills in batch
+            ], source)
+            bump_taxonomy_version(c)
+        stats["pairs"] += len(batch)
+        stats["careers_created"] += careers_created
+        stats["links_created"] += links_created
+    return stats
+
+def add_career_skill_links_bulk(links: Iterable, batch_size: int = INGEST_BATCH_SIZE * 100) -> int:
+    """
+    Ingest an iterable of (career, skill, importance, source) link rows, as
+    produced by iter_career_skill_links(), in transactions of `batch_size` rows.
+    Names are stored exactly as given so a snapshot restores what was exported.
+    Returns the number of rows read.
+    """
+    links = iter(links)
+    ingested = 0
+    while True:
+        batch = list(islice(links, batch_size))
+        if not batch:
+            break
+        grouped = {}
+        for career, skill, importance, source in batch:
+            skills, weights = grouped.setdefault((source, career), ([], {}))
+            skills.append(skill)
+            weights[skill] = importance if importance is not None else 1.0
+        with transaction() as c:
+            for source in {source for source, _ in grouped}:
+                _link_career_skills(c, [
+                    (career, skills, weights) for (s, career), (skills, weights) in grouped.items() if s == source
+                ], source)
+            bump_taxonomy_version(c)
+        ingested += len(batch)
+    return ingested
+
+def iter_career_skill_links(chunk_size: int = 10000):
+    """
+    Stream every (career, skill, importance, source) link, fetched `chunk_size`
+    rows at a time, in career-title then insertion order.
+    """
+    c = get_connection().cursor()
+    # CROSS JOIN keeps careers (in title index order) as the outer loop, so the
+    # ORDER BY is served by the indexes instead of a temp B-tree over every link
+    c.execute("""
+        SELECT c.title, s.name, cs.importance, cs.source
+        FROM careers c
+        CROSS JOIN career_skill cs INDEXED BY idx_career_skill_career
+        JOIN skills s ON s.id = cs.skill_id
+        WHERE cs.career_id = c.id
+        ORDER BY c.title, cs.rowid
+    """)
+    while True:
+        rows = c.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield from rows
+
+def replace_source_career_skills(entries, source: str):
+    """
+    Replace every link contributed by `source` (e.g. "onet") with `entries`,
+    a list of (career, [skills], importance) where importance is a number or a
+    {skill: importance} dict. Links from other sources are left alone.
+    """
+    with transaction() as c:
+        c.execute("DELETE FROM career_skill WHERE source = ?", (source,))
+        _link_career_skills(c, [
+            (career, canonicalize_skills(skills), importance) for career, skills, importance in entries
+        ], source)
+        _delete_orphans(c)
+        bump_taxonomy_version(c)
+
+def clear_career_skills(source: str = "scraper"):
+    """
+    Remove all career/skill links contributed by `source`.
+    """
+    replace_source_career_skills([], source)
 
 def get_career_count():
     """
     Returns the number of unique careers in the database.
     """
-    init_db()
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT COUNT(DISTINCT career) FROM skills")
-    count = c.fetchone()[0]
-    conn.close()
-    return count
+    c = get_read_connection().cursor()
+    c.execute("SELECT COUNT(DISTINCT career_id) FROM career_skill")
+    return c.fetchone()[0]
+
+async def get_career_count_async():
+    """get_career_count() for code running on an event loop."""
+    if _read_snapshot is not None:
+        return await asyncio.to_thread(get_career_count)
+    async with async_connection() as conn:
+        async with conn.execute("SELECT COUNT(DISTINCT career_id) FROM career_skill") as c:
+            return (await c.fetchone())[0]
 
 def get_skills_by_career(career: str) -> List[str]:
     """
     Get all skills for a specific career.
     """
-    init_db()
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT skill FROM skills WHERE career = ?", (career,))
-    skills = [row[0] for row in c.fetchall()]
-    conn.close()
-    return skills
+    c = get_read_connection().cursor()
+    c.execute("""
+        SELECT s.name
+        FROM careers c
+        JOIN career_skill cs ON cs.career_id = c.id
+        JOIN skills s ON s.id = cs.skill_id
+        WHERE c.title = ?
+        ORDER BY cs.rowid
+    """, (career,))
+    return [row[0] for row in c.fetchall()]
 
 def get_careers_by_skill(skill: str) -> List[str]:
     """
     Get all careers that require a specific skill.
     """
-    init_db()
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT DISTINCT career FROM skills WHERE skill = ?", (skill,))
-    careers = [row[0] for row in c.fetchall()]
-    conn.close()
-    return careers
+    c = get_read_connection().cursor()
+    c.execute("""
+        SELECT c.title
+        FROM skills s
+        JOIN career_skill cs ON cs.skill_id = s.id
+        JOIN careers c ON c.id = cs.career_id
+        WHERE s.name = ?
+    """, (skill,))
+    return [row[0] for row in c.fetchall()]
 
 def get_all_skills() -> List[str]:
     """
     Get all unique skills from the database.
     """
-    init_db()
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT DISTINCT skill FROM skills")
-    skills = [row[0] for row in c.fetchall()]
-    conn.close()
-    return skills
+    c = get_read_connection().cursor()
+    c.execute("SELECT name FROM skills WHERE id IN (SELECT skill_id FROM career_skill)")
+    return [row[0] for row in c.fetchall()]
 
 def get_all_careers() -> List[str]:
     """
     Get all unique careers from the database.
     """
-    init_db()
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT DISTINCT career FROM skills")
-    careers = [row[0] for row in c.fetchall()]
-    conn.close()
-    return careers
+    c = get_read_connection().cursor()
+    c.execute("SELECT title FROM careers WHERE id IN (SELECT career_id FROM career_skill)")
+    return [row[0] for row in c.fetchall()]
 
 def add_job_skills_from_scraper(job_title: str, skills: List[str]):
     """
     Add skills from job scraper to the career skills database.
     This helps build a comprehensive skills database from real job postings.
     """
-    init_db()
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    
     # Clean job title to use as career name
     career_name = job_title.strip()
-    
-    for skill in skills:
-        skill = skill.strip().lower()
-        if skill and len(skill) > 1:  # Avoid single characters
-            # Check if this skill-career combination already exists
-            c.execute("SELECT id FROM skills WHERE career = ? AND skill = ?", (career_name, skill))
-            if not c.fetchone():
-                c.execute("INSERT INTO skills (career, skill) VALUES (?, ?)", (career_name, skill))
-    
-    conn.commit()
-    conn.close()
+    # Avoid single characters; existing career-skill links are left as they are
+    job_skills = [skill for skill in canonicalize_skills(skills) if len(skill) > 1]
+    add_career_skills_bulk([(career_name, job_skills)], source="scraper")
 
 def get_skill_frequency() -> Dict[str, int]:
     """
     Get the frequency of each skill across all careers.
     """
-    init_db()
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT skill, COUNT(*) as frequency FROM skills GROUP BY skill ORDER BY frequency DESC")
-    skill_freq = {row[0]: row[1] for row in c.fetchall()}
-    conn.close()
-    return skill_freq
+    c = get_read_connection().cursor()
+    c.execute("""
+        SELECT s.name, COUNT(*) AS frequency
+        FROM career_skill cs JOIN skills s ON s.id = cs.skill_id
+        GROUP BY cs.skill_id
+        ORDER BY frequency DESC
+    """)
+    return {row[0]: row[1] for row in c.fetchall()}
 
 def get_career_skill_matrix() -> Dict[str, List[str]]:
     """
     Get a matrix of careers and their skills.
     """
-    init_db()
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT career, GROUP_CONCAT(skill) FROM skills GROUP BY career")
-    matrix = {}
-    for row in c.fetchall():
-        career, skills_str = row
-        skills = skills_str.split(",") if skills_str else []
-        matrix[career] = skills
-    conn.close()
-    return matrix
-
-def search_careers_by_skills(user_skills: List[str], min_match: int = 1) -> List[Dict[str, Any]]:
+    return dict(get_career_skills())
+
+def search_careers_by_skills(user_skills: List[str], min_match: int = 1,
+                             top_k: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Search for careers that match user skills.
-    Returns careers with match count and matching skills.
+    Returns careers with match count and matching skills, best first
+    (all of them, or only the best `top_k`).
+    
+    Only the career_skill links of the user's skills are read (through the
+    skill index), instead of every career's full skill list.
     """
-    init_db()
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
+    # Canonicalize user skills so "nodejs" matches a stored "node.js"
+    user_skills_lower = canonicalize_skills(user_skills)
+    if not user_skills_lower:
+        return []
     
-    # Convert skills to lowercase for matching
-    user_skills_lower = [skill.lower() for skill in user_skills]
+    placeholders = ",".join("?" * len(user_skills_lower))
+    c = get_read_connection().cursor()
+    c.execute(f"""
+        SELECT c.title, lower(s.name),
+               (SELECT COUNT(*) FROM career_skill t WHERE t.career_id = cs.career_id)
+        FROM skills s
+        JOIN career_skill cs ON cs.skill_id = s.id
+        JOIN careers c ON c.id = cs.career_id
+        WHERE lower(s.name) IN ({placeholders})
+        ORDER BY c.title, cs.rowid
+    """, user_skills_lower)
     
-    # Get all careers and their skills
-    c.execute("SELECT career, GROUP_CONCAT(skill) FROM skills GROUP BY career")
     matches = []
-    
-    for row in c.fetchall():
-        career, skills_str = row
-        career_skills = [skill.lower() for skill in skills_str.split(",")] if skills_str else []
-        
-        # Find matching skills
-        matching_skills = [skill for skill in career_skills if skill in user_skills_lower]
-        match_count = len(matching_skills)
-        
+    for career, rows in groupby(c.fetchall(), key=itemgetter(0)):
+        rows = list(rows)
+        match_count = len(rows)
         if match_count >= min_match:
+            total_skills = rows[0][2]
             matches.append({
                 'career': career,
                 'match_count': match_count,
-                'matching_skills': matching_skills,
-                'total_skills': len(career_skills),
-                'match_percentage': (match_count / len(career_skills)) * 100 if career_skills else 0
+                'matching_skills': [skill for _, skill, _ in rows],
+                'total_skills': total_skills,
+                'match_percentage': (match_count / total_skills) * 100
             })
     
-    conn.close()
-    
-    # Sort by match count and percentage
-    matches.sort(key=lambda x: (x['match_count'], x['match_percentage']), reverse=True)
+    # Sort by match count and percentage (ties keep title order)
+    rank = lambda x: (x['match_count'], x['match_percentage'])
+    if top_k is not None:
+        return heapq.nlargest(top_k, matches, key=rank)
+    matches.sort(key=rank, reverse=True)
     return matches
 
 def populate_sample_data():
@@ -212,8 +730,7 @@ def populate_sample_data():
         "Sales Representative": ["sales", "crm", "negotiation", "communication", "lead generation", "customer service"]
     }
     
-    for career, skills in sample_data.items():
-        add_career_skills(career, skills)
+    add_career_skills_bulk(sample_data.items())
     
     print(f"Added {len(sample_data)} careers with skills to the database")
 
@@ -221,18 +738,7 @@ def export_to_json(filename: str = "career_skills.json"):
     """
     Export career skills data to JSON file.
     """
-    init_db()
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT career, GROUP_CONCAT(skill) FROM skills GROUP BY career")
-    
-    data = {}
-    for row in c.fetchall():
-        career, skills_str = row
-        skills = skills_str.split(",") if skills_str else []
-        data[career] = skills
-    
-    conn.close()
+    data = dict(get_career_skills())
     
     with open(filename, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
@@ -247,8 +753,7 @@ def import_from_json(filename: str = "career_skills.json"):
         with open(filename, 'r', encoding='utf-8') as f:
             data = json.load(f)
         
-        for career, skills in data.items():
-            add_career_skills(career, skills)
+        add_career_skills_bulk(data.items())
         
         print(f"Imported {len(data)} careers from {filename}")
     except FileNotFoundError:
@@ -5,11 +5,16 @@ Provides interactive career guidance through natural language processing
 """
 import json
 import re
+import inspect
 from typing import Dict, List, Any, Optional
 from datetime import datetime
-from db import get_career_skills, get_career_count
+from starlette.concurrency import run_in_threadpool
+from db import get_career_skills_async
 import random
 
+# Minimum fuzz.ratio for a chat phrase to count as a misspelling of a taxonomy skill
+TYPO_SCORE_CUTOFF = 80
+
 class CareerGuidanceChatbot:
     def __init__(self):
         self.conversation_state = {}
@@ -37,7 +42,7 @@ class CareerGuidanceChatbot:
         
         return self.handle_greeting(user_id, "")
     
-    def process_message(self, user_id: str, message: str) -> Dict[str, Any]:
+    async def process_message(self, user_id: str, message: str) -> Dict[str, Any]:
         """Process user message and return appropriate response"""
         if user_id not in self.conversation_state:
             return self.start_conversation(user_id)
@@ -54,6 +59,9 @@ class CareerGuidanceChatbot:
         handler = self.guidance_flow.get(current_stage, self.handle_general_query)
         
         response = handler(user_id, message)
+        # Handlers that read the database or run the NLP models are coroutines
+        if inspect.isawaitable(response):
+            response = await response
         
         # Add bot response to history
         self.conversation_state[user_id]['conversation_history'].append({
@@ -107,9 +115,10 @@ class CareerGuidanceChatbot:
             'progress': 25
         }
     
-    def handle_skills(self, user_id: str, message: str) -> Dict[str, Any]:
+    async def handle_skills(self, user_id: str, message: str) -> Dict[str, Any]:
         """Extract and process user skills"""
-        skills = self.extract_skills_from_text(message)
+        # spaCy parsing and MiniLM encoding are CPU-bound; keep them off the event loop
+        skills = await run_in_threadpool(self.extract_skills_from_text, message)
         self.conversation_state[user_id]['collected_data']['skills'] = skills
         
         response_message = f"Excellent! I've identified these skills: {', '.join(skills[:8])}{'...' if len(skills) > 8 else ''}. 💪\n\n"
@@ -194,12 +203,12 @@ class CareerGuidanceChatbot:
             'action': 'generate_recommendations'
         }
     
-    def generate_recommendations(self, user_id: str, message: str = "") -> Dict[str, Any]:
+    async def generate_recommendations(self, user_id: str, message: str = "") -> Dict[str, Any]:
         """Generate personalized career recommendations"""
         user_data = self.conversation_state[user_id]['collected_data']
         
         # Get career recommendations based on collected data
-        recommendations = self.get_personalized_careers(user_data)
+        recommendations = await self.get_personalized_careers(user_data)
         
         response_message = "🎉 Here are your personalized career recommendations:\n\n"
         
@@ -267,8 +276,21 @@ class CareerGuidanceChatbot:
     
     def extract_skills_from_text(self, text: str) -> List[str]:
         """Extract skills from user text"""
-        from resume_parser import extract_skills
-        return extract_skills(text) or ['Communication', 'Problem Solving']
+        from resume_parser import extract_skills, split_skill_phrases
+        from skill_embeddings import map_to_taxonomy
+        from skills_taxonomy import find_similar_skills_batch
+        skills = extract_skills(text)
+        phrases = split_skill_phrases(text)
+        # Free-text mentions ("ML", "gcp") mapped onto the taxonomy
+        skills += [s for s in map_to_taxonomy(phrases) if s not in skills]
+        # Misspelt mentions ("pyhton", "javscript") neither lookup matched, fuzzy-matched in one batch
+        found = {s.lower() for s in skills}
+        unmatched = [p for p in phrases if p.lower() not in found]
+        for matches in find_similar_skills_batch(unmatched, limit=1, score_cutoff=TYPO_SCORE_CUTOFF):
+            if matches and matches[0][0] not in found:
+                found.add(matches[0][0])
+                skills.append(matches[0][0])
+        return skills or ['Communication', 'Problem Solving']
     
     def extract_academic_info(self, text: str) -> Dict[str, str]:
         """Extract academic background information"""
@@ -336,9 +358,9 @@ class CareerGuidanceChatbot:
         else:
             return 'Entry Level'
     
-    def get_personalized_careers(self, user_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def get_personalized_careers(self, user_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Generate personalized career recommendations based on user data"""
-        career_skills_data = get_career_skills()
+        career_skills_data = await get_career_skills_async()
         user_skills = set(skill.lower() for skill in user_data.get('skills', []))
         user_interests = [interest.lower() for interest in user_data.get('interests', [])]
         
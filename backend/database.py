@@ -1,10 +1,24 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Float
-from sqlalchemy.orm import sessionmaker, relationship, declarative_base
-from datetime import datetime
+from sqlalchemy import create_engine, Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, Boolean, Float, Index, LargeBinary, UniqueConstraint, insert, select, update, delete, func, case, or_, and_, text, literal_column
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.orm import sessionmaker, relationship, declarative_base, selectinload
+from datetime import date, datetime, timedelta
+from itertools import islice
 import os
+import re
+import json
+import base64
+import heapq
+import time
+import numpy as np
+from job_dedup import job_signature, band_buckets, match_near_duplicates, MAX_BUCKET_SIZE
 
 Base = declarative_base()
 
+# Resolved against this file, not the cwd, so every script uses the same database
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(BASE_DIR, "career_guidance.db")
+DB_URL = f"sqlite:///{DB_PATH}"
+
 # Define database models
 class User(Base):
     __tablename__ = "users"
@@ -45,6 +59,8 @@ class Job(Base):
     
     # Relationships
     skills = relationship("Skill", secondary="job_skills", back_populates="jobs")
+    # Every source this opening was scraped from, including near-duplicates merged into it
+    sources = relationship("JobSource", order_by="JobSource.id", cascade="all, delete-orphan")
 
 class JobSkill(Base):
     __tablename__ = "job_skills"
@@ -52,6 +68,36 @@ class JobSkill(Base):
     job_id = Column(Integer, ForeignKey("jobs.id"), primary_key=True)
     skill_id = Column(Integer, ForeignKey("skills.id"), primary_key=True)
 
+    # The primary key serves job -> skills; this serves skill -> jobs lookups
+    __table_args__ = (Index("ix_job_skills_skill_job", "skill_id", "job_id"),)
+
+class JobSource(Base):
+    __tablename__ = "job_sources"
+    
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False, index=True)
+    source = Column(String(50), nullable=False)
+    # '' rather than NULL when the posting has no url: UNIQUE treats NULLs as distinct
+    url = Column(String(500), nullable=True, default="")
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (UniqueConstraint("job_id", "source", "url"),)
+
+class JobFingerprint(Base):
+    """MinHash signature of a job (see job_dedup.py)."""
+    __tablename__ = "job_fingerprints"
+    
+    job_id = Column(Integer, ForeignKey("jobs.id"), primary_key=True)
+    signature = Column(LargeBinary, nullable=False)  # uint32 bytes
+
+class JobLSHBucket(Base):
+    """LSH band buckets of job fingerprints; jobs sharing a bucket are duplicate candidates."""
+    __tablename__ = "job_lsh_buckets"
+    
+    bucket = Column(BigInteger, primary_key=True)
+    band = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey("jobs.id"), primary_key=True)
+
 class Education(Base):
     __tablename__ = "education"
     
@@ -78,39 +124,292 @@ class CareerRecommendation(Base):
     __tablename__ = "career_recommendations"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
-    job_id = Column(Integer, ForeignKey("jobs.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    job_id = Column(Integer, ForeignKey("jobs.id"), index=True)
     similarity_score = Column(Float, nullable=True)
     matching_skills = Column(Text, nullable=True)  # JSON string of matching skills
     missing_skills = Column(Text, nullable=True)   # JSON string of missing skills
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class Embedding(Base):
+    """Cached embedding of a user resume or a job, for recommendations.py."""
+    __tablename__ = "embeddings"
+    
+    kind = Column(String(10), primary_key=True)  # user, job
+    entity_id = Column(Integer, primary_key=True)
+    # updated_at of the user/job when it was embedded; a mismatch means re-embed
+    source_updated_at = Column(DateTime, nullable=True)
+    vector = Column(LargeBinary, nullable=False)  # float32 bytes
+
+class SkillDemand(Base):
+    """Number of stored jobs requiring each skill, kept current by triggers on job_skills."""
+    __tablename__ = "skill_demand"
+
+    skill_id = Column(Integer, ForeignKey("skills.id"), primary_key=True)
+    job_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (Index("ix_skill_demand_count", "job_count"),)
+
+class SkillDemandDaily(Base):
+    """Jobs requiring each skill, bucketed by the day the job was stored and its (lowercased) source."""
+    __tablename__ = "skill_demand_daily"
+
+    # skill_id first: trend queries sum each skill's days in one pass, without a sort
+    skill_id = Column(Integer, ForeignKey("skills.id"), primary_key=True)
+    day = Column(String(10), primary_key=True)  # YYYY-MM-DD of jobs.created_at (UTC)
+    source = Column(String(50), primary_key=True)
+    job_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = {"sqlite_with_rowid": False}
+
 # Set up relationships
 Skill.jobs = relationship("Job", secondary="job_skills", back_populates="skills")
 
+# /api/jobs lists newest posted_date first, id breaking ties. posted_date is
+# scraped text and may be NULL; coalescing it keeps the keyset order total.
+JOB_LIST_SORT = func.coalesce(Job.posted_date, literal_column("''"))
+# Filter expressions of list_jobs: case-insensitive text, NULL is_active as active
+JOB_LIST_FILTERS = {
+    "source": func.lower(Job.source),
+    "location": func.lower(Job.location),
+    "job_type": func.lower(Job.job_type),
+    "experience_level": func.lower(Job.experience_level),
+    "is_active": func.coalesce(Job.is_active, literal_column("1")),
+}
+# One (filter, sort key, id) index per filter, so a filtered page is a range
+# scan that stops after `limit` rows at any depth
+Index("ix_jobs_posted_id", JOB_LIST_SORT, Job.id)
+for _name, _expr in JOB_LIST_FILTERS.items():
+    Index(f"ix_jobs_{_name}_posted_id", _expr, JOB_LIST_SORT, Job.id)
+JOB_LIST_COLUMNS = (Job.id, Job.title, Job.company, Job.location, Job.source, Job.job_type, Job.experience_level,
+                    Job.salary, Job.posted_date, Job.url, Job.application_url, Job.is_active)
+MAX_LIST_LIMIT = 100
+# Connections kept open by the async engine
+ASYNC_POOL_SIZE = 8
+
+# Jobs per transaction in add_jobs_bulk
+BULK_CHUNK_SIZE = 1000
+# SQLite's default limit on bound parameters is 999 on older builds
+IN_CLAUSE_BATCH = 500
+JOB_COLUMNS = frozenset(Job.__table__.columns.keys()) - {"id"}
+# Fields of the ML training records, followed by "skills"
+TRAINING_COLUMNS = (Job.id.label("job_id"), Job.title, Job.company, Job.location, Job.description, Job.source,
+                    Job.job_type, Job.experience_level, Job.salary, Job.application_url)
+
+# Full-text index over jobs: an external-content FTS5 table (the text lives in
+# jobs only) kept in sync by triggers, so every writer is covered.
+JOBS_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        title, company, description,
+        content='jobs', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts (rowid, title, company, description)
+        VALUES (new.id, new.title, new.company, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts (jobs_fts, rowid, title, company, description)
+        VALUES ('delete', old.id, old.title, old.company, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF title, company, description ON jobs BEGIN
+        INSERT INTO jobs_fts (jobs_fts, rowid, title, company, description)
+        VALUES ('delete', old.id, old.title, old.company, old.description);
+        INSERT INTO jobs_fts (rowid, title, company, description)
+        VALUES (new.id, new.title, new.company, new.description);
+    END""",
+]
+# bm25 weights of the title, company and description columns
+JOBS_FTS_WEIGHTS = (10.0, 4.0, 1.0)
+MAX_SEARCH_LIMIT = 100
+
+# Skill demand counters: every job_skills row adds one to its skill's total and
+# to the (day, source, skill) bucket of its job. Triggers cover add_job,
+# add_jobs_bulk and the merges of near-duplicates, which move job_skills rows
+# to the canonical job and delete the rest before deleting the jobs.
+_SKILL_DEMAND_ADD = """
+        INSERT INTO skill_demand (skill_id, job_count) VALUES ({row}.skill_id, 1)
+        ON CONFLICT (skill_id) DO UPDATE SET job_count = job_count + 1;
+        INSERT INTO skill_demand_daily (skill_id, day, source, job_count)
+        SELECT {row}.skill_id, coalesce(date(created_at), date('now')), lower(source), 1
+        FROM jobs WHERE id = {row}.job_id
+        ON CONFLICT (skill_id, day, source) DO UPDATE SET job_count = job_count + 1;"""
+_SKILL_DEMAND_REMOVE = """
+        UPDATE skill_demand SET job_count = job_count - 1 WHERE skill_id = {row}.skill_id;
+        UPDATE skill_demand_daily SET job_count = job_count - 1
+        WHERE (skill_id, day, source) IN (
+            SELECT {row}.skill_id, coalesce(date(created_at), date('now')), lower(source)
+            FROM jobs WHERE id = {row}.job_id
+        );"""
+SKILL_DEMAND_DDL = [
+    f"""CREATE TRIGGER IF NOT EXISTS skill_demand_insert AFTER INSERT ON job_skills BEGIN
+        {_SKILL_DEMAND_ADD.format(row="new")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS skill_demand_delete AFTER DELETE ON job_skills BEGIN
+        {_SKILL_DEMAND_REMOVE.format(row="old")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS skill_demand_update AFTER UPDATE OF job_id, skill_id ON job_skills BEGIN
+        {_SKILL_DEMAND_REMOVE.format(row="old")}
+        {_SKILL_DEMAND_ADD.format(row="new")}
+    END""",
+]
+SKILL_DEMAND_BACKFILL = [
+    """INSERT INTO skill_demand (skill_id, job_count)
+       SELECT skill_id, COUNT(*) FROM job_skills GROUP BY skill_id""",
+    """INSERT INTO skill_demand_daily (skill_id, day, source, job_count)
+       SELECT js.skill_id, coalesce(date(j.created_at), date('now')), lower(j.source), COUNT(*)
+       FROM job_skills js JOIN jobs j ON j.id = js.job_id
+       GROUP BY 1, 2, 3""",
+]
+# A job's skills are part of what recommendations.py embeds, so adding, moving
+# or removing job_skills rows touches jobs.updated_at (in the microsecond
+# format SQLAlchemy stores) and its cached embedding is recomputed.
+_JOB_TOUCH = """
+        UPDATE jobs SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now') || '000' WHERE id = {row}.job_id;"""
+JOB_SKILLS_TOUCH_DDL = [
+    f"""CREATE TRIGGER IF NOT EXISTS job_skills_touch_insert AFTER INSERT ON job_skills BEGIN
+        {_JOB_TOUCH.format(row="new")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS job_skills_touch_delete AFTER DELETE ON job_skills BEGIN
+        {_JOB_TOUCH.format(row="old")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS job_skills_touch_update AFTER UPDATE OF job_id, skill_id ON job_skills BEGIN
+        {_JOB_TOUCH.format(row="old")}
+        {_JOB_TOUCH.format(row="new")}
+    END""",
+]
+MAX_TREND_LIMIT = 100
+MAX_TREND_DAYS = 365
+# Skills needing fewer jobs than this in the current window are left out of
+# the fastest-growing list, where a jump from 0 to 1 would top it
+MIN_TREND_COUNT = 3
+_FTS_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def fts_query(query: str):
+    """
+    FTS5 MATCH expression for free text typed by a user: every word must
+    match, the last one as a prefix. Words are quoted, so FTS5 operators and
+    punctuation in the input cannot cause syntax errors. None if no words.
+    """
+    words = _FTS_TOKEN_RE.findall(query or "")
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words) + "*"
+
+def encode_cursor(after: tuple) -> str:
+    """Opaque page cursor for the (sort key, id) of the last job of a page."""
+    return base64.urlsafe_b64encode(json.dumps(list(after)).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    """Inverse of encode_cursor; ValueError if the cursor was not made by it."""
+    try:
+        sort_key, job_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(sort_key, str) or not isinstance(job_id, int):
+        raise ValueError("Invalid cursor")
+    return sort_key, job_id
+
 class DatabaseManager:
-    def __init__(self, db_url="sqlite:///./career_guidance.db"):
-        self.engine = create_engine(db_url, echo=True)
+    def __init__(self, db_url=DB_URL, echo=False, recreate=False):
+        # echo=True logs every SQL statement; only turn it on for debugging
+        self.engine = create_engine(db_url, echo=echo)
+        self.echo = echo
+        self._async_engine = None
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        # skill name -> id, filled by add_jobs_bulk
+        self._skill_ids = {}
         
-        # Recreate tables to ensure schema is up to date
-        self.recreate_tables()
+        # Stored jobs, users and recommendations survive restarts unless recreate=True
+        if recreate:
+            self.recreate_tables()
+        else:
+            self.create_tables()
     
     def recreate_tables(self):
         """Drop and recreate all tables to ensure schema is current."""
         try:
             # Drop all tables
+            with self.engine.begin() as conn:
+                conn.execute(text("DROP TABLE IF EXISTS jobs_fts"))
             Base.metadata.drop_all(self.engine)
             # Create all tables
             Base.metadata.create_all(self.engine)
+            self.create_search_index()
+            self.create_demand_counters()
             print("Database tables recreated successfully!")
         except Exception as e:
             print(f"Error recreating tables: {e}")
     
     def create_tables(self):
-        """Create all tables."""
+        """Create missing tables, and indexes added to existing tables since they were created."""
         Base.metadata.create_all(self.engine)
+        # IF NOT EXISTS rather than checkfirst: reflection cannot see expression indexes
+        with self.engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    conn.execute(CreateIndex(index, if_not_exists=True))
+            # Sources stored with a NULL url before it was coalesced to '';
+            # rows left NULL after the update duplicate one that already has ''
+            conn.execute(text("UPDATE OR IGNORE job_sources SET url = '' WHERE url IS NULL"))
+            conn.execute(text("DELETE FROM job_sources WHERE url IS NULL"))
+        self.create_search_index()
+        self.create_demand_counters()
+        self.create_skill_change_triggers()
+    
+    def create_search_index(self):
+        """Create the jobs_fts full-text index and its triggers, indexing existing jobs on first creation."""
+        if self.engine.dialect.name != "sqlite":
+            return
+        with self.engine.begin() as conn:
+            exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'jobs_fts'")).first()
+            for ddl in JOBS_FTS_DDL:
+                conn.execute(text(ddl))
+            if not exists:
+                conn.execute(text("INSERT INTO jobs_fts (jobs_fts) VALUES ('rebuild')"))
+
+    def create_demand_counters(self):
+        """Create the skill demand triggers, counting the jobs already stored on first creation."""
+        if self.engine.dialect.name != "sqlite":
+            return
+        with self.engine.begin() as conn:
+            exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'skill_demand_insert'")).first()
+            for ddl in SKILL_DEMAND_DDL:
+                conn.execute(text(ddl))
+            if not exists:
+                conn.execute(delete(SkillDemand))
+                conn.execute(delete(SkillDemandDaily))
+                for sql in SKILL_DEMAND_BACKFILL:
+                    conn.execute(text(sql))
     
+    def create_skill_change_triggers(self):
+        """Create the triggers that touch a job's updated_at when its job_skills rows change."""
+        if self.engine.dialect.name != "sqlite":
+            return
+        with self.engine.begin() as conn:
+            for ddl in JOB_SKILLS_TOUCH_DDL:
+                conn.execute(text(ddl))
+    
+    @property
+    def async_engine(self):
+        """
+        Pooled async engine on the same database (aiosqlite for SQLite), for
+        code running on the event loop. Created on first use, so scripts that
+        only use the sync engine do not need aiosqlite and greenlet.
+        """
+        if self._async_engine is None:
+            from sqlalchemy.ext.asyncio import create_async_engine
+            url = self.engine.url
+            if url.get_backend_name() == "sqlite":
+                url = url.set(drivername="sqlite+aiosqlite")
+            self._async_engine = create_async_engine(url, echo=self.echo, pool_size=ASYNC_POOL_SIZE)
+        return self._async_engine
+
+    async def dispose_async(self):
+        """Close the async engine's pooled connections (on application shutdown)."""
+        if self._async_engine is not None:
+            await self._async_engine.dispose()
+            self._async_engine = None
+
     def get_session(self):
         """Get a database session."""
         return self.SessionLocal()
@@ -172,12 +471,13 @@ class DatabaseManager:
             session.add(job)
             session.flush()  # Get the job ID
             
-            # Add skills
-            for skill_name in skills_data:
-                if skill_name:
-                    skill = self.add_skill(skill_name)
-                    if skill:
-                        job.skills.append(skill)
+            # Add skills in this session: a second session would wait on our write lock
+            for skill_name in dict.fromkeys(s for s in skills_data if s):
+                skill = session.query(Skill).filter(Skill.name == skill_name).first()
+                if not skill:
+                    skill = Skill(name=skill_name)
+                    session.add(skill)
+                job.skills.append(skill)
             
             session.commit()
             session.refresh(job)
@@ -188,45 +488,474 @@ class DatabaseManager:
         finally:
             session.close()
     
-    def get_jobs_by_skills(self, skills: list, limit: int = 20):
-        """Get jobs that match the given skills."""
+    def _resolve_skill_ids(self, session, names):
+        """
+        name -> id for `names`, from the in-memory cache first; the remaining
+        names are looked up and the missing ones created with one batched insert.
+        """
+        missing = [name for name in set(names) if name not in self._skill_ids]
+        found = {}
+        for start in range(0, len(missing), IN_CLAUSE_BATCH):
+            part = missing[start:start + IN_CLAUSE_BATCH]
+            found.update(session.execute(select(Skill.name, Skill.id).where(Skill.name.in_(part))).all())
+        new_names = [name for name in missing if name not in found]
+        if new_names:
+            rows = session.execute(
+                insert(Skill).returning(Skill.name, Skill.id, sort_by_parameter_order=True),
+                [{"name": name} for name in new_names]
+            ).all()
+            found.update(rows)
+        self._skill_ids.update(found)
+        return len(new_names)
+
+    def _existing_job_keys(self, session, jobs):
+        """(title, company, source) of the jobs in `jobs` that are already stored."""
+        titles = list({job["title"] for job in jobs})
+        keys = set()
+        for start in range(0, len(titles), IN_CLAUSE_BATCH):
+            part = titles[start:start + IN_CLAUSE_BATCH]
+            keys.update(session.execute(
+                select(Job.title, Job.company, Job.source).where(Job.title.in_(part))
+            ).all())
+        return keys
+
+    def _near_duplicate_candidates(self, session, signatures):
+        """
+        Stored jobs sharing an LSH bucket with any of `signatures`: (buckets, signatures).
+        Buckets with more than MAX_BUCKET_SIZE jobs are left out.
+        """
+        wanted = {key for signature in signatures for key in band_buckets(signature)}
+        buckets = list({bucket for _, bucket in wanted})
+        stored_buckets = {}
+        for start in range(0, len(buckets), IN_CLAUSE_BATCH):
+            part = buckets[start:start + IN_CLAUSE_BATCH]
+            # Sizes first (from the primary key index), then the members of small buckets only
+            sizes = session.execute(
+                select(JobLSHBucket.bucket, JobLSHBucket.band)
+                .where(JobLSHBucket.bucket.in_(part))
+                .group_by(JobLSHBucket.bucket, JobLSHBucket.band)
+                .having(func.count() <= MAX_BUCKET_SIZE)
+            ).all()
+            small = [bucket for bucket, band in sizes if (band, bucket) in wanted]
+            if not small:
+                continue
+            for bucket, band, job_id in session.execute(
+                select(JobLSHBucket.bucket, JobLSHBucket.band, JobLSHBucket.job_id).where(JobLSHBucket.bucket.in_(small))
+            ):
+                if (band, bucket) in wanted:
+                    stored_buckets.setdefault((band, bucket), []).append(job_id)
+        job_ids = list({job_id for ids in stored_buckets.values() for job_id in ids})
+        stored_signatures = {}
+        for start in range(0, len(job_ids), IN_CLAUSE_BATCH):
+            part = job_ids[start:start + IN_CLAUSE_BATCH]
+            # The join skips fingerprints left behind by deleted jobs
+            for job_id, signature in session.execute(
+                select(JobFingerprint.job_id, JobFingerprint.signature)
+                .join(Job, Job.id == JobFingerprint.job_id).where(JobFingerprint.job_id.in_(part))
+            ):
+                stored_signatures[job_id] = np.frombuffer(signature, dtype=np.uint32)
+        return stored_buckets, stored_signatures
+
+    def _store_fingerprints(self, session, job_ids, signatures):
+        if not job_ids:
+            return
+        # Core inserts: these rows need none of the ORM bulk bookkeeping
+        session.execute(JobFingerprint.__table__.insert(), [
+            {"job_id": job_id, "signature": signature.tobytes()} for job_id, signature in zip(job_ids, signatures)
+        ])
+        session.execute(JobLSHBucket.__table__.insert(), [
+            {"bucket": bucket, "band": band, "job_id": job_id}
+            for job_id, signature in zip(job_ids, signatures) for band, bucket in band_buckets(signature)
+        ])
+
+    def _add_sources(self, session, sources):
+        """Insert {"job_id", "source", "url"} rows, ignoring ones already recorded."""
+        if sources:
+            session.execute(insert(JobSource).prefix_with("OR IGNORE"),
+                            [{**source, "url": source["url"] or ""} for source in sources])
+
+    def fingerprint_stored_jobs(self, session, jobs):
+        """
+        Fingerprint stored jobs (dicts with id, title, company, location,
+        description, source, url) in id order, merging each near-duplicate into the earlier
+        job it matches: its sources and skills move over and it is deleted,
+        along with its recommendations. Returns the number of jobs merged.
+        """
+        signatures = [job_signature(job) for job in jobs]
+        matches = match_near_duplicates(signatures, *self._near_duplicate_candidates(session, signatures))
+        canonical = [
+            job["id"] if match is None else match[1] if match[0] == "stored" else jobs[match[1]]["id"]
+            for job, match in zip(jobs, matches)
+        ]
+        kept = [i for i, match in enumerate(matches) if match is None]
+        self._store_fingerprints(session, [jobs[i]["id"] for i in kept], [signatures[i] for i in kept])
+        self._add_sources(session, [
+            {"job_id": canonical_id, "source": job["source"], "url": job["url"]}
+            for job, canonical_id in zip(jobs, canonical)
+        ])
+
+        merged = {job["id"]: canonical_id for job, canonical_id in zip(jobs, canonical) if job["id"] != canonical_id}
+        for job_id, canonical_id in merged.items():
+            session.execute(update(JobSource).where(JobSource.job_id == job_id)
+                            .values(job_id=canonical_id).prefix_with("OR IGNORE"))
+            session.execute(update(JobSkill).where(JobSkill.job_id == job_id)
+                            .values(job_id=canonical_id).prefix_with("OR IGNORE"))
+        if merged:
+            duplicate_ids = list(merged)
+            for model in (JobSource, JobSkill, CareerRecommendation):
+                session.execute(delete(model).where(model.job_id.in_(duplicate_ids)))
+            session.execute(delete(Job).where(Job.id.in_(duplicate_ids)))
+        return len(merged)
+
+    def add_jobs_bulk(self, jobs, chunk_size: int = BULK_CHUNK_SIZE, dedupe: bool = True):
+        """
+        Bulk version of add_job for scraper output: one transaction per
+        `chunk_size` jobs, skill names resolved through an id cache, jobs and
+        job_skills rows written with executemany. Jobs already stored (same
+        title, company and source) are skipped; keys that are not Job columns
+        (search_query, ...) are ignored.
+        With `dedupe`, near-duplicate postings (job_dedup.py) are not stored
+        again: their source and skills are added to the job they duplicate.
+        Returns counts and throughput.
+        """
+        stats = {'total_jobs': 0, 'stored_count': 0, 'duplicate_count': 0,
+                 'near_duplicate_count': 0, 'skills_created': 0, 'job_skill_links': 0}
+        started = time.perf_counter()
+        jobs = iter(jobs)
+        while True:
+            chunk = list(islice(jobs, chunk_size))
+            if not chunk:
+                break
+            stats['total_jobs'] += len(chunk)
+            session = self.get_session()
+            try:
+                seen = self._existing_job_keys(session, chunk)
+                rows, job_skills = [], []
+                for job_data in chunk:
+                    key = (job_data['title'], job_data['company'], job_data['source'])
+                    if key in seen:
+                        stats['duplicate_count'] += 1
+                        continue
+                    seen.add(key)
+                    rows.append({k: v for k, v in job_data.items() if k in JOB_COLUMNS})
+                    job_skills.append(list(dict.fromkeys(s for s in job_data.get('skills_required') or [] if s)))
+
+                if rows:
+                    stats['skills_created'] += self._resolve_skill_ids(
+                        session, [name for names in job_skills for name in names]
+                    )
+                    if dedupe:
+                        signatures = [job_signature(row) for row in rows]
+                        matches = match_near_duplicates(
+                            signatures, *self._near_duplicate_candidates(session, signatures)
+                        )
+                    else:
+                        signatures, matches = None, [None] * len(rows)
+                    new = [i for i, match in enumerate(matches) if match is None]
+                    inserted_ids = session.execute(
+                        insert(Job).returning(Job.id, sort_by_parameter_order=True), [rows[i] for i in new]
+                    ).scalars().all() if new else []
+                    new_ids = dict(zip(new, inserted_ids))
+                    # Duplicates point at a stored job or at a job inserted earlier in this chunk
+                    job_ids = [
+                        new_ids[i] if match is None else match[1] if match[0] == "stored" else new_ids[match[1]]
+                        for i, match in enumerate(matches)
+                    ]
+                    links = list({
+                        (job_id, self._skill_ids[name]) for job_id, names in zip(job_ids, job_skills) for name in names
+                    })
+                    if links:
+                        # OR IGNORE skips links a merged duplicate shares with its canonical job;
+                        # a Core insert, so rowcount counts only the rows written
+                        stats['job_skill_links'] += session.execute(
+                            insert(JobSkill.__table__).prefix_with("OR IGNORE"),
+                            [{"job_id": job_id, "skill_id": skill_id} for job_id, skill_id in links]
+                        ).rowcount
+                    if dedupe:
+                        self._store_fingerprints(session, inserted_ids, [signatures[i] for i in new])
+                        self._add_sources(session, [
+                            {"job_id": job_id, "source": row['source'], "url": row.get('url')}
+                            for job_id, row in zip(job_ids, rows)
+                        ])
+                    stats['stored_count'] += len(new)
+                    stats['near_duplicate_count'] += len(rows) - len(new)
+                session.commit()
+            except Exception:
+                session.rollback()
+                # Ids of skills created in the rolled-back transaction are gone
+                self._skill_ids.clear()
+                raise
+            finally:
+                session.close()
+
+        elapsed = time.perf_counter() - started
+        stats['seconds'] = round(elapsed, 3)
+        stats['jobs_per_second'] = round(stats['total_jobs'] / elapsed, 1) if elapsed else 0.0
+        print(f"Bulk stored {stats['stored_count']}/{stats['total_jobs']} jobs "
+              f"({stats['duplicate_count']} duplicates, {stats['near_duplicate_count']} near-duplicates merged) "
+              f"in {elapsed:.2f}s, "
+              f"{stats['jobs_per_second']} jobs/s")
+        return stats
+
+    def get_jobs_by_skills(self, skills: list, limit: int = 20, after: tuple = None):
+        """
+        Get jobs that match the given skills, best first.
+        Returns [(job, match_count)] ordered by match_count desc, then job id;
+        each job has its skills and sources loaded. For the next page pass
+        after=(match_count, job.id) of the last row.
+
+        match_count depends on the queried skills, so there is no index to seek
+        on: every page counts all job_skills rows of those skills and keeps the
+        `limit` best after the cursor. Each page costs O(matching rows), the
+        same on deep pages as on the first; `after` only makes paging stable
+        while jobs are added, where OFFSET would skip or repeat rows.
+        """
         session = self.get_session()
         try:
-            # Find jobs that have any of the specified skills
-            jobs = session.query(Job).join(Job.skills).filter(
-                Skill.name.in_(skills)
-            ).limit(limit).all()
-            return jobs
+            # Names -> ids through the unique index on skills.name
+            skill_ids = session.execute(
+                select(Skill.id).where(Skill.name.in_(set(skills)))
+            ).scalars().all()
+            if not skill_ids:
+                return []
+
+            # Answered from ix_job_skills_skill_job without touching the jobs table
+            matches = func.count().label("matches")
+            query = (
+                select(JobSkill.job_id, matches)
+                .where(JobSkill.skill_id.in_(skill_ids))
+                .group_by(JobSkill.job_id)
+            )
+            if after is not None:
+                # Filters the aggregated counts; it does not seek past earlier pages
+                last_count, last_id = after
+                query = query.having(or_(
+                    matches < last_count,
+                    and_(matches == last_count, JobSkill.job_id > last_id)
+                ))
+            ranked = session.execute(query.order_by(matches.desc(), JobSkill.job_id).limit(limit)).all()
+            if not ranked:
+                return []
+
+            # One query for the jobs, one for all their skills, one for their sources
+            jobs = session.execute(
+                select(Job).where(Job.id.in_([job_id for job_id, _ in ranked]))
+                .options(selectinload(Job.skills), selectinload(Job.sources))
+            ).scalars().all()
+            jobs_by_id = {job.id: job for job in jobs}
+            return [(jobs_by_id[job_id], count) for job_id, count in ranked]
         except Exception as e:
             raise e
         finally:
             session.close()
     
-    def create_recommendations(self, user_id: int, jobs: list):
-        """Create career recommendations for a user."""
+    def list_jobs(self, source: str = None, location: str = None, job_type: str = None,
+                  experience_level: str = None, is_active: bool = True, limit: int = 20, after: tuple = None):
+        """
+        Browse jobs, newest posted_date first. Text filters match whole values,
+        case-insensitively; is_active=None lists active and inactive jobs.
+        Returns (jobs, next_after): jobs as dicts with their `sources`, and the
+        `after` key of the next page, or None on the last page.
+        """
+        with self.engine.connect() as conn:
+            return self._list_jobs(conn, source, location, job_type, experience_level, is_active, limit, after)
+
+    async def list_jobs_async(self, source: str = None, location: str = None, job_type: str = None,
+                              experience_level: str = None, is_active: bool = True, limit: int = 20,
+                              after: tuple = None):
+        """list_jobs for request handlers: same query on the async engine."""
+        async with self.async_engine.connect() as conn:
+            return await conn.run_sync(self._list_jobs, source, location, job_type, experience_level,
+                                       is_active, limit, after)
+
+    @staticmethod
+    def _list_jobs(conn, source, location, job_type, experience_level, is_active, limit, after):
+        filters = {"source": source, "location": location, "job_type": job_type,
+                   "experience_level": experience_level}
+        conditions = [JOB_LIST_FILTERS[name] == value.lower() for name, value in filters.items() if value]
+        if is_active is not None:
+            conditions.append(JOB_LIST_FILTERS["is_active"] == int(is_active))
+        limit = min(limit, MAX_LIST_LIMIT)
+
+        def page(conn, *bounds, size, order=(JOB_LIST_SORT.desc(), Job.id.desc())):
+            query = (
+                select(*JOB_LIST_COLUMNS, JOB_LIST_SORT.label("sort_key")).where(*conditions, *bounds)
+                .order_by(*order).limit(size)
+            )
+            return conn.execute(query).mappings().all()
+
+        if after is None:
+            rows = page(conn, size=limit + 1)
+        else:
+            # SQLite does not seek an index on a row-value comparison of
+            # expressions, so (sort key, id) < after runs as two seeks:
+            # the rest of the cursor's sort key, then the keys below it
+            sort_key, last_id = after
+            rows = page(conn, JOB_LIST_SORT == sort_key, Job.id < last_id, size=limit + 1,
+                        order=(Job.id.desc(),))
+            if len(rows) <= limit:
+                rows += page(conn, JOB_LIST_SORT < sort_key, size=limit + 1 - len(rows))
+        next_after = (rows[limit - 1]["sort_key"], rows[limit - 1]["id"]) if len(rows) > limit else None
+        jobs = [{k: v for k, v in row.items() if k != "sort_key"} for row in rows[:limit]]
+        return DatabaseManager._with_sources(conn, jobs), next_after
+
+    @staticmethod
+    def _with_sources(conn, jobs):
+        """Add to each job dict its `sources`: [{"source", "url"}] in the order they were recorded."""
+        sources = {job["id"]: [] for job in jobs}
+        if sources:
+            rows = conn.execute(
+                select(JobSource.job_id, JobSource.source, JobSource.url)
+                .where(JobSource.job_id.in_(list(sources))).order_by(JobSource.id)
+            ).all()
+            for job_id, source, url in rows:
+                sources[job_id].append({"source": source, "url": url or None})
+        return [{**job, "sources": sources[job["id"]]} for job in jobs]
+
+    def search_jobs(self, query: str, source: str = None, location: str = None, job_type: str = None,
+                    limit: int = 20, offset: int = 0):
+        """
+        Full-text search over job title, company and description, best match
+        first (BM25, title matches weighted highest). `source` and `job_type`
+        match exactly (case-insensitive), `location` as a substring.
+        Each result has the matched words wrapped in <mark> in `title_highlight`
+        and in a description `snippet`, and lists every source it was
+        scraped from in `sources`.
+        """
+        with self.engine.connect() as conn:
+            return self._search_jobs(conn, query, source, location, job_type, limit, offset)
+
+    async def search_jobs_async(self, query: str, source: str = None, location: str = None,
+                                job_type: str = None, limit: int = 20, offset: int = 0):
+        """search_jobs for request handlers: same query on the async engine."""
+        async with self.async_engine.connect() as conn:
+            return await conn.run_sync(self._search_jobs, query, source, location, job_type, limit, offset)
+
+    @staticmethod
+    def _search_jobs(conn, query, source, location, job_type, limit, offset):
+        match = fts_query(query)
+        if match is None:
+            return []
+        filters, params = [], {"match": match, "limit": min(limit, MAX_SEARCH_LIMIT), "offset": offset}
+        if source:
+            filters.append("lower(j.source) = lower(:source)")
+            params["source"] = source
+        if job_type:
+            filters.append("lower(j.job_type) = lower(:job_type)")
+            params["job_type"] = job_type
+        if location:
+            filters.append("j.location LIKE :location")
+            params["location"] = f"%{location}%"
+        weights = ", ".join(str(w) for w in JOBS_FTS_WEIGHTS)
+        sql = f"""
+            SELECT j.id, j.title, j.company, j.location, j.source, j.job_type, j.experience_level,
+                   j.salary, j.posted_date, j.url, j.application_url,
+                   highlight(jobs_fts, 0, '<mark>', '</mark>') AS title_highlight,
+                   snippet(jobs_fts, 2, '<mark>', '</mark>', '…', 16) AS snippet,
+                   bm25(jobs_fts, {weights}) AS rank
+            FROM jobs_fts JOIN jobs j ON j.id = jobs_fts.rowid
+            WHERE jobs_fts MATCH :match AND j.is_active IS NOT 0
+            {''.join(f' AND {f}' for f in filters)}
+            ORDER BY rank
+            LIMIT :limit OFFSET :offset
+        """
+        rows = conn.execute(text(sql), params).mappings().all()
+        # bm25() is lower-is-better; report a positive relevance score
+        results = [{**{k: v for k, v in row.items() if k != "rank"}, "score": round(-row["rank"], 4)} for row in rows]
+        return DatabaseManager._with_sources(conn, results)
+
+    def skill_trends(self, days: int = 30, limit: int = 20, source: str = None, today: date = None):
+        """
+        Skill demand in stored jobs, read from the skill_demand counters
+        rather than job_skills. Returns {"top": [...], "growing": [...]}:
+        the skills needed by the most jobs stored in the last `days` days
+        (all time if `days` is 0), and the skills whose job count grew the most
+        over the `days` days before (growth = (current - previous) / previous,
+        with at least MIN_TREND_COUNT current jobs). `source` limits both to
+        jobs from one source.
+        """
+        with self.engine.connect() as conn:
+            return self._skill_trends(conn, days, limit, source, today)
+
+    async def skill_trends_async(self, days: int = 30, limit: int = 20, source: str = None, today: date = None):
+        """skill_trends for request handlers: same queries on the async engine."""
+        async with self.async_engine.connect() as conn:
+            return await conn.run_sync(self._skill_trends, days, limit, source, today)
+
+    @staticmethod
+    def _skill_trends(conn, days, limit, source, today):
+        limit = min(limit, MAX_TREND_LIMIT)
+        days = min(days, MAX_TREND_DAYS)
+        if not days and not source:
+            rows = conn.execute(
+                select(Skill.name, SkillDemand.job_count).join(Skill, Skill.id == SkillDemand.skill_id)
+                .where(SkillDemand.job_count > 0)
+                .order_by(SkillDemand.job_count.desc(), Skill.name).limit(limit)
+            ).all()
+            return {"top": [{"skill": name, "job_count": count} for name, count in rows], "growing": []}
+
+        conditions = [SkillDemandDaily.source == source.lower()] if source else []
+        if not days:
+            job_count = func.sum(SkillDemandDaily.job_count).label("job_count")
+            rows = conn.execute(
+                select(Skill.name, job_count).join(Skill, Skill.id == SkillDemandDaily.skill_id)
+                .where(*conditions).group_by(Skill.id).having(job_count > 0)
+                .order_by(job_count.desc(), Skill.name).limit(limit)
+            ).all()
+            return {"top": [{"skill": name, "job_count": count} for name, count in rows], "growing": []}
+
+        # Buckets of the current window and of the same-length window before it
+        today = today or datetime.utcnow().date()
+        current_start = (today - timedelta(days=days - 1)).isoformat()
+        previous_start = (today - timedelta(days=2 * days - 1)).isoformat()
+        current = func.sum(case((SkillDemandDaily.day >= current_start, SkillDemandDaily.job_count),
+                                else_=0)).label("current")
+        previous = func.sum(case((SkillDemandDaily.day < current_start, SkillDemandDaily.job_count),
+                                 else_=0)).label("previous")
+        # One pass over the buckets; the few thousand skills are ranked here
+        windows = conn.execute(
+            select(Skill.name, current, previous).join(Skill, Skill.id == SkillDemandDaily.skill_id)
+            .where(SkillDemandDaily.day >= previous_start, SkillDemandDaily.day <= today.isoformat(), *conditions)
+            .group_by(SkillDemandDaily.skill_id).having(current > 0)
+        ).all()
+        top = heapq.nsmallest(limit, windows, key=lambda row: (-row.current, row.name))
+        growing = heapq.nsmallest(
+            limit, [row for row in windows if row.current >= MIN_TREND_COUNT and row.current > row.previous],
+            key=lambda row: (-(row.current - row.previous) / max(row.previous, 1), -row.current, row.name)
+        )
+        return {
+            "top": [{"skill": row.name, "job_count": row.current} for row in top],
+            "growing": [{"skill": row.name, "job_count": row.current, "previous_count": row.previous,
+                         "growth": round((row.current - row.previous) / max(row.previous, 1), 4)}
+                        for row in growing],
+        }
+
+    def iter_training_records(self, chunk_size: int = IN_CLAUSE_BATCH):
+        """
+        Jobs that have at least one skill, in id order, as ML training records
+        (TRAINING_COLUMNS plus "skills", a sorted list of names). Rows are
+        streamed `chunk_size` at a time and the skills of each chunk are loaded
+        with one query, so memory stays bounded by the chunk, not the table.
+        """
+        chunk_size = min(chunk_size, IN_CLAUSE_BATCH)
+        has_skills = select(JobSkill.job_id).where(JobSkill.job_id == Job.id).exists()
         session = self.get_session()
         try:
-            recommendations = []
-            for job in jobs:
-                # Calculate similarity score (simplified)
-                similarity_score = 0.8  # Placeholder
-                
-                recommendation = CareerRecommendation(
-                    user_id=user_id,
-                    job_id=job.id,
-                    similarity_score=similarity_score
-                )
-                session.add(recommendation)
-                recommendations.append(recommendation)
-            
-            session.commit()
-            return recommendations
-        except Exception as e:
-            session.rollback()
-            raise e
+            result = session.execute(
+                select(*TRAINING_COLUMNS).where(has_skills).order_by(Job.id).execution_options(yield_per=chunk_size)
+            ).mappings()
+            for rows in result.partitions():
+                skills = {row["job_id"]: [] for row in rows}
+                for job_id, name in session.execute(
+                    select(JobSkill.job_id, Skill.name).join(Skill, Skill.id == JobSkill.skill_id)
+                    .where(JobSkill.job_id.in_(list(skills))).order_by(JobSkill.job_id, Skill.name)
+                ):
+                    skills[job_id].append(name)
+                for row in rows:
+                    yield {**row, "skills": skills[row["job_id"]]}
         finally:
             session.close()
-    
+
     def get_database_stats(self):
         """Get database statistics."""
         session = self.get_session()
@@ -269,6 +998,19 @@ def test_database():
         job = db_manager.add_job(job_data)
         print(f"Added job: {job.title}")
         
+        # Test bulk insert (the second job is a duplicate of the one above)
+        bulk_stats = db_manager.add_jobs_bulk([
+            {'title': 'Data Analyst', 'company': 'Test Company', 'source': 'test',
+             'skills_required': ['python', 'sql', 'tableau']},
+            {'title': 'Python Developer', 'company': 'Test Company', 'source': 'test',
+             'skills_required': ['python']}
+        ])
+        print(f"Bulk insert: {bulk_stats}")
+        
+        # Test skill search: both jobs match python, the data analyst also matches sql
+        for job, match_count in db_manager.get_jobs_by_skills(['python', 'sql']):
+            print(f"Matched job: {job.title} ({match_count} skills: {[s.name for s in job.skills]})")
+        
         # Test getting database stats
         stats = db_manager.get_database_stats()
         print(f"Database stats: {stats}")
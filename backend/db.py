@@ -0,0 +1,19 @@
+"""
+Compatibility module: the scrapers, chatbot and training scripts import their
+career/skill helpers from `db`. Everything lives in career_skills_db.
+"""
+from career_skills_db import (
+    init_db,
+    get_connection,
+    get_career_skills,
+    get_career_skills_async,
+    add_career_skills,
+    add_career_skills_bulk,
+    clear_career_skills,
+    get_career_count,
+    get_career_count_async,
+    get_skills_by_career,
+    get_careers_by_skill,
+    get_all_skills,
+    get_all_careers,
+)
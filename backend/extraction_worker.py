@@ -0,0 +1,210 @@
+"""
+Sandboxed resume text extraction.
+
+Extraction (pdfplumber, the DOCX reader, antiword) runs in separate worker
+processes so a crafted or corrupted file cannot hang or exhaust the API process:
+- every file gets a wall-clock budget and each worker runs under a memory cap,
+- a worker that times out, runs out of memory or crashes is killed and replaced,
+- callers get a structured status ("extraction_timeout", "extraction_oom", ...)
+  instead of a hung request.
+
+Workers are plain `python extraction_worker.py` subprocesses speaking one JSON
+object per line over stdin/stdout, so they never import the API's models.
+"""
+import os
+import sys
+import json
+import queue
+import atexit
+import signal
+import logging
+import threading
+import subprocess
+from typing import Dict, Any
+
+logger = logging.getLogger(__name__)
+
+EXTRACTION_TIMEOUT = float(os.environ.get("EXTRACTION_TIMEOUT_SECONDS", 30))
+EXTRACTION_MEMORY_MB = int(os.environ.get("EXTRACTION_MEMORY_MB", 512))
+EXTRACTION_WORKERS = int(os.environ.get("EXTRACTION_WORKERS", 2))
+# Recycle workers periodically so leaks in native parsers don't accumulate
+MAX_JOBS_PER_WORKER = int(os.environ.get("EXTRACTION_MAX_JOBS_PER_WORKER", 200))
+# Set EXTRACTION_SANDBOX=0 to extract in-process (e.g. for debugging)
+SANDBOX_ENABLED = os.environ.get("EXTRACTION_SANDBOX", "1") != "0"
+
+WORKER_SCRIPT = os.path.abspath(__file__)
+
+
+# ---------- Worker side ----------
+def _apply_memory_limit(memory_mb: int):
+    """Cap the worker's address space so runaway allocations raise MemoryError."""
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return
+    limit = memory_mb * 1024 * 1024
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ValueError, OSError) as e:
+        logger.warning(f"Could not apply extraction memory limit: {e}")
+
+
+def _is_memory_failure(error: BaseException) -> bool:
+    """MemoryError itself, or an error raised while handling or chained from one."""
+    while error is not None:
+        if isinstance(error, MemoryError):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def serve(memory_mb: int):
+    """Worker loop: read one request per line, answer with one JSON line."""
+    # Keep the protocol channel private; anything libraries print goes to stderr
+    protocol_out = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    from text_extraction import extract_text
+    _apply_memory_limit(memory_mb)
+
+    for line in sys.stdin:
+        file_path = json.loads(line)["path"]
+        try:
+            reply = {"status": "ok", "text": extract_text(file_path)}
+        except MemoryError as e:
+            reply = {"status": "extraction_oom", "text": "", "detail": str(e)}
+        except Exception as e:
+            status = "extraction_oom" if _is_memory_failure(e) else "extraction_error"
+            reply = {"status": status, "text": "", "detail": str(e)}
+        protocol_out.write(json.dumps(reply) + "\n")
+        protocol_out.flush()
+        if reply["status"] == "extraction_oom":
+            # The heap may be in a bad state; let the pool start a fresh worker
+            break
+
+
+# ---------- Pool side ----------
+class _Worker:
+    def __init__(self, memory_mb: int):
+        self.process = subprocess.Popen(
+            [sys.executable, WORKER_SCRIPT, str(memory_mb)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=os.path.dirname(WORKER_SCRIPT),
+            text=True,
+            encoding="utf-8",
+        )
+        self.jobs = 0
+        # A reader thread lets us wait on replies with a timeout on every platform
+        self.replies = queue.Queue()
+        self._reader = threading.Thread(target=self._read_replies, daemon=True)
+        self._reader.start()
+
+    def _read_replies(self):
+        for line in self.process.stdout:
+            self.replies.put(line)
+        self.replies.put(None)  # EOF: the worker exited
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def kill(self):
+        if self.alive():
+            self.process.kill()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+
+class ExtractionPool:
+    def __init__(self, workers: int = EXTRACTION_WORKERS, timeout: float = EXTRACTION_TIMEOUT,
+                 memory_mb: int = EXTRACTION_MEMORY_MB, max_jobs_per_worker: int = MAX_JOBS_PER_WORKER):
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self._idle = queue.Queue()
+        for _ in range(workers):
+            self._idle.put(_Worker(memory_mb))
+
+    def extract(self, file_path: str) -> Dict[str, Any]:
+        """
+        Extract text from `file_path` in a worker.
+        Returns {"status": "ok"|"extraction_timeout"|"extraction_oom"|
+        "extraction_crashed"|"extraction_error", "text": str}.
+        """
+        worker = self._idle.get()
+        try:
+            if not worker.alive():
+                worker.kill()
+                worker = _Worker(self.memory_mb)
+            try:
+                worker.process.stdin.write(json.dumps({"path": os.path.abspath(file_path)}) + "\n")
+                worker.process.stdin.flush()
+                line = worker.replies.get(timeout=self.timeout)
+            except queue.Empty:
+                logger.warning(f"Extraction timed out after {self.timeout}s: {file_path}")
+                worker.kill()
+                worker = _Worker(self.memory_mb)
+                return {"status": "extraction_timeout", "text": ""}
+            except (BrokenPipeError, OSError):
+                line = None
+
+            if line is None:
+                # Worker died mid-file. SIGKILL is what the kernel OOM killer sends.
+                worker.kill()
+                killed = worker.process.returncode == -getattr(signal, "SIGKILL", 9)
+                status = "extraction_oom" if killed else "extraction_crashed"
+                logger.warning(f"Extraction worker died ({status}) on {file_path}")
+                worker = _Worker(self.memory_mb)
+                return {"status": status, "text": ""}
+
+            reply = json.loads(line)
+            worker.jobs += 1
+            if reply["status"] == "extraction_oom" or worker.jobs >= self.max_jobs_per_worker:
+                worker.kill()
+                worker = _Worker(self.memory_mb)
+            if reply["status"] != "ok":
+                logger.warning(f"Extraction failed ({reply['status']}) on {file_path}: {reply.get('detail', '')}")
+            return {"status": reply["status"], "text": reply["text"]}
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().kill()
+            except queue.Empty:
+                break
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> ExtractionPool:
+    """Process-wide worker pool, started on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ExtractionPool()
+                atexit.register(_pool.close)
+    return _pool
+
+
+def extract_text_isolated(file_path: str) -> Dict[str, Any]:
+    """Extract text via the sandboxed pool (or in-process if the sandbox is disabled)."""
+    if not SANDBOX_ENABLED:
+        from text_extraction import extract_text
+        return {"status": "ok", "text": extract_text(file_path)}
+    return get_extraction_pool().extract(file_path)
+
+
+if __name__ == "__main__":
+    serve(int(sys.argv[1]) if len(sys.argv) > 1 else EXTRACTION_MEMORY_MB)
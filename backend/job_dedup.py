@@ -0,0 +1,237 @@
+"""
+Near-duplicate detection for job postings.
+
+The same opening scraped from LinkedIn, Indeed, Remote OK and Naukri differs
+in source, url and formatting, so it passes the exact (title, company, source)
+check. Each job gets a MinHash signature of the word shingles of its
+normalized title + company + description; the signature is cut into BANDS
+bands and every band is hashed into an LSH bucket. Jobs sharing a bucket are
+candidates, and a candidate whose estimated Jaccard similarity reaches
+DUPLICATE_THRESHOLD is a duplicate. Lookups only touch the jobs in the same
+buckets, not the whole table.
+
+The same role at the same company is often posted once per city with an
+identical description; those are distinct openings. The signature is salted
+with the normalized location, so postings for different locations never agree
+on a hash, never share a bucket and never match.
+
+DatabaseManager.add_jobs_bulk fingerprints jobs at ingest and merges
+duplicates into the first stored (canonical) job, which keeps the list of
+sources it was seen on. dedupe_existing_jobs() does the same for jobs that
+have no fingerprint (stored by add_job, or before fingerprinting existed).
+Fingerprints stored before location salting are recomputed with --rebuild:
+
+    python job_dedup.py [--rebuild]
+"""
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+NUM_PERM = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+# Estimated Jaccard similarity from which two postings are the same job.
+# Reposts with a few edited words score ~0.85; distinct openings sharing half
+# their text (company boilerplate) stay under 0.5, 4.5 standard errors of the
+# 128-hash estimate below. 32 bands of 4 rows make pairs above ~0.45 likely
+# to share a bucket.
+DUPLICATE_THRESHOLD = 0.7
+# Buckets holding more jobs than this come from boilerplate shared by many
+# postings; they are skipped so lookups stay sub-linear. Real duplicates still
+# meet in their other bands.
+MAX_BUCKET_SIZE = 50
+
+# Multiply-shift hash family: h(x) = (a * x + b) mod 2^64 >> 32, a odd
+_rng = np.random.RandomState(20240601)
+_A = (_rng.randint(0, 2 ** 62, NUM_PERM, dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+_B = _rng.randint(0, 2 ** 62, NUM_PERM, dtype=np.uint64)
+_MAX_HASH = np.uint32(0xFFFFFFFF)
+# Band keys: random odd multipliers, one per row of a band
+_BAND_MULT = (_rng.randint(0, 2 ** 62, ROWS_PER_BAND, dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+# Location salt: a second hash family, XORed into every min hash
+_SALT_A = (_rng.randint(0, 2 ** 62, NUM_PERM, dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+_SALT_B = _rng.randint(0, 2 ** 62, NUM_PERM, dtype=np.uint64)
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_NON_WORD_RE = re.compile(r"[^a-z0-9+#]+")
+
+
+def normalize_job_text(title: str, company: str, description: Optional[str]) -> str:
+    """Lowercased title + company + description, markup and punctuation removed."""
+    text = " ".join(part or "" for part in (title, company, description))
+    return " ".join(_NON_WORD_RE.sub(" ", _TAG_RE.sub(" ", text).lower()).split())
+
+
+def normalize_location(location: Optional[str]) -> str:
+    """City part of a location ("Bangalore, Karnataka, India" -> "bangalore"), or ""."""
+    city = (location or "").split(",")[0]
+    return " ".join(_NON_WORD_RE.sub(" ", city.lower()).split())
+
+
+def _location_salt(location: str) -> np.ndarray:
+    if not location:
+        return np.zeros(NUM_PERM, dtype=np.uint32)
+    key = np.uint64(zlib.crc32(location.encode("utf-8")))
+    return ((key * _SALT_A + _SALT_B) >> np.uint64(32)).astype(np.uint32)
+
+
+def _shingles(text: str) -> set:
+    words = text.split()
+    if len(words) <= SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """NUM_PERM uint32 minimum hashes of the word shingles of `text`."""
+    shingles = _shingles(text)
+    if not shingles:
+        return np.full(NUM_PERM, _MAX_HASH, dtype=np.uint32)
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    # (shingles, NUM_PERM) permuted hashes; uint64 arithmetic wraps mod 2^64
+    permuted = (hashes[:, None] * _A[None, :] + _B[None, :]) >> np.uint64(32)
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def job_signature(job: Dict) -> np.ndarray:
+    """MinHash signature of a job's text, salted with its normalized location."""
+    signature = minhash_signature(normalize_job_text(job.get("title"), job.get("company"), job.get("description")))
+    return signature ^ _location_salt(normalize_location(job.get("location")))
+
+
+def band_buckets(signature: np.ndarray) -> List[Tuple[int, int]]:
+    """(band, bucket) pairs: each band of the signature hashed to a signed 64-bit key."""
+    rows = signature.reshape(BANDS, ROWS_PER_BAND).astype(np.uint64)
+    # Each row value is below 2^32; shifting one row up keeps bands (a, b) and (b, a) apart
+    keys = (rows * _BAND_MULT).sum(axis=1, dtype=np.uint64) ^ (rows[:, 0] << np.uint64(32))
+    return list(enumerate(keys.view(np.int64).tolist()))
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def match_near_duplicates(signatures: List[np.ndarray], stored_buckets: Dict[Tuple[int, int], List[int]],
+                          stored_signatures: Dict[int, np.ndarray]) -> List[Optional[Tuple[str, int]]]:
+    """
+    For each new signature, the job it duplicates: ("stored", job_id) for an
+    already stored job, ("new", i) for an earlier signature of the same batch,
+    or None if it is a new job. `stored_buckets` maps (band, bucket) to stored
+    job ids for at least the buckets of `signatures`, hot buckets left out.
+    """
+    batch_buckets = {}
+    matches = []
+    for i, signature in enumerate(signatures):
+        buckets = band_buckets(signature)
+        candidates = set()
+        for key in buckets:
+            candidates.update(("stored", job_id) for job_id in stored_buckets.get(key, ()))
+            if len(batch_buckets.get(key, ())) <= MAX_BUCKET_SIZE:
+                candidates.update(("new", j) for j in batch_buckets.get(key, ()))
+
+        best = None
+        candidates = [c for c in sorted(candidates, key=lambda c: (c[0] != "stored", c[1]))
+                      if c[0] == "new" or c[1] in stored_signatures]
+        if candidates:
+            others = np.vstack([
+                stored_signatures[key] if kind == "stored" else signatures[key] for kind, key in candidates
+            ])
+            scores = np.count_nonzero(others == signature, axis=1)
+            top = int(np.argmax(scores))  # first of the best: stored jobs before this batch, then lowest id
+            if scores[top] / NUM_PERM >= DUPLICATE_THRESHOLD:
+                best = candidates[top]
+        matches.append(best)
+        if best is None:
+            for key in buckets:
+                batch_buckets.setdefault(key, []).append(i)
+    return matches
+
+
+def dedupe_existing_jobs(manager=None, chunk_size: int = 1000, rebuild: bool = False) -> Dict[str, int]:
+    """
+    Fingerprint stored jobs that have no fingerprint yet, in id order, and merge
+    the near-duplicates among them into the earliest matching job. With
+    `rebuild`, all stored fingerprints are dropped and recomputed first.
+    """
+    if manager is None:
+        from database import db_manager as manager
+    from sqlalchemy import select, delete
+    from database import Job, JobFingerprint, JobLSHBucket
+
+    if rebuild:
+        session = manager.get_session()
+        try:
+            session.execute(delete(JobLSHBucket))
+            session.execute(delete(JobFingerprint))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    stats = {"fingerprinted": 0, "merged": 0}
+    last_id = 0
+    while True:
+        session = manager.get_session()
+        try:
+            jobs = session.execute(
+                select(Job.id, Job.title, Job.company, Job.location, Job.description, Job.source, Job.url)
+                .outerjoin(JobFingerprint, JobFingerprint.job_id == Job.id)
+                .where(JobFingerprint.job_id.is_(None), Job.id > last_id)
+                .order_by(Job.id).limit(chunk_size)
+            ).mappings().all()
+            if not jobs:
+                return stats
+            last_id = jobs[-1]["id"]
+            merged = manager.fingerprint_stored_jobs(session, [dict(job) for job in jobs])
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        stats["fingerprinted"] += len(jobs) - merged
+        stats["merged"] += merged
+
+
+def test_job_dedup():
+    """Reposted openings match; different openings at the same company do not."""
+    description = ("We are looking for a backend engineer to design and build scalable APIs in Python "
+                   "and Django, own our PostgreSQL data layer, and mentor junior developers. ") * 3
+    linkedin = job_signature({"title": "Backend Engineer", "company": "Acme Corp",
+                              "description": f"<p>{description}</p>"})
+    indeed = job_signature({"title": "Backend Engineer", "company": "ACME Corp.",
+                            "description": description + " Apply now!"})
+    other = job_signature({"title": "Data Analyst", "company": "Acme Corp",
+                           "description": "Analyse sales data in Excel and Tableau and present weekly reports."})
+    assert similarity(linkedin, indeed) >= DUPLICATE_THRESHOLD, similarity(linkedin, indeed)
+    assert similarity(linkedin, other) < DUPLICATE_THRESHOLD
+    assert match_near_duplicates([linkedin, other, indeed], {}, {}) == [None, None, ("new", 0)]
+    assert set(band_buckets(linkedin)) & set(band_buckets(indeed))
+
+    # The same role posted for two cities is two openings
+    bangalore = job_signature({"title": "Backend Engineer", "company": "Acme Corp",
+                               "location": "Bangalore, Karnataka", "description": description})
+    bangalore_repost = job_signature({"title": "Backend Engineer", "company": "ACME Corp.",
+                                      "location": "bangalore", "description": description + " Apply now!"})
+    pune = job_signature({"title": "Backend Engineer", "company": "Acme Corp",
+                          "location": "Pune, Maharashtra", "description": description})
+    assert similarity(bangalore, bangalore_repost) >= DUPLICATE_THRESHOLD
+    assert similarity(bangalore, pune) < DUPLICATE_THRESHOLD, similarity(bangalore, pune)
+    assert not set(band_buckets(bangalore)) & set(band_buckets(pune))
+    assert match_near_duplicates([bangalore, pune, bangalore_repost], {}, {}) == [None, None, ("new", 0)]
+    print("job_dedup tests passed")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--test" in sys.argv:
+        test_job_dedup()
+    else:
+        print(f"Deduplicated stored jobs: {dedupe_existing_jobs(rebuild='--rebuild' in sys.argv)}")
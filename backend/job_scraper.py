@@ -6,7 +6,8 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from job_scraper_improved import ImprovedJobScraper
-from database import DatabaseManager, Job, Skill
+from database import DatabaseManager
+from skill_aliases import canonicalize_skills
 import requests
 from bs4 import BeautifulSoup
 import re
@@ -389,33 +390,27 @@ class MassJobScraper:
             skills = re.findall(pattern, text.lower())
             found_skills.update(skills)
         
-        return list(found_skills)
+        return canonicalize_skills(found_skills)
     
     def store_jobs_in_database(self, jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Store jobs in database with detailed information."""
-        stored_count = 0
-        error_count = 0
-        
         for job_data in jobs:
-            try:
-                # Add application_url field to database if not exists
-                job_data['application_url'] = job_data.get('application_url', job_data.get('url', ''))
-                
-                stored_job = self.db_manager.add_job(job_data)
-                stored_count += 1
-                
-                if stored_count % 10 == 0:
-                    logger.info(f"Stored {stored_count} jobs so far...")
-                    
-            except Exception as e:
-                logger.error(f"Error storing job {job_data.get('title', 'Unknown')}: {e}")
-                error_count += 1
-                continue
-        
+            # Add application_url field to database if not exists
+            job_data['application_url'] = job_data.get('application_url', job_data.get('url', ''))
+
+        try:
+            result = self.db_manager.add_jobs_bulk(jobs)
+        except Exception as e:
+            logger.error(f"Error storing jobs: {e}")
+            return {'total_jobs': len(jobs), 'stored_count': 0, 'error_count': len(jobs)}
+
+        logger.info(f"Stored {result['stored_count']} jobs at {result['jobs_per_second']} jobs/s")
         return {
             'total_jobs': len(jobs),
-            'stored_count': stored_count,
-            'error_count': error_count
+            'stored_count': result['stored_count'],
+            'duplicate_count': result['duplicate_count'],
+            'error_count': 0,
+            'jobs_per_second': result['jobs_per_second']
         }
     
     def mass_scrape_and_store(self, queries: List[str] = None, max_jobs_per_query: int = 50) -> Dict[str, Any]:
@@ -468,42 +463,28 @@ class MassJobScraper:
             'queries_processed': len(queries)
         }
     
-    def prepare_ml_training_data(self) -> Dict[str, Any]:
-        """Prepare data for ML model training."""
+    def prepare_ml_training_data(self, file_path: str = 'ml_training_data.json') -> Dict[str, Any]:
+        """
+        Export the stored jobs that have skills as ML training data, one record
+        per job. Records are streamed to `file_path` (a .json array, .ndjson/.jsonl,
+        or .parquet) chunk by chunk, so memory does not grow with the jobs table.
+        """
+        from snapshots import export_training_data
+
         try:
-            db = self.db_manager.SessionLocal()
-            
-            # Get all jobs with skills
-            jobs = db.query(Job).join(Job.skills).all()
-            
-            training_data = []
-            for job in jobs:
-                job_skills = [skill.name for skill in job.skills]
-                
-                training_data.append({
-                    'job_id': job.id,
-                    'title': job.title,
-                    'company': job.company,
-                    'location': job.location,
-                    'description': job.description,
-                    'skills': job_skills,
-                    'source': job.source,
-                    'job_type': job.job_type,
-                    'experience_level': job.experience_level,
-                    'salary': job.salary,
-                    'application_url': getattr(job, 'application_url', '')
-                })
-            
-            db.close()
-            
-            # Save training data to JSON
-            with open('ml_training_data.json', 'w', encoding='utf-8') as f:
-                json.dump(training_data, f, indent=2, ensure_ascii=False)
-            
+            sample_data = []
+
+            def records():
+                for record in self.db_manager.iter_training_records():
+                    if len(sample_data) < 5:
+                        sample_data.append(record)
+                    yield record
+
+            total = export_training_data(file_path, records())
             return {
-                'total_records': len(training_data),
-                'file_path': 'ml_training_data.json',
-                'sample_data': training_data[:5] if training_data else []
+                'total_records': total,
+                'file_path': file_path,
+                'sample_data': sample_data
             }
             
         except Exception as e:
@@ -10,6 +10,7 @@ from urllib.parse import urljoin, urlparse, parse_qs
 import random
 from dataclasses import dataclass
 import os
+from skill_aliases import canonicalize_skills
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -475,7 +476,7 @@ class ImprovedJobScraper:
             skills = re.findall(pattern, description.lower())
             found_skills.update(skills)
         
-        return list(found_skills)
+        return canonicalize_skills(found_skills)
     
     def search_jobs(self, query: str, location: str = "", sources: List[str] = None, limit: int = 50) -> List[JobPosting]:
         """Search jobs across multiple sources."""
@@ -1,13 +1,18 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import uvicorn
 import os
 import shutil
+from contextlib import asynccontextmanager
 from typing import List, Dict, Any, Optional
-from resume_parser import parse_resume
+from parse_cache import get_parsed_resume
 from suggest_careers import suggest_careers
 from chatbot_service import CareerGuidanceChatbot
+from autocomplete import autocomplete, AUTOCOMPLETE_TYPES, MAX_LIMIT
+from career_skills_db import close_async_connections, start_read_snapshot, stop_read_snapshot
+from database import db_manager, MAX_SEARCH_LIMIT, MAX_LIST_LIMIT, MAX_TREND_LIMIT, MAX_TREND_DAYS, encode_cursor, decode_cursor
 from ml_model.dl_pipeline import DLPipeline
 
 UPLOAD_DIR = "uploads"
@@ -20,7 +25,17 @@ except Exception as e:
     career_pipeline = None
     print(f"ERROR: Career DL pipeline not loaded -> {e}")
 
-app = FastAPI(title="AI Career Suggester (DL)", version="2.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Serve career/skill reads from an in-memory copy of career_skills.db
+    print(f"Loaded career_skills snapshot (taxonomy version {start_read_snapshot()})")
+    yield
+    stop_read_snapshot()
+    # Close the pooled async database connections
+    await db_manager.dispose_async()
+    await close_async_connections()
+
+app = FastAPI(title="AI Career Suggester (DL)", version="2.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -59,7 +74,7 @@ async def upload_resume(file: UploadFile = File(...)):
 @app.get("/parse_resume/")
 def parse_resume_api(filename: str):
     try:
-        return parse_resume(os.path.join(UPLOAD_DIR, filename))
+        return get_parsed_resume(os.path.join(UPLOAD_DIR, filename))
     except Exception as e:
         return {"error": str(e)}
 
@@ -70,9 +85,17 @@ async def suggest_careers_endpoint(filename: str):
         raise HTTPException(status_code=404, detail="File not found")
 
     try:
-        # Parse the resume
-        parsed = parse_resume(file_path)
+        # Parse the resume (CPU-bound and reads the parse cache: off the event loop)
+        parsed = await run_in_threadpool(get_parsed_resume, file_path)
         resume_text = parsed.get("raw_text", "")
+        if parsed.get("error"):
+            return {
+                "suggested_careers": [],
+                "parsed_skills": [],
+                "error": parsed["error"],
+                "message": f"Could not extract text from resume ({parsed['error']})",
+                "method_used": "Fallback (extraction failed)"
+            }
         if not resume_text.strip():
             return {
                 "suggested_careers": [],
@@ -90,7 +113,7 @@ async def suggest_careers_endpoint(filename: str):
             method_used = "Fallback (pipeline not available)"
         else:
             # Use the main pipeline
-            matches = career_pipeline.search_jobs(resume_text, top_n=5)
+            matches = await run_in_threadpool(career_pipeline.search_jobs, resume_text, top_n=5)
             method_used = "FAISS + Transformer (MiniLM) Semantic Search"
 
 
@@ -128,14 +151,53 @@ async def suggest_careers_endpoint(filename: str):
 async def get_career_matches(request: CareerMatchRequest):
     if not career_pipeline:
         raise HTTPException(status_code=503, detail="Career DL pipeline not initialized")
-    return {"matches": career_pipeline.search_jobs(request.resume_text, top_n=request.top_n)}
+    matches = await run_in_threadpool(career_pipeline.search_jobs, request.resume_text, top_n=request.top_n)
+    return {"matches": matches}
 
 
 @app.post("/api/career/analyze")
 async def analyze_career_match(request: CareerAnalysisRequest):
     if not career_pipeline:
         raise HTTPException(status_code=503, detail="Career DL pipeline not initialized")
-    return career_pipeline.analyze_match(request.resume_text, request.career_title)
+    return await run_in_threadpool(career_pipeline.analyze_match, request.resume_text, request.career_title)
+
+@app.get("/api/autocomplete")
+def autocomplete_endpoint(type: str = "skill", q: str = "", limit: int = 10):
+    if type not in AUTOCOMPLETE_TYPES:
+        raise HTTPException(status_code=400, detail=f"type must be one of {', '.join(AUTOCOMPLETE_TYPES)}")
+    limit = max(1, min(limit, MAX_LIMIT))
+    return {"type": type, "query": q, "suggestions": autocomplete(type, q, limit)}
+
+@app.get("/api/jobs")
+async def list_jobs_endpoint(source: Optional[str] = None, location: Optional[str] = None,
+                             job_type: Optional[str] = None, experience_level: Optional[str] = None,
+                             is_active: Optional[bool] = True, limit: int = 20, cursor: Optional[str] = None):
+    limit = max(1, min(limit, MAX_LIST_LIMIT))
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    jobs, next_after = await db_manager.list_jobs_async(source=source, location=location, job_type=job_type,
+                                                        experience_level=experience_level, is_active=is_active,
+                                                        limit=limit, after=after)
+    return {"jobs": jobs, "limit": limit, "next_cursor": encode_cursor(next_after) if next_after else None}
+
+@app.get("/api/jobs/search")
+async def search_jobs_endpoint(q: str, source: Optional[str] = None, location: Optional[str] = None,
+                               job_type: Optional[str] = None, limit: int = 20, offset: int = 0):
+    limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+    offset = max(0, offset)
+    results = await db_manager.search_jobs_async(q, source=source, location=location, job_type=job_type,
+                                                 limit=limit, offset=offset)
+    return {"query": q, "results": results, "limit": limit, "offset": offset}
+
+@app.get("/api/skills/trends")
+async def skill_trends_endpoint(days: int = 30, limit: int = 20, source: Optional[str] = None):
+    # days=0: all-time counts, no growth
+    days = max(0, min(days, MAX_TREND_DAYS))
+    limit = max(1, min(limit, MAX_TREND_LIMIT))
+    trends = await db_manager.skill_trends_async(days=days, limit=limit, source=source)
+    return {"days": days, "source": source, "limit": limit, **trends}
 
 # Chatbot endpoints remain the same
 chatbot = CareerGuidanceChatbot()
@@ -146,7 +208,8 @@ async def start_chat_session(user_id: str):
 
 @app.post("/chat/message")
 async def send_chat_message(chat_data: ChatMessage):
-    return {"success": True, "response": chatbot.process_message(chat_data.user_id, chat_data.message), "user_id": chat_data.user_id}
+    response = await chatbot.process_message(chat_data.user_id, chat_data.message)
+    return {"success": True, "response": response, "user_id": chat_data.user_id}
 
 @app.get("/chat/history/{user_id}")
 async def get_chat_history(user_id: str):
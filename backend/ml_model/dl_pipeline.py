@@ -1,4 +1,5 @@
 import os
+import re
 import pickle
 import faiss
 import numpy as np
@@ -10,11 +11,34 @@ INDEX_PATH = os.path.join(BASE_DIR, "job_index.faiss")
 META_PATH = os.path.join(BASE_DIR, "job_metadata.pkl")
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 
+# "truncate" feeds the whole resume to the model (which silently cuts it at
+# max_seq_length); "chunked" embeds token-bounded chunks and pools them.
+EMBEDDING_MODES = ("truncate", "chunked")
+POOLING_METHODS = ("mean", "max", "section")
+CHUNK_OVERLAP_TOKENS = 32
+# Relative weight of each resume section for pooling="section"
+SECTION_WEIGHTS = {
+    "skills": 1.5,
+    "experience": 1.2,
+    "projects": 1.0,
+    "certifications": 0.8,
+    "achievements": 0.8,
+    "education": 0.6,
+    "header": 0.5,
+}
+
 class DLPipeline:
-    def __init__(self):
+    def __init__(self, embedding_mode="chunked", pooling="mean", use_cache=True):
+        if embedding_mode not in EMBEDDING_MODES:
+            raise ValueError(f"embedding_mode must be one of {EMBEDDING_MODES}")
+        if pooling not in POOLING_METHODS:
+            raise ValueError(f"pooling must be one of {POOLING_METHODS}")
         # Load embedding model
         print(f"Loading embedding model: {EMBEDDING_MODEL} ...")
         self.model = SentenceTransformer(EMBEDDING_MODEL)
+        self.embedding_mode = embedding_mode
+        self.pooling = pooling
+        self.use_cache = use_cache
         self.index = None
         self.metadata = None
         self.load_index()
@@ -37,22 +61,114 @@ class DLPipeline:
             self.index = None
             self.metadata = None
 
+    def chunk_resume(self, resume_text):
+        """
+        Split a resume into (section, text) chunks that each fit the model's
+        max_seq_length. Chunks never straddle a section boundary, so each can be
+        weighted by the section it came from. Text outside any section only becomes
+        a "header"/"other" chunk if it holds more than the section header words.
+        """
+        from resume_sections import segment_sections, strip_section_headers
+
+        spans = sorted((start, end, name) for name, (start, end) in segment_sections(resume_text).items())
+        pieces, cursor = [], 0
+        for start, end, name in spans:
+            if start > cursor:
+                pieces.append(("header" if cursor == 0 else "other",
+                               strip_section_headers(resume_text[cursor:start])))
+            pieces.append((name, resume_text[start:end]))
+            cursor = max(cursor, end)
+        if cursor < len(resume_text):
+            pieces.append(("header" if cursor == 0 else "other", strip_section_headers(resume_text[cursor:])))
+
+        tokenizer = self.model.tokenizer
+        max_tokens = self.model.max_seq_length - 2  # room for [CLS]/[SEP]
+        step = max_tokens - CHUNK_OVERLAP_TOKENS
+        chunks = []
+        for section, text in pieces:
+            if not text.strip():
+                continue
+            offsets = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+            for first in range(0, max(len(offsets), 1), step):
+                window = offsets[first:first + max_tokens]
+                if not window:
+                    break
+                chunk = text[window[0][0]:window[-1][1]].strip()
+                if chunk:
+                    chunks.append((section, re.sub(r'\s+', ' ', chunk)))
+                if first + max_tokens >= len(offsets):
+                    break
+        return chunks
+
+    def embed_resume(self, resume_text):
+        """Return a single normalized (1, dim) float32 embedding for a resume."""
+        if self.embedding_mode == "truncate":
+            return self.model.encode([resume_text], convert_to_numpy=True, normalize_embeddings=True)
+
+        from parse_cache import get_parse_cache, text_digest
+        from resume_sections import PARSER_VERSION
+
+        cache_model = f"{EMBEDDING_MODEL}:{self.embedding_mode}:{self.pooling}"
+        digest = text_digest(resume_text)
+        if self.use_cache:
+            cached = get_parse_cache().get_embedding(digest, PARSER_VERSION, cache_model)
+            if cached is not None:
+                return cached.reshape(1, -1)
+
+        chunks = self.chunk_resume(resume_text) or [("header", resume_text)]
+        # All chunks go through the model as one batch
+        chunk_embeddings = self.model.encode(
+            [text for _, text in chunks], batch_size=32, convert_to_numpy=True, normalize_embeddings=True
+        )
+        pooled = self._pool(chunks, chunk_embeddings).reshape(1, -1)
+
+        if self.use_cache:
+            get_parse_cache().put_embedding(digest, PARSER_VERSION, cache_model, pooled[0])
+        return pooled
+
+    def _pool(self, chunks, chunk_embeddings):
+        """Pool the chunk embeddings of one resume into a normalized (dim,) vector."""
+        if self.pooling == "max":
+            pooled = chunk_embeddings.max(axis=0)
+        elif self.pooling == "section":
+            weights = [SECTION_WEIGHTS.get(section, 1.0) for section, _ in chunks]
+            pooled = np.average(chunk_embeddings, axis=0, weights=weights)
+        else:
+            pooled = chunk_embeddings.mean(axis=0)
+        return (pooled / (np.linalg.norm(pooled) or 1.0)).astype("float32")
+
+    def embed_resumes(self, resume_texts, batch_size=64):
+        """
+        embed_resume() for many resumes: an (n, dim) float32 array. The chunks of
+        all resumes go through the model together, then are pooled per resume.
+        """
+        resume_texts = list(resume_texts)
+        if not resume_texts:
+            return np.zeros((0, self.model.get_sentence_embedding_dimension()), dtype="float32")
+        if self.embedding_mode == "truncate":
+            return np.asarray(self.model.encode(
+                resume_texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True
+            ), dtype="float32")
+
+        per_resume = [self.chunk_resume(text) or [("header", text)] for text in resume_texts]
+        chunk_embeddings = self.model.encode(
+            [text for chunks in per_resume for _, text in chunks],
+            batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True
+        )
+        pooled, start = [], 0
+        for chunks in per_resume:
+            pooled.append(self._pool(chunks, chunk_embeddings[start:start + len(chunks)]))
+            start += len(chunks)
+        return np.vstack(pooled)
+
     def search_jobs(self, resume_text, top_n=5):
         """Search for top N matching jobs dynamically using FAISS."""
         if not self.index or not self.metadata:
             print("⚠️ FAISS index not available. Returning empty results dynamically.")
             return []
 
-        # Encode resume text
-        query_embedding = self.model.encode([resume_text], convert_to_numpy=True, normalize_embeddings=True)
-        scores, indices = self.index.search(query_embedding, top_n)
-
-        # Convert resume text into a rough skill list (you can refine this)
-        user_skills = [s.lower().strip() for s in resume_text.split()]
-
         results = []
-        # Encode resume with normalized embeddings
-        query_embedding = self.model.encode([resume_text], convert_to_numpy=True, normalize_embeddings=True)
+        query_embedding = self.embed_resume(resume_text)
         scores, indices = self.index.search(query_embedding, top_n)
 
         for idx, score in zip(indices[0], scores[0]):
@@ -9,7 +9,8 @@ import random
 import re
 from urllib.parse import urljoin, quote
 import json
-from db import init_db, add_career_skills, clear_career_skills, get_career_count
+from db import init_db, add_career_skills_bulk, clear_career_skills, get_career_count
+from skill_aliases import canonicalize_skills
 
 class NaukriScraper:
     def __init__(self):
@@ -161,7 +162,7 @@ class NaukriScraper:
                 len(skill) < 30):  # Avoid very long strings
                 cleaned.append(skill)
         
-        return list(set(cleaned))  # Remove duplicates
+        return canonicalize_skills(cleaned)  # Map variants to one name and remove duplicates
     
     def scrape_multiple_categories(self, categories=None, max_jobs_per_category=50):
         """Scrape jobs from multiple categories"""
@@ -215,14 +216,13 @@ def sync_naukri_data():
         
         # Add to database
         print("💾 Adding data to database...")
-        added_count = 0
+        # Only add jobs with skills; one batched transaction per 1000 jobs
+        stats = add_career_skills_bulk(
+            (job['title'], job['skills']) for job in jobs if job['skills']
+        )
         
-        for job in jobs:
-            if job['skills']:  # Only add jobs with skills
-                add_career_skills(job['title'], job['skills'])
-                added_count += 1
-        
-        print(f"✅ Added {added_count} career-skill mappings to database")
+        print(f"✅ Added {stats['links_created']} career-skill mappings "
+              f"({stats['careers_created']} new careers) from {stats['pairs']} jobs")
         
         # Verify database
         total_careers = get_career_count()
@@ -1,7 +1,6 @@
 import os
 import requests
 import zipfile
-import sqlite3
 import csv
 import time
 import socket
@@ -9,6 +8,9 @@ import logging
 from typing import Optional, Tuple, Dict, List, Any
 from urllib.parse import urlparse
 from skills_taxonomy import refresh_skills_cache
+from skill_aliases import canonicalize_skill
+from career_skills_db import replace_source_career_skills
+from skill_embeddings import refresh_skill_index_safely
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -119,6 +121,11 @@ def download_onet() -> Tuple[bool, str]:
     
     return False, "All download attempts failed"
 
+def _add_skill(skill_map, soc, skill, importance=1.0):
+    """Record a skill for an occupation, keeping its highest importance (0-1)."""
+    skills = skill_map.setdefault(soc, {})
+    skills[skill] = max(importance, skills.get(skill, 0.0))
+
 def parse_skills():
     """Parse O*NET skills and occupation data from multiple sources"""
     try:
@@ -151,9 +158,7 @@ def parse_skills():
                         
                         # Higher threshold for general skills (4.0+)
                         if importance >= 4.0:
-                            if soc not in skill_map:
-                                skill_map[soc] = set()
-                            skill_map[soc].add(skill.lower().strip())
+                            _add_skill(skill_map, soc, canonicalize_skill(skill), importance / 5.0)
                     except (ValueError, KeyError):
                         continue
         
@@ -171,9 +176,7 @@ def parse_skills():
                         tech_skill = row.get("Example", "").strip()
                         
                         if tech_skill and len(tech_skill) > 2:
-                            if soc not in skill_map:
-                                skill_map[soc] = set()
-                            skill_map[soc].add(tech_skill.lower().strip())
+                            _add_skill(skill_map, soc, canonicalize_skill(tech_skill))
                             tech_count += 1
                     except KeyError:
                         continue
@@ -195,9 +198,7 @@ def parse_skills():
                         
                         # Include important knowledge areas
                         if importance >= 3.5:
-                            if soc not in skill_map:
-                                skill_map[soc] = set()
-                            skill_map[soc].add(f"{knowledge.lower().strip()} knowledge")
+                            _add_skill(skill_map, soc, f"{knowledge.lower().strip()} knowledge", importance / 5.0)
                             knowledge_count += 1
                     except (ValueError, KeyError):
                         continue
@@ -223,9 +224,7 @@ def parse_skills():
                                 break
                         
                         if tool and len(tool.strip()) > 2:
-                            if soc not in skill_map:
-                                skill_map[soc] = set()
-                            skill_map[soc].add(tool.lower().strip())
+                            _add_skill(skill_map, soc, canonicalize_skill(tool))
                             tools_count += 1
                     except KeyError:
                         continue
@@ -235,7 +234,7 @@ def parse_skills():
         
         print(f"Processed skills for {len(skill_map)} occupations")
         
-        # Build final mapping
+        # Build final mapping: (title, [skills], {skill: importance})
         career_skills = []
         for soc, skills in skill_map.items():
             title = occ_map.get(soc, soc)
@@ -243,16 +242,16 @@ def parse_skills():
                 # Clean and filter skills
                 clean_skills = [s for s in skills if len(s) > 2 and len(s) < 100]
                 if clean_skills:
-                    career_skills.append((title, ",".join(sorted(clean_skills))))
+                    career_skills.append((title, sorted(clean_skills), skills))
         
         print(f"Created {len(career_skills)} career-skill mappings")
         
         # Debug: Show a few examples
         if career_skills:
             print("Sample mappings:")
-            for i, (title, skills) in enumerate(career_skills[:3]):
-                skills_list = skills.split(",")[:5]  # First 5 skills
-                print(f"  {title}: {', '.join(skills_list)} (total: {len(skills.split(','))})")
+            for i, (title, skills, _) in enumerate(career_skills[:3]):
+                skills_list = skills[:5]  # First 5 skills
+                print(f"  {title}: {', '.join(skills_list)} (total: {len(skills)})")
         
         return career_skills
         
@@ -261,33 +260,11 @@ def parse_skills():
         return []
 
 def update_db(career_skills):
-    """Update SQLite database with career-skills mappings"""
+    """Replace the O*NET-sourced career-skill links in the database"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        
-        # Create table if it doesn't exist
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS career_skills (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                career_title TEXT,
-                skills TEXT,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Clear old data
-        c.execute("DELETE FROM career_skills")
-        
-        # Insert new data
-        for title, skills in career_skills:
-            c.execute(
-                "INSERT INTO career_skills (career_title, skills) VALUES (?, ?)", 
-                (title, skills)
-            )
-        
-        conn.commit()
-        conn.close()
+        # Links added by the scrapers are kept; only O*NET's own rows are replaced.
+        # Bumps the taxonomy version so other worker processes reload.
+        replace_source_career_skills(career_skills, source="onet")
         
         print(f"Database updated with {len(career_skills)} records")
         
@@ -361,6 +338,9 @@ def main() -> bool:
             logger.info("✓ Skills cache refreshed")
         except Exception as e:
             logger.warning(f"Could not refresh skills cache (this is non-fatal): {e}")
+
+        # Embed any skills the sync introduced
+        refresh_skill_index_safely()
         
         logger.info("\n" + "=" * 60)
         logger.info("O*NET SYNC COMPLETED SUCCESSFULLY!")
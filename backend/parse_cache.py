@@ -0,0 +1,200 @@
+"""
+Persistent cache for parsed resumes.
+
+Entries are keyed by the SHA-256 of the uploaded file's bytes plus the parser
+version, so re-uploading or re-viewing the same resume never re-parses it, and
+bumping resume_sections.PARSER_VERSION invalidates everything parsed by older code.
+Each entry holds the parse output and, optionally, the resume embedding.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DB_PATH = os.path.join(BASE_DIR, "parse_cache.db")
+# Total bytes of cached payloads before least-recently-used entries are evicted
+MAX_CACHE_BYTES = int(os.environ.get("PARSE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+
+def file_digest(file_path: str, chunk_size: int = 1 << 16) -> str:
+    """SHA-256 of a file's contents, read in chunks."""
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def text_digest(text: str) -> str:
+    """SHA-256 of a text string (used for caches keyed by resume text)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ParseCache:
+    def __init__(self, db_path: str = CACHE_DB_PATH, max_bytes: int = MAX_CACHE_BYTES):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS parse_results (
+                digest TEXT NOT NULL,
+                parser_version TEXT NOT NULL,
+                result TEXT,
+                embedding BLOB,
+                embedding_model TEXT,
+                size INTEGER NOT NULL DEFAULT 0,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (digest, parser_version)
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_parse_results_last_access ON parse_results(last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, digest: str, parser_version: str) -> Optional[Dict[str, Any]]:
+        """Return the cached parse output, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM parse_results WHERE digest = ? AND parser_version = ?",
+                (digest, parser_version)
+            ).fetchone()
+            if not row or row[0] is None:
+                return None
+            self._touch(digest, parser_version)
+        return json.loads(row[0])
+
+    def put(self, digest: str, parser_version: str, result: Dict[str, Any]):
+        """Store a parse output, keeping any embedding already cached for the entry."""
+        payload = json.dumps(result, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO parse_results (digest, parser_version, result, size, last_access)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(digest, parser_version) DO UPDATE SET
+                    result = excluded.result,
+                    size = excluded.size + COALESCE(LENGTH(parse_results.embedding), 0),
+                    last_access = excluded.last_access
+            """, (digest, parser_version, payload, len(payload.encode("utf-8")), time.time()))
+            self._conn.commit()
+            self._evict()
+
+    def get_embedding(self, digest: str, parser_version: str, model: str) -> Optional[np.ndarray]:
+        """Return the cached embedding for an entry if it was computed with `model`."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT embedding FROM parse_results "
+                "WHERE digest = ? AND parser_version = ? AND embedding_model = ?",
+                (digest, parser_version, model)
+            ).fetchone()
+            if not row or row[0] is None:
+                return None
+            self._touch(digest, parser_version)
+        return np.frombuffer(row[0], dtype="float32")
+
+    def put_embedding(self, digest: str, parser_version: str, model: str, embedding):
+        """Attach an embedding to an entry (creating the entry if needed)."""
+        blob = np.asarray(embedding, dtype="float32").tobytes()
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO parse_results
+                    (digest, parser_version, embedding, embedding_model, size, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(digest, parser_version) DO UPDATE SET
+                    embedding = excluded.embedding,
+                    embedding_model = excluded.embedding_model,
+                    size = excluded.size + COALESCE(LENGTH(parse_results.result), 0),
+                    last_access = excluded.last_access
+            """, (digest, parser_version, blob, model, len(blob), time.time()))
+            self._conn.commit()
+            self._evict()
+
+    def purge_stale_versions(self, parser_version: str) -> int:
+        """Delete entries written by any other parser version."""
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM parse_results WHERE parser_version != ?", (parser_version,)
+            )
+            self._conn.commit()
+            return cur.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM parse_results"
+            ).fetchone()
+        return {"entries": count, "bytes": total, "max_bytes": self.max_bytes}
+
+    def _touch(self, digest: str, parser_version: str):
+        self._conn.execute(
+            "UPDATE parse_results SET last_access = ? WHERE digest = ? AND parser_version = ?",
+            (time.time(), digest, parser_version)
+        )
+        self._conn.commit()
+
+    def _evict(self):
+        """Drop least-recently-used entries until the cache fits in max_bytes."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM parse_results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for digest, version, size in self._conn.execute(
+            "SELECT digest, parser_version, size FROM parse_results ORDER BY last_access"
+        ):
+            if total <= self.max_bytes:
+                break
+            victims.append((digest, version))
+            total -= size
+        self._conn.executemany(
+            "DELETE FROM parse_results WHERE digest = ? AND parser_version = ?", victims
+        )
+        self._conn.commit()
+        logger.info(f"Parse cache evicted {len(victims)} entries")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_parse_cache() -> ParseCache:
+    """Process-wide cache instance, created on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                from resume_sections import PARSER_VERSION
+                _cache = ParseCache()
+                _cache.purge_stale_versions(PARSER_VERSION)
+    return _cache
+
+
+def get_parsed_resume(file_path: str) -> Dict[str, Any]:
+    """
+    parse_resume() with a persistent cache in front of it.
+    Identical files (by content) are parsed once per parser version.
+    """
+    from resume_parser import parse_resume
+    from resume_sections import PARSER_VERSION
+
+    cache = get_parse_cache()
+    digest = file_digest(file_path)
+    cached = cache.get(digest, PARSER_VERSION)
+    if cached is not None:
+        return cached
+
+    result = parse_resume(file_path)
+    # Extraction failures (timeouts, OOM) may be transient; don't pin them in the cache
+    if "error" not in result:
+        cache.put(digest, PARSER_VERSION, result)
+    return result
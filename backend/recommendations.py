@@ -0,0 +1,284 @@
+"""
+Batch career recommendations for stored users.
+
+Every user's resume_text and every active job in career_guidance.db are
+embedded with the model DLPipeline uses (resumes chunked and pooled the same
+way), and each user gets the TOP_N most similar jobs stored as
+CareerRecommendation rows: cosine similarity, plus the job's skills found
+in / missing from the resume as JSON lists.
+
+Embeddings are cached in the embeddings table against the updated_at of the
+user or job they came from (a job's skills are embedded too; triggers on
+job_skills touch jobs.updated_at), so a re-run only embeds what changed since the
+last run, and only rewrites the recommendations that can have changed:
+- users whose resume changed, whose list holds a changed or removed job, or
+  whose list is short, are rescored against every job;
+- everyone else keeps their list, merged with the scores of new and changed jobs.
+
+    python recommendations.py
+"""
+import re
+import json
+import time
+import logging
+from collections import defaultdict
+
+import numpy as np
+from sqlalchemy import select, delete, insert
+
+from database import CareerRecommendation, Embedding, Job, JobSkill, Skill, User
+
+logger = logging.getLogger(__name__)
+
+TOP_N = 10
+# Users or jobs embedded / scored per transaction
+CHUNK_SIZE = 256
+# Characters of job description embedded after the title and skills
+JOB_DESCRIPTION_CHARS = 1000
+IN_CLAUSE_BATCH = 500
+
+_NON_SKILL_CHARS_RE = re.compile(r"[^a-z0-9+#./]+")
+# Sentence punctuation around a word, but not inside "node.js" or "ci/cd"
+_EDGE_PUNCTUATION_RE = re.compile(r"(?<= )[./]+|[./]+(?= )")
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _skill_text(text: str) -> str:
+    """Lowercased text reduced to space-separated skill tokens, padded with spaces."""
+    text = _EDGE_PUNCTUATION_RE.sub(" ", f" {_NON_SKILL_CHARS_RE.sub(' ', text.lower())} ")
+    return f" {' '.join(text.split())} "
+
+
+def skill_gap(resume_text: str, job_skills):
+    """(matching, missing): the job skills that do / do not appear in the resume text."""
+    resume = _skill_text(resume_text) if resume_text else " "
+    matching, missing = [], []
+    for skill in job_skills:
+        (matching if _skill_text(skill) in resume else missing).append(skill)
+    return matching, missing
+
+
+# ---------- Embedding cache ----------
+def _stale(session, kind, rows):
+    """
+    Compare (id, updated_at) rows with the cached embeddings of `kind`.
+    Returns (ids to embed, ids whose cached embedding is no longer needed).
+    """
+    cached = dict(session.execute(
+        select(Embedding.entity_id, Embedding.source_updated_at).where(Embedding.kind == kind)
+    ).all())
+    stale = [entity_id for entity_id, updated_at in rows
+             if entity_id not in cached or cached[entity_id] != updated_at]
+    removed = cached.keys() - {entity_id for entity_id, _ in rows}
+    return stale, removed
+
+
+def _store_embeddings(session, kind, updated_at, vectors):
+    """Replace the cached embeddings of `kind` for the ids in `updated_at` (id -> updated_at)."""
+    ids = list(updated_at)
+    session.execute(delete(Embedding).where(Embedding.kind == kind, Embedding.entity_id.in_(ids)))
+    session.execute(insert(Embedding), [
+        {"kind": kind, "entity_id": entity_id, "source_updated_at": updated_at[entity_id],
+         "vector": np.asarray(vector, dtype="float32").tobytes()}
+        for entity_id, vector in zip(ids, vectors)
+    ])
+
+
+def _delete_embeddings(session, kind, ids):
+    for part in _chunks(list(ids), IN_CLAUSE_BATCH):
+        session.execute(delete(Embedding).where(Embedding.kind == kind, Embedding.entity_id.in_(part)))
+
+
+def _load_matrix(session, kind):
+    """(ids, float32 matrix) of every cached embedding of `kind`."""
+    rows = session.execute(
+        select(Embedding.entity_id, Embedding.vector).where(Embedding.kind == kind).order_by(Embedding.entity_id)
+    ).all()
+    if not rows:
+        return [], None
+    return [entity_id for entity_id, _ in rows], np.vstack([np.frombuffer(v, dtype="float32") for _, v in rows])
+
+
+def _job_skills(session, job_ids):
+    skills = defaultdict(list)
+    for part in _chunks(list(job_ids), IN_CLAUSE_BATCH):
+        for job_id, name in session.execute(
+            select(JobSkill.job_id, Skill.name).join(Skill, Skill.id == JobSkill.skill_id)
+            .where(JobSkill.job_id.in_(part)).order_by(JobSkill.job_id, Skill.name)
+        ):
+            skills[job_id].append(name)
+    return skills
+
+
+def _embed_jobs(session, pipeline, updated_at, chunk_size):
+    ids = list(updated_at)
+    for chunk in _chunks(ids, chunk_size):
+        rows = dict((job_id, (title, description)) for job_id, title, description in session.execute(
+            select(Job.id, Job.title, Job.description).where(Job.id.in_(chunk))
+        ))
+        skills = _job_skills(session, chunk)
+        texts = [
+            f"{rows[job_id][0]} {' '.join(skills[job_id])} {(rows[job_id][1] or '')[:JOB_DESCRIPTION_CHARS]}"
+            for job_id in chunk
+        ]
+        vectors = pipeline.model.encode(texts, batch_size=64, convert_to_numpy=True, normalize_embeddings=True)
+        _store_embeddings(session, "job", {job_id: updated_at[job_id] for job_id in chunk}, vectors)
+        session.commit()
+
+
+def _embed_users(session, pipeline, updated_at, chunk_size):
+    ids = list(updated_at)
+    for chunk in _chunks(ids, chunk_size):
+        texts = dict(session.execute(select(User.id, User.resume_text).where(User.id.in_(chunk))).all())
+        vectors = pipeline.embed_resumes([texts[user_id] for user_id in chunk])
+        _store_embeddings(session, "user", {user_id: updated_at[user_id] for user_id in chunk}, vectors)
+        session.commit()
+
+
+# ---------- Scoring ----------
+def _search(job_ids, job_matrix, user_matrix, k):
+    """Top-k (job_id, score) lists for each row of user_matrix, by inner product."""
+    import faiss
+
+    index = faiss.IndexFlatIP(job_matrix.shape[1])
+    index.add(job_matrix)
+    scores, positions = index.search(np.ascontiguousarray(user_matrix), k)
+    return [
+        [(job_ids[p], float(s)) for s, p in zip(row_scores, row_positions) if p != -1]
+        for row_scores, row_positions in zip(scores, positions)
+    ]
+
+
+def materialize_recommendations(manager=None, top_n: int = TOP_N, chunk_size: int = CHUNK_SIZE,
+                                pipeline=None) -> dict:
+    """
+    Bring CareerRecommendation in line with the current users and jobs.
+    `pipeline` is a DLPipeline (created on demand when something needs embedding).
+    Returns counts of what was embedded and rewritten.
+    """
+    if manager is None:
+        from database import db_manager as manager
+
+    started = time.perf_counter()
+    stats = {"jobs_embedded": 0, "users_embedded": 0, "users_rescored": 0, "users_merged": 0,
+             "recommendations_inserted": 0, "recommendations_deleted": 0}
+    session = manager.get_session()
+    try:
+        jobs = session.execute(select(Job.id, Job.updated_at).where(Job.is_active.isnot(False))).all()
+        users = session.execute(
+            select(User.id, User.updated_at).where(User.resume_text.isnot(None), User.resume_text != "")
+        ).all()
+        stale_jobs, removed_jobs = _stale(session, "job", jobs)
+        stale_users, removed_users = _stale(session, "user", users)
+
+        if stale_jobs or stale_users:
+            if pipeline is None:
+                from ml_model.dl_pipeline import DLPipeline
+                pipeline = DLPipeline()
+            stale_job_set, stale_user_set = set(stale_jobs), set(stale_users)
+            _embed_jobs(session, pipeline, {i: u for i, u in jobs if i in stale_job_set}, chunk_size)
+            _embed_users(session, pipeline, {i: u for i, u in users if i in stale_user_set}, chunk_size)
+        stats["jobs_embedded"], stats["users_embedded"] = len(stale_jobs), len(stale_users)
+
+        # Jobs gone or deactivated, users without a resume: drop their embeddings and recommendations
+        _delete_embeddings(session, "job", removed_jobs)
+        _delete_embeddings(session, "user", removed_users)
+        for part in _chunks(list(removed_jobs), IN_CLAUSE_BATCH):
+            stats["recommendations_deleted"] += session.execute(
+                delete(CareerRecommendation).where(CareerRecommendation.job_id.in_(part))
+            ).rowcount
+        for part in _chunks(list(removed_users), IN_CLAUSE_BATCH):
+            stats["recommendations_deleted"] += session.execute(
+                delete(CareerRecommendation).where(CareerRecommendation.user_id.in_(part))
+            ).rowcount
+        session.commit()
+
+        job_ids, job_matrix = _load_matrix(session, "job")
+        user_ids, user_matrix = _load_matrix(session, "user")
+        if not job_ids or not user_ids:
+            return _finish(stats, started)
+
+        existing = defaultdict(dict)  # user_id -> {job_id: (row id, score)}
+        for row_id, user_id, job_id, score in session.execute(select(
+            CareerRecommendation.id, CareerRecommendation.user_id,
+            CareerRecommendation.job_id, CareerRecommendation.similarity_score
+        )):
+            existing[user_id][job_id] = (row_id, score)
+
+        # A list that holds a changed job, or is shorter than it should be, cannot be merged
+        k = min(top_n, len(job_ids))
+        changed = set(stale_jobs)
+        rescore = set(stale_users) | {
+            user_id for user_id in user_ids
+            if len(existing[user_id]) < k or changed & existing[user_id].keys()
+        }
+        merge = [user_id for user_id in user_ids if user_id not in rescore] if changed else []
+        stats["users_rescored"], stats["users_merged"] = len(rescore), len(merge)
+
+        position = {user_id: p for p, user_id in enumerate(user_ids)}
+        changed_ids = [job_id for job_id in job_ids if job_id in changed]
+        changed_matrix = job_matrix[[p for p, job_id in enumerate(job_ids) if job_id in changed]] if changed_ids else None
+        job_skills = {}
+
+        for chunk in _chunks(sorted(rescore) + merge, chunk_size):
+            chunk_rescore = [user_id for user_id in chunk if user_id in rescore]
+            chunk_merge = [user_id for user_id in chunk if user_id not in rescore]
+            final = {}
+            if chunk_rescore:
+                found = _search(job_ids, job_matrix, user_matrix[[position[u] for u in chunk_rescore]], k)
+                final.update(zip(chunk_rescore, found))
+            if chunk_merge:
+                found = _search(changed_ids, changed_matrix, user_matrix[[position[u] for u in chunk_merge]],
+                                min(k, len(changed_ids)))
+                for user_id, candidates in zip(chunk_merge, found):
+                    scores = {job_id: score for job_id, (_, score) in existing[user_id].items()}
+                    scores.update(candidates)
+                    final[user_id] = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+            # Rescored users get fresh rows; merged users keep the rows still in their list
+            to_delete, to_insert = [], []
+            for user_id, recommended in final.items():
+                keep = set() if user_id in rescore else {job_id for job_id, _ in recommended}
+                to_delete.extend(row_id for job_id, (row_id, _) in existing[user_id].items() if job_id not in keep)
+                to_insert.extend((user_id, job_id, score) for job_id, score in recommended
+                                 if user_id in rescore or job_id not in existing[user_id])
+            if not to_insert and not to_delete:
+                continue
+
+            job_skills.update(_job_skills(session, {job_id for _, job_id, _ in to_insert} - job_skills.keys()))
+            resumes = dict(session.execute(
+                select(User.id, User.resume_text).where(User.id.in_({user_id for user_id, _, _ in to_insert}))
+            ).all())
+            rows = []
+            for user_id, job_id, score in to_insert:
+                matching, missing = skill_gap(resumes.get(user_id), job_skills.get(job_id, []))
+                rows.append({"user_id": user_id, "job_id": job_id, "similarity_score": score,
+                             "matching_skills": json.dumps(matching), "missing_skills": json.dumps(missing)})
+            for part in _chunks(to_delete, IN_CLAUSE_BATCH):
+                session.execute(delete(CareerRecommendation).where(CareerRecommendation.id.in_(part)))
+            if rows:
+                session.execute(insert(CareerRecommendation), rows)
+            session.commit()
+            stats["recommendations_deleted"] += len(to_delete)
+            stats["recommendations_inserted"] += len(rows)
+        return _finish(stats, started)
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def _finish(stats, started):
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    logger.info(f"Recommendations materialized: {stats}")
+    return stats
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(materialize_recommendations())
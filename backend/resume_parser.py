@@ -1,11 +1,13 @@
 import re
-import pdfplumber
-import docx
 import spacy
 import os
 import logging
 from nltk.corpus import stopwords
 import nltk
+from skill_aliases import canonicalize_skills
+from skill_embeddings import map_to_taxonomy
+from extraction_worker import extract_text_isolated
+from resume_sections import segment_sections, get_section
 
 # Download resources silently
 nltk.download('stopwords', quiet=True)
@@ -32,33 +34,6 @@ SKILL_KEYWORDS = {
     "jira", "git", "github", "rest api", "fastapi", "power bi", "excel"
 }
 
-# ---------- Text Extraction ----------
-def extract_text_from_pdf(file_path):
-    text = ""
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            content = page.extract_text()
-            if content:
-                text += content + "\n"
-    return text
-
-
-def extract_text_from_docx(file_path):
-    doc = docx.Document(file_path)
-    return "\n".join([p.text for p in doc.paragraphs])
-
-
-def extract_text_from_doc(file_path):
-    """Basic support for .doc files using antiword if installed"""
-    try:
-        import subprocess
-        result = subprocess.run(["antiword", file_path], capture_output=True, text=True)
-        return result.stdout
-    except Exception:
-        logger.warning("antiword not available. .doc extraction limited.")
-        return ""
-
-
 def clean_text(text):
     text = re.sub(r'\s+', ' ', text)
     text = re.sub(r'[^\x00-\x7F]+', ' ', text)
@@ -83,7 +58,7 @@ def extract_phone(text):
     return match.group(0) if match else None
 
 
-def extract_skills(text):
+def extract_skills(text, sections=None):
     text_lower = text.lower()
 
     # Expanded keyword set (add or pull dynamically from job_metadata.pkl)
@@ -113,83 +88,135 @@ def extract_skills(text):
         if skill in text_lower:
             found.add(skill)
 
-    return sorted(found)
+    # Free-text entries of the skills section ("ML", "google cloud platform")
+    # mapped onto the taxonomy by the semantic skill index
+    skills_section = get_section(text, "skills", sections)
+    if skills_section:
+        found.update(map_to_taxonomy(split_skill_phrases(skills_section)))
 
+    return sorted(set(canonicalize_skills(found)))
 
 
-def extract_education(text):
-    edu_keywords = [
-        "bachelor", "master", "phd", "b.tech", "m.tech", "b.sc", "m.sc",
-        "mba", "bca", "mca", "bcom", "mcom", "degree", "diploma"
-    ]
-    found = [w for w in edu_keywords if w in text.lower()]
-    return sorted(set(found))
+_PHRASE_SPLIT_RE = re.compile(r'[,;|•·\n]+|\band\b')
 
 
-import re
+def split_skill_phrases(text, max_words=4):
+    """Split a skills list or chat message into short candidate skill phrases."""
+    phrases = []
+    for piece in _PHRASE_SPLIT_RE.split(text):
+        piece = piece.strip(" \t-:.()")
+        if piece and len(piece.split()) <= max_words:
+            phrases.append(piece)
+    return phrases
+
+
+
+EDU_KEYWORDS = [
+    "bachelor", "master", "phd", "b.tech", "m.tech", "b.sc", "m.sc",
+    "mba", "bca", "mca", "bcom", "mcom", "degree", "diploma"
+]
+# Zero-width lookahead so overlapping keywords are all reported in one scan
+_EDU_RE = re.compile(r'(?=(' + "|".join(re.escape(k) for k in EDU_KEYWORDS) + r'))')
+
 
-def extract_experience(text):
+def extract_education(text, sections=None):
+    edu_text = get_section(text, "education", sections)
+    if edu_text is None:
+        edu_text = text
+    found = {m.group(1) for m in _EDU_RE.finditer(edu_text.lower())}
+    return sorted(found)
+
+
+ROLE_SEPARATOR = " | "
+_COMPANY_RE = re.compile(r'\s*([A-Za-z&\s\.]+)')
+_DURATION_RE = re.compile(r'([A-Za-z]{3,9}\s*\d{4})\s*[-–]\s*([A-Za-z]{3,9}\s*\d{4}|Present)')
+
+
+def _role_block_starts(text):
+    """
+    Start offsets of role blocks such as "Marketing Manager | Hindustan Unilever Ltd.".
+    For every separator we walk back over the title (letters and spaces on the same
+    line) but never past the previous separator, so the scan is linear overall.
+    """
+    starts = []
+    floor = 0
+    pos = text.find(ROLE_SEPARATOR)
+    while pos != -1:
+        i = pos
+        while i > floor and (text[i - 1].isalpha() or text[i - 1] in " \t"):
+            i -= 1
+        # The title begins at the first capitalised word of that run
+        j = i
+        while j < pos and not (text[j].isupper() and (j == i or text[j - 1] in " \t")):
+            j += 1
+        if j < pos:
+            starts.append((j, pos))
+        floor = pos + len(ROLE_SEPARATOR)
+        pos = text.find(ROLE_SEPARATOR, floor)
+    return starts
+
+
+def extract_experience(text, sections=None):
     """
     Extract structured work experience data from resume text.
     """
     experience = []
-    exp_section = re.search(r'(?i)(professional experience|work experience)(.*?)(education|projects|certifications|achievements|skills|$)', text, re.DOTALL)
-    
-    if not exp_section:
+    exp_text = get_section(text, "experience", sections)
+    if not exp_text:
         return experience
-    
-    exp_text = exp_section.group(2)
-
-    # Split each role block (e.g., "Marketing Manager | Hindustan Unilever Ltd. ...")
-    role_blocks = re.split(r'(?=\b[A-Z][a-zA-Z\s]+ \| )', exp_text)
 
-    for block in role_blocks:
-        if len(block.strip()) < 30:
+    starts = _role_block_starts(exp_text)
+    for k, (start, sep) in enumerate(starts):
+        end = starts[k + 1][0] if k + 1 < len(starts) else len(exp_text)
+        if end - start < 30:
             continue
-        
-        role_match = re.search(r'^([A-Z][a-zA-Z\s]+)\s*\|\s*([A-Za-z&\s\.]+)', block)
-        duration_match = re.search(r'([A-Za-z]{3,9}\s*\d{4})\s*[-–]\s*([A-Za-z]{3,9}\s*\d{4}|Present)', block)
-        
-        role = role_match.group(1).strip() if role_match else ""
-        company = role_match.group(2).strip() if role_match else ""
+
+        role = exp_text[start:sep].strip()
+        company_match = _COMPANY_RE.match(exp_text, sep + len(ROLE_SEPARATOR), end)
+        company = company_match.group(1).strip() if company_match else ""
+        duration_match = _DURATION_RE.search(exp_text, sep, end)
         duration = f"{duration_match.group(1)} - {duration_match.group(2)}" if duration_match else ""
-        
-        # Description: everything after the duration
-        desc = ""
+
+        # Description: everything after the duration (or after the company line)
         if duration_match:
-            desc = block[duration_match.end():].strip()
-        elif role_match:
-            desc = block[role_match.end():].strip()
-        
+            desc = exp_text[duration_match.end():end]
+        elif company_match:
+            desc = exp_text[company_match.end():end]
+        else:
+            desc = exp_text[sep + len(ROLE_SEPARATOR):end]
+
         if role:
             experience.append({
                 "role": role,
                 "company": company,
                 "duration": duration,
-                "description": re.sub(r'\s+', ' ', desc)
+                "description": " ".join(desc.split())
             })
-    
+
     return experience
 
 
 
 # ---------- Main Parser ----------
 def parse_resume(resume_path):
-    text = ""
-    if resume_path.endswith(".pdf"):
-        import pdfplumber
-        with pdfplumber.open(resume_path) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() + "\n"
-    elif resume_path.endswith(".docx"):
-        from docx import Document
-        doc = Document(resume_path)
-        for para in doc.paragraphs:
-            text += para.text + "\n"
-
-    skills = extract_skills(text)   # your existing skill extractor
-    education = extract_education(text)
-    experience = extract_experience(text)
+    # Extraction runs in a sandboxed worker; failures come back as a status code
+    extraction = extract_text_isolated(resume_path)
+    text = extraction["text"]
+    status = extraction["status"]
+    if status != "ok":
+        logger.warning(f"Text extraction failed for {resume_path}: {status}")
+        return {
+            "raw_text": "",
+            "skills": [],
+            "education": [],
+            "experience": [],
+            "error": status
+        }
+
+    sections = segment_sections(text)
+    skills = extract_skills(text, sections)
+    education = extract_education(text, sections)
+    experience = extract_experience(text, sections)
 
     return {
         "raw_text": text.strip(),
@@ -0,0 +1,66 @@
+"""
+Resume section segmentation.
+
+Kept free of NLP dependencies so that both the parser and the embedding
+pipeline can split a resume into sections without loading spaCy or nltk.
+"""
+import re
+
+# Bump whenever extraction or segmentation logic changes so cached parse results
+# (and the resume embeddings cached alongside them) are invalidated
+PARSER_VERSION = "6"
+
+# Header phrase -> section name. A section runs from its header to the next header.
+SECTION_HEADERS = {
+    "professional experience": "experience",
+    "work experience": "experience",
+    "education": "education",
+    "projects": "projects",
+    "certifications": "certifications",
+    "achievements": "achievements",
+    "skills": "skills",
+}
+
+# One alternation of literal phrases: each position is tried against a bounded set
+# of fixed strings, so a finditer() pass is linear in the text length. The optional
+# `lead` group only matches at a line start and marks headers on their own line.
+_SECTION_HEADER_RE = re.compile(
+    r'(?im)(?P<lead>^[ \t]*)?\b(?P<header>'
+    + "|".join(re.escape(h) for h in sorted(SECTION_HEADERS, key=len, reverse=True))
+    + r')\b'
+)
+_WORD_RE = re.compile(r'\w')
+
+
+def segment_sections(text):
+    """
+    Find all section headers in a single pass and return {section: (start, end)}
+    spans into `text` (first occurrence of each section wins).
+    Headers that start a line are preferred; resumes flattened onto one line fall
+    back to headers found anywhere in the text.
+    """
+    line_markers, inline_markers = [], []
+    for m in _SECTION_HEADER_RE.finditer(text):
+        marker = (SECTION_HEADERS[m.group("header").lower()], m.start("header"), m.end())
+        (line_markers if m.group("lead") is not None else inline_markers).append(marker)
+
+    markers = line_markers or inline_markers
+    sections = {}
+    for i, (name, _, body_start) in enumerate(markers):
+        body_end = markers[i + 1][1] if i + 1 < len(markers) else len(text)
+        sections.setdefault(name, (body_start, body_end))
+    return sections
+
+
+def get_section(text, name, sections=None):
+    """Text of a named section, or None if the resume has no such header."""
+    if sections is None:
+        sections = segment_sections(text)
+    span = sections.get(name)
+    return text[span[0]:span[1]] if span else None
+
+
+def strip_section_headers(text):
+    """`text` with section header phrases removed; "" if nothing else is left."""
+    remainder = _SECTION_HEADER_RE.sub(" ", text)
+    return remainder if _WORD_RE.search(remainder) else ""
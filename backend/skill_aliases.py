@@ -0,0 +1,254 @@
+"""
+Skill alias canonicalization.
+
+Different extractors (resume parser, job scrapers, O*NET technology examples,
+Naukri tags) spell the same skill differently: "node", "nodejs", "node.js".
+The alias table in career_skills.db maps every known variant to one canonical
+name; it is compiled into a single dict lookup at load time and every extractor
+and career/skill writer passes skills through canonicalize_skill(). The table
+is created with the rest of the career_skills.db schema (career_skills_db).
+
+Run this module directly to re-canonicalize rows that were stored before the
+alias table existed:  python skill_aliases.py
+"""
+import re
+import time
+import sqlite3
+import threading
+from typing import Dict, Iterable, List
+
+# Seed aliases (variant -> canonical). Stored in the DB so they can be extended
+# without a code change; these are only inserted if missing.
+DEFAULT_ALIASES = {
+    # JavaScript ecosystem
+    "js": "javascript",
+    "java script": "javascript",
+    "ecmascript": "javascript",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "node js": "node.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "react js": "react",
+    "angularjs": "angular",
+    "angular.js": "angular",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "nextjs": "next.js",
+    "expressjs": "express",
+    "express.js": "express",
+    "html5": "html",
+    "css3": "css",
+    # Languages
+    "golang": "go",
+    "cpp": "c++",
+    "c plus plus": "c++",
+    "c sharp": "c#",
+    "csharp": "c#",
+    "py": "python",
+    "python3": "python",
+    # Data / ML
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "nlp": "natural language processing",
+    "sklearn": "scikit-learn",
+    "scikit learn": "scikit-learn",
+    "tensorflow2": "tensorflow",
+    "powerbi": "power bi",
+    "power-bi": "power bi",
+    "microsoft power bi": "power bi",
+    "ms excel": "excel",
+    "microsoft excel": "excel",
+    "advanced excel": "excel",
+    # Databases
+    "postgres": "postgresql",
+    "postgre sql": "postgresql",
+    "mongo": "mongodb",
+    "mongo db": "mongodb",
+    "ms sql": "sql server",
+    "mssql": "sql server",
+    "microsoft sql server": "sql server",
+    # Cloud / DevOps
+    "amazon web services": "aws",
+    "google cloud platform": "gcp",
+    "google cloud": "gcp",
+    "microsoft azure": "azure",
+    "k8s": "kubernetes",
+    "ci cd": "ci/cd",
+    "cicd": "ci/cd",
+    "ci-cd": "ci/cd",
+    "github actions ci": "github actions",
+    # APIs
+    "restful api": "rest api",
+    "restful apis": "rest api",
+    "rest apis": "rest api",
+    # Marketing
+    "search engine optimization": "seo",
+    "search engine marketing": "sem",
+    "pay per click": "ppc",
+    "social media marketing": "social media",
+    "customer relationship management": "crm",
+    "google adwords": "google ads",
+    "facebook ads": "meta ads",
+    # Tools
+    "ms office": "microsoft office",
+    "ms-office": "microsoft office",
+}
+
+# Seed aliases that were dropped for being ambiguous ("rest" is mostly the
+# English word). Removed from existing databases unless they were repointed.
+RETIRED_ALIASES = {
+    "ts": "typescript",
+    "dl": "deep learning",
+    "rest": "rest api",
+}
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_alias_map = None
+_alias_version = None  # taxonomy version _alias_map was loaded at
+_alias_lock = threading.Lock()
+# Seconds between checks of the on-disk taxonomy version, as in skills_taxonomy
+VERSION_CHECK_INTERVAL = 2.0
+_seen_version = None
+_version_checked_at = 0.0
+
+
+def normalize_skill(skill: str) -> str:
+    """Lowercase, trim and collapse inner whitespace (no alias lookup)."""
+    return _WHITESPACE_RE.sub(" ", skill.strip().lower())
+
+
+def init_alias_table(cursor):
+    """Create the alias table if needed and seed it with DEFAULT_ALIASES, in the caller's transaction."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS skill_aliases (
+            alias TEXT PRIMARY KEY,
+            canonical TEXT NOT NULL
+        )
+    """)
+    cursor.executemany(
+        "DELETE FROM skill_aliases WHERE alias = ? AND canonical = ?", RETIRED_ALIASES.items()
+    )
+    cursor.executemany(
+        "INSERT OR IGNORE INTO skill_aliases (alias, canonical) VALUES (?, ?)",
+        DEFAULT_ALIASES.items()
+    )
+
+
+def _compile(pairs: Iterable) -> Dict[str, str]:
+    """Build variant -> canonical, following alias chains (a -> b -> c) to the end."""
+    raw = {normalize_skill(alias): normalize_skill(canonical) for alias, canonical in pairs}
+    compiled = {}
+    for alias in raw:
+        target, seen = raw[alias], {alias}
+        while target in raw and target not in seen:
+            seen.add(target)
+            target = raw[target]
+        if target != alias:
+            compiled[alias] = target
+    return compiled
+
+
+def _taxonomy_version() -> int:
+    """On-disk taxonomy version, read at most every VERSION_CHECK_INTERVAL seconds."""
+    global _version_checked_at, _seen_version
+    now = time.monotonic()
+    if _seen_version is None or now - _version_checked_at >= VERSION_CHECK_INTERVAL:
+        from career_skills_db import get_taxonomy_version
+        _seen_version, _version_checked_at = get_taxonomy_version(), now
+    return _seen_version
+
+
+def load_alias_map(reload: bool = False) -> Dict[str, str]:
+    """
+    Compiled alias lookup, read from the DB on first use, on reload, and
+    whenever the taxonomy version changes (add_alias in any process bumps it).
+    """
+    global _alias_map, _alias_version
+    version = _taxonomy_version()
+    if _alias_map is None or reload or version != _alias_version:
+        with _alias_lock:
+            if _alias_map is None or reload or version != _alias_version:
+                from career_skills_db import DB_NAME, get_connection
+                try:
+                    # A plain read: callers may be inside a write transaction on this connection
+                    pairs = get_connection().execute("SELECT alias, canonical FROM skill_aliases").fetchall()
+                except sqlite3.Error as e:
+                    print(f"Warning: could not load skill aliases from {DB_NAME}: {e}")
+                    pairs = DEFAULT_ALIASES.items()
+                _alias_map, _alias_version = _compile(pairs), version
+    return _alias_map
+
+
+def canonicalize_skill(skill: str) -> str:
+    """Canonical name for a skill ("NodeJS " -> "node.js")."""
+    normalized = normalize_skill(skill)
+    return load_alias_map().get(normalized, normalized)
+
+
+def canonicalize_skills(skills: Iterable[str]) -> List[str]:
+    """Canonicalize a list of skills, dropping blanks and duplicates (order kept)."""
+    aliases = load_alias_map()
+    seen, result = set(), []
+    for skill in skills:
+        if not skill:
+            continue
+        normalized = normalize_skill(skill)
+        canonical = aliases.get(normalized, normalized)
+        if canonical and canonical not in seen:
+            seen.add(canonical)
+            result.append(canonical)
+    return result
+
+
+def add_alias(alias: str, canonical: str):
+    """
+    Register (or repoint) an alias and recompile the lookup. The taxonomy
+    version is bumped with it, so taxonomy snapshots built on the old mapping
+    are rebuilt.
+    """
+    global _seen_version
+    from career_skills_db import transaction, bump_taxonomy_version
+
+    with transaction() as c:
+        c.execute(
+            "INSERT OR REPLACE INTO skill_aliases (alias, canonical) VALUES (?, ?)",
+            (normalize_skill(alias), normalize_skill(canonical))
+        )
+        bump_taxonomy_version(c)
+    _seen_version = None
+    load_alias_map(reload=True)
+
+
+def recanonicalize_existing_rows() -> Dict[str, int]:
+    """
+    One-off job: merge skills already stored in career_skills.db into their
+    canonical names, dropping the career links that become duplicates.
+    """
+    from career_skills_db import transaction, bump_taxonomy_version
+
+    aliases = load_alias_map(reload=True)
+    stats = {"skills_merged": 0, "links_moved": 0, "duplicate_links_removed": 0}
+    with transaction() as c:
+        for skill_id, name in c.execute("SELECT id, name FROM skills").fetchall():
+            normalized = normalize_skill(name)
+            canonical = aliases.get(normalized, normalized)
+            if canonical == name:
+                continue
+            c.execute("INSERT OR IGNORE INTO skills (name) VALUES (?)", (canonical,))
+            canonical_id = c.execute("SELECT id FROM skills WHERE name = ?", (canonical,)).fetchone()[0]
+            c.execute("UPDATE OR IGNORE career_skill SET skill_id = ? WHERE skill_id = ?", (canonical_id, skill_id))
+            stats["links_moved"] += c.rowcount
+            # Links left behind already exist under the canonical skill
+            c.execute("DELETE FROM career_skill WHERE skill_id = ?", (skill_id,))
+            stats["duplicate_links_removed"] += c.rowcount
+            c.execute("DELETE FROM skills WHERE id = ?", (skill_id,))
+            stats["skills_merged"] += 1
+        bump_taxonomy_version(c)
+    return stats
+
+
+if __name__ == "__main__":
+    result = recanonicalize_existing_rows()
+    print(f"Re-canonicalized career_skills.db: {result}")
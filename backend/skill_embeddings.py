@@ -0,0 +1,193 @@
+"""
+Semantic skill index.
+
+Fuzzy string matching cannot tell that "ML" means "machine learning" or that
+"google cloud platform" is "gcp". Every distinct skill in career_skills.db is
+embedded once with the same MiniLM model the job index uses and stored in its
+own FAISS index; the `skill_embedding_ids` table maps FAISS ids back to skill
+names. The index is updated incrementally: only skills that are new since the
+last build are embedded, and removed skills are dropped by id.
+
+    python skill_embeddings.py            # build / update the index
+    python skill_embeddings.py ml gcp     # query it
+"""
+import os
+import logging
+import threading
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+from skill_aliases import canonicalize_skill, normalize_skill
+from career_skills_db import get_connection, transaction
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SKILL_INDEX_PATH = os.path.join(BASE_DIR, "skill_index.faiss")
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# Cosine similarity below which a free-text skill is not mapped onto the taxonomy
+MIN_SIMILARITY = 0.75
+
+_model = None
+_index = None
+_index_mtime = None
+_id_to_skill = {}
+_lock = threading.Lock()
+
+
+def _get_model():
+    global _model
+    if _model is None:
+        from sentence_transformers import SentenceTransformer
+        _model = SentenceTransformer(EMBEDDING_MODEL)
+    return _model
+
+
+def _encode(texts: List[str]) -> np.ndarray:
+    embeddings = _get_model().encode(
+        texts, batch_size=256, convert_to_numpy=True, normalize_embeddings=True
+    )
+    return np.asarray(embeddings, dtype="float32")
+
+
+def _init_id_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS skill_embedding_ids (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            skill TEXT NOT NULL UNIQUE
+        )
+    """)
+
+
+def _taxonomy_skills(conn) -> set:
+    """Distinct skills linked to at least one career."""
+    rows = conn.execute("SELECT name FROM skills WHERE id IN (SELECT skill_id FROM career_skill)")
+    return {normalize_skill(name) for (name,) in rows} - {""}
+
+
+def _load_index():
+    import faiss
+
+    if not os.path.exists(SKILL_INDEX_PATH):
+        return faiss.IndexIDMap(faiss.IndexFlatIP(_get_model().get_sentence_embedding_dimension()))
+    return faiss.read_index(SKILL_INDEX_PATH)
+
+
+def update_skill_index() -> dict:
+    """
+    Bring the skill index in line with career_skills.db: embed skills added
+    since the last run, remove ids of skills that no longer exist.
+    Called after the O*NET sync and the Naukri updater write new skills.
+    """
+    global _index, _index_mtime, _id_to_skill
+    with _lock, transaction() as c:
+        _init_id_table(c)
+        current = _taxonomy_skills(c)
+        known = dict(c.execute("SELECT skill, id FROM skill_embedding_ids"))
+        index = _load_index()
+        if index.ntotal != len(known):
+            # Index file lost or out of sync with the id table: start over
+            logger.warning("Skill index does not match its id table; rebuilding from scratch")
+            c.execute("DELETE FROM skill_embedding_ids")
+            known = {}
+            index.reset()
+
+        added = sorted(current - known.keys())
+        removed = [known[s] for s in known.keys() - current]
+        if removed:
+            index.remove_ids(np.asarray(removed, dtype="int64"))
+            c.executemany("DELETE FROM skill_embedding_ids WHERE id = ?", [(i,) for i in removed])
+        if added:
+            c.executemany("INSERT INTO skill_embedding_ids (skill) VALUES (?)", [(s,) for s in added])
+            ids = dict(c.execute("SELECT skill, id FROM skill_embedding_ids"))
+            index.add_with_ids(_encode(added), np.asarray([ids[s] for s in added], dtype="int64"))
+
+        if added or removed or not os.path.exists(SKILL_INDEX_PATH):
+            import faiss
+            faiss.write_index(index, SKILL_INDEX_PATH)
+        _id_to_skill = {i: s for s, i in c.execute("SELECT skill, id FROM skill_embedding_ids")}
+        _index, _index_mtime = index, os.path.getmtime(SKILL_INDEX_PATH)
+
+    logger.info(f"Skill index updated: +{len(added)} -{len(removed)} ({index.ntotal} skills)")
+    return {"added": len(added), "removed": len(removed), "total": index.ntotal}
+
+
+def _ensure_loaded() -> bool:
+    """
+    Load the index from disk on first use, and again whenever another process
+    (the O*NET sync, the Naukri updater) has rewritten it. False if it has not been built.
+    """
+    global _index, _index_mtime, _id_to_skill
+    try:
+        mtime = os.path.getmtime(SKILL_INDEX_PATH)
+    except OSError:
+        return _index is not None
+    if _index is not None and mtime == _index_mtime:
+        return True
+    with _lock:
+        if _index is None or mtime != _index_mtime:
+            import faiss
+            index = faiss.read_index(SKILL_INDEX_PATH)
+            conn = get_connection()
+            _init_id_table(conn)
+            id_to_skill = {i: s for s, i in conn.execute("SELECT skill, id FROM skill_embedding_ids")}
+            _index, _index_mtime, _id_to_skill = index, mtime, id_to_skill
+    return True
+
+
+def nearest_skills(queries: List[str], k: int = 5,
+                   min_score: float = 0.0) -> List[List[Tuple[str, float]]]:
+    """
+    Batched nearest-neighbour lookup: one [(skill, cosine), ...] list per query,
+    best first. All queries are embedded in one model call and searched in one
+    FAISS call. Returns empty lists if the index has not been built.
+    """
+    if not queries or not _ensure_loaded() or _index.ntotal == 0:
+        return [[] for _ in queries]
+    scores, ids = _index.search(_encode([normalize_skill(q) for q in queries]), k)
+    results = []
+    for row_scores, row_ids in zip(scores, ids):
+        results.append([
+            (_id_to_skill[i], float(s))
+            for s, i in zip(row_scores, row_ids)
+            if i != -1 and s >= min_score and i in _id_to_skill
+        ])
+    return results
+
+
+def map_to_taxonomy(phrases: Iterable[str], min_score: float = MIN_SIMILARITY) -> List[str]:
+    """
+    Map free-text skill phrases onto taxonomy skills. Phrases whose canonical
+    form is already a taxonomy skill are kept as-is; the rest go through one
+    batched semantic lookup and are kept only if a close enough skill exists.
+    """
+    canonical = [canonicalize_skill(p) for p in phrases if p and p.strip()]
+    if not canonical or not _ensure_loaded():
+        return []
+    known = set(_id_to_skill.values())
+    mapped = [c for c in canonical if c in known]
+    unknown = [c for c in canonical if c not in known]
+    for matches in nearest_skills(unknown, k=1, min_score=min_score):
+        if matches:
+            mapped.append(matches[0][0])
+    return list(dict.fromkeys(mapped))
+
+
+def refresh_skill_index_safely():
+    """update_skill_index() for background jobs: never lets a failure abort the caller."""
+    try:
+        stats = update_skill_index()
+        print(f"Skill embedding index updated: {stats}")
+    except Exception as e:
+        print(f"Skill embedding index not updated: {e}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        for query, matches in zip(sys.argv[1:], nearest_skills(sys.argv[1:], k=5)):
+            print(f"{query}: " + ", ".join(f"{s} ({score:.2f})" for s, score in matches))
+    else:
+        print(update_skill_index())
@@ -1,40 +1,259 @@
 # skills_taxonomy.py
-from fuzzywuzzy import process
+import time
+import sqlite3
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+import numpy as np
+from scipy import sparse
+from rapidfuzz import fuzz, process, utils
 from db import get_career_skills
+import career_skills_db
+from career_skills_db import get_taxonomy_version, snapshot_version
 
-# Cache to avoid reloading skills from DB repeatedly
-skills_cache = []
+# How many trigram-overlap candidates get an exact fuzzy score per query
+SHORTLIST_SIZE = 50
+# Minimum seconds between checks of the on-disk taxonomy version
+VERSION_CHECK_INTERVAL = 2.0
 
-def refresh_skills_cache():
+
+def _trigrams(text):
+    """Character trigrams of a string, padded so short skills ("r", "go") still get some."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SkillIndex:
     """
-    Refreshes the cached skills list from the database dynamically.
-    Called by onet_sync during startup or scheduled syncs.
+    Character-trigram postings over the skill vocabulary.
+    Each query is narrowed to the skills sharing the most trigrams with it
+    (by Dice coefficient) and only that shortlist is scored with fuzz.ratio,
+    every (query, candidate) pair of a batch in one rapidfuzz call.
     """
-    global skills_cache
+
+    def __init__(self, skills, shortlist_size=SHORTLIST_SIZE):
+        self.skills = list(skills)
+        self.shortlist_size = shortlist_size
+        # Same normalization as fuzzywuzzy's full_process, so scores match process.extract
+        self.processed = [utils.default_process(s) for s in self.skills]
+
+        self.gram_ids = {}
+        postings = defaultdict(list)
+        rows, cols = [], []
+        self.gram_counts = np.zeros(len(self.skills), dtype=np.float32)
+        for skill_id, text in enumerate(self.processed):
+            grams = _trigrams(text)
+            self.gram_counts[skill_id] = len(grams)
+            for gram in grams:
+                gram_id = self.gram_ids.setdefault(gram, len(self.gram_ids))
+                postings[gram_id].append(skill_id)
+                rows.append(skill_id)
+                cols.append(gram_id)
+        self.postings = {g: np.asarray(ids, dtype=np.int32) for g, ids in postings.items()}
+        # skills x trigrams incidence matrix for batch queries
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(self.skills), max(len(self.gram_ids), 1))
+        )
+
+    def _query_gram_ids(self, processed_query):
+        return [self.gram_ids[g] for g in _trigrams(processed_query) if g in self.gram_ids]
+
+    def _top_candidates(self, candidate_ids, overlaps, query_gram_count):
+        """Best `shortlist_size` candidates by Dice coefficient of trigram sets."""
+        dice = 2 * overlaps / (query_gram_count + self.gram_counts[candidate_ids])
+        if len(candidate_ids) > self.shortlist_size:
+            keep = np.argpartition(-dice, self.shortlist_size)[:self.shortlist_size]
+            candidate_ids = candidate_ids[keep]
+        return candidate_ids
+
+    def _score(self, processed_queries, candidate_lists, limit, score_cutoff):
+        """Best `limit` candidates of each query, by fuzz.ratio rounded as fuzzywuzzy does."""
+        sizes = [len(ids) for ids in candidate_lists]
+        if not sum(sizes):
+            return [[] for _ in processed_queries]
+        skill_ids = np.concatenate(candidate_lists)
+        scores = np.rint(process.cpdist(
+            [q for q, size in zip(processed_queries, sizes) for _ in range(size)],
+            [self.processed[skill_id] for skill_id in skill_ids],
+            scorer=fuzz.ratio, processor=None
+        )).astype(np.int32)
+
+        results, start = [], 0
+        for size in sizes:
+            ids, row = skill_ids[start:start + size], scores[start:start + size]
+            start += size
+            keep = np.flatnonzero(row >= score_cutoff)
+            keep = keep[np.argsort(-row[keep], kind="stable")[:limit]]
+            results.append([(self.skills[ids[i]], int(row[i])) for i in keep])
+        return results
+
+    def search(self, query, limit=5, score_cutoff=70):
+        processed_query = utils.default_process(query)
+        gram_ids = self._query_gram_ids(processed_query)
+        if not gram_ids:
+            return []
+        hits = np.concatenate([self.postings[g] for g in gram_ids])
+        candidate_ids, overlaps = np.unique(hits, return_counts=True)
+        candidate_ids = self._top_candidates(candidate_ids, overlaps, len(_trigrams(processed_query)))
+        return self._score([processed_query], [candidate_ids], limit, score_cutoff)[0]
+
+    def search_batch(self, queries, limit=5, score_cutoff=70):
+        """Score many queries at once: one sparse product yields every trigram overlap."""
+        processed_queries = [utils.default_process(q) for q in queries]
+        rows, cols = [], []
+        for row, processed_query in enumerate(processed_queries):
+            for gram_id in self._query_gram_ids(processed_query):
+                rows.append(row)
+                cols.append(gram_id)
+        query_matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(queries), self.matrix.shape[1])
+        )
+        overlaps = (query_matrix @ self.matrix.T).tocsr()
+
+        candidate_lists = []
+        for row, processed_query in enumerate(processed_queries):
+            start, end = overlaps.indptr[row], overlaps.indptr[row + 1]
+            candidate_lists.append(self._top_candidates(
+                overlaps.indices[start:end], overlaps.data[start:end], len(_trigrams(processed_query))
+            ))
+        return self._score(processed_queries, candidate_lists, limit, score_cutoff)
+
+
+@dataclass(frozen=True)
+class SkillsSnapshot:
+    """
+    Immutable view of the skill taxonomy. Readers grab the current snapshot
+    once and use it throughout; refreshes build a new one and swap the module
+    reference, so nobody ever sees a half-built state.
+    """
+    version: int
+    skills: tuple
+    index: SkillIndex
+
+
+class _VersionWatcher:
+    """
+    Cheap cross-process change detection for career_skills.db.
+    PRAGMA data_version on a long-lived connection only changes when another
+    connection commits; only then is the taxonomy_version row read.
+    Without a db_path it follows career_skills_db.DB_NAME as it is when
+    checking, not as it was at import.
+    """
+
+    def __init__(self, db_path=None, interval=VERSION_CHECK_INTERVAL):
+        self.db_path = db_path
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_path = None
+        self._data_version = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def current_version(self, force=False):
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._version is not None and now - self._checked_at < self.interval:
+                return self._version
+            self._checked_at = now
+            db_path = self.db_path or career_skills_db.DB_NAME
+            if self._conn is None or db_path != self._conn_path:
+                if self._conn is not None:
+                    self._conn.close()
+                self._conn = sqlite3.connect(db_path, check_same_thread=False)
+                self._conn_path = db_path
+                self._data_version = None
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if force or data_version != self._data_version or self._version is None:
+                self._data_version = data_version
+                self._version = get_taxonomy_version(self._conn)
+            return self._version
+
+
+_snapshot = None
+_build_lock = threading.Lock()
+_watcher = _VersionWatcher()
+
+
+def _build_snapshot(version):
     career_skills_data = get_career_skills()
     # Flatten and deduplicate all skills
-    skills_cache = sorted(
+    skills = tuple(sorted(
         set(skill.strip().lower() for _, skills in career_skills_data for skill in skills if skill),
         key=lambda x: x.lower()
-    )
-    return skills_cache
+    ))
+    return SkillsSnapshot(version=version, skills=skills, index=SkillIndex(skills))
+
+
+def current_taxonomy_version(force=False):
+    """
+    Taxonomy version as last seen on disk (checked at most every VERSION_CHECK_INTERVAL),
+    or in serving mode the version of the in-memory copy being read.
+    Other in-memory structures derived from career_skills.db key their rebuilds on it.
+    """
+    version = snapshot_version()
+    return version if version is not None else _watcher.current_version(force)
+
+
+def get_skills_snapshot():
+    """
+    Returns the current taxonomy snapshot, reloading it only if another
+    writer (in any process) bumped the taxonomy version since it was built.
+    """
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == current_taxonomy_version():
+        return snapshot
+    with _build_lock:
+        version = current_taxonomy_version()
+        if _snapshot is None or _snapshot.version != version:
+            # Read the version before the data: a write racing with the load
+            # leaves us one version behind and triggers another reload.
+            _snapshot = _build_snapshot(version)
+        return _snapshot
+
+
+def refresh_skills_cache():
+    """
+    Rebuilds the skills snapshot from the database unconditionally.
+    Called by onet_sync during startup or scheduled syncs.
+    """
+    global _snapshot
+    with _build_lock:
+        _snapshot = _build_snapshot(current_taxonomy_version(force=True))
+        return _snapshot.skills
 
 def get_dynamic_skills_list():
     """
-    Returns a dynamic list of all unique skills from cache (or DB if cache empty).
+    Returns all unique skills from the current snapshot (a tuple; do not mutate).
+    """
+    return get_skills_snapshot().skills
+
+def get_skill_index():
+    """
+    Returns the trigram index of the current snapshot.
     """
-    global skills_cache
-    if not skills_cache:
-        refresh_skills_cache()
-    return skills_cache
+    return get_skills_snapshot().index
 
 def find_similar_skills(query, limit=5, score_cutoff=70):
     """
     Finds skills similar to the query using fuzzy matching against the dynamic skill list.
     Returns a list of (skill, score) tuples.
     """
-    skills = get_dynamic_skills_list()
-    if not query or not skills:
+    if not query:
+        return []
+    index = get_skill_index()
+    if not index.skills:
         return []
-    results = process.extract(query.lower(), skills, limit=limit, scorer=process.fuzz.ratio)
-    return [(skill, score) for skill, score in results if score >= score_cutoff]
+    return index.search(query.lower(), limit=limit, score_cutoff=score_cutoff)
+
+def find_similar_skills_batch(queries, limit=5, score_cutoff=70):
+    """
+    Batch version of find_similar_skills: one result list per query, in order.
+    """
+    index = get_skill_index()
+    if not queries or not index.skills:
+        return [[] for _ in queries]
+    return index.search_batch([q.lower() if q else "" for q in queries], limit=limit, score_cutoff=score_cutoff)
@@ -0,0 +1,260 @@
+"""
+Streaming snapshot export/import for the two SQLite stores.
+
+- "career_skills": every career/skill link in career_skills.db, one record per
+  link: {"career", "skill", "importance", "source"}.
+- "jobs": the jobs table of career_guidance.db, one record per job with its
+  skill names inlined as a list: {..., "skills": [...]}.
+- "training" (export only): ML training records, the jobs that have skills
+  with the fields MassJobScraper.prepare_ml_training_data uses.
+
+Files are NDJSON (.ndjson / .jsonl) or Parquet (.parquet, needs pyarrow);
+exports can also be written as one JSON array (.json), the format of the
+original ml_training_data.json. Rows move in chunks of CHUNK_SIZE in both
+directions, so memory stays bounded by the chunk size rather than the table size.
+
+    python snapshots.py export career_skills career_skills.parquet
+    python snapshots.py import jobs jobs.ndjson
+    python snapshots.py export training ml_training_data.parquet
+"""
+import os
+import sys
+import json
+import sqlite3
+import logging
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 5000
+DATASETS = ("career_skills", "jobs", "training")
+
+CAREER_SKILL_FIELDS = ("career", "skill", "importance", "source")
+
+
+# ---------- File formats ----------
+def _format_for(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".ndjson", ".jsonl"):
+        return "ndjson"
+    if ext == ".parquet":
+        return "parquet"
+    if ext == ".json":
+        return "json"
+    raise ValueError(f"Unsupported snapshot format '{ext}' (use .ndjson, .jsonl, .json or .parquet)")
+
+
+def _chunks(records: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _write_records(path: str, records: Iterable[Dict], schema=None, chunk_size: int = CHUNK_SIZE) -> int:
+    """Write records chunk by chunk. `schema` is a pyarrow schema (Parquet only)."""
+    count = 0
+    if _format_for(path) == "ndjson":
+        with open(path, "w", encoding="utf-8") as f:
+            for chunk in _chunks(records, chunk_size):
+                f.writelines(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in chunk)
+                count += len(chunk)
+        return count
+    if _format_for(path) == "json":
+        # One array, written element by element
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("[")
+            for chunk in _chunks(records, chunk_size):
+                f.writelines(("\n" if count + i == 0 else ",\n")
+                             + json.dumps(r, indent=2, ensure_ascii=False, default=str)
+                             for i, r in enumerate(chunk))
+                count += len(chunk)
+            f.write("\n]\n" if count else "]\n")
+        return count
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in _chunks(records, chunk_size):
+            # Each chunk becomes one row group
+            writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+            count += len(chunk)
+    return count
+
+
+def _read_records(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict]:
+    if _format_for(path) == "json":
+        raise ValueError("JSON array snapshots are export only; import .ndjson, .jsonl or .parquet")
+    if _format_for(path) == "ndjson":
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        yield from batch.to_pylist()
+
+
+# ---------- career_skills.db ----------
+def _career_skill_schema():
+    import pyarrow as pa
+    return pa.schema([
+        ("career", pa.string()), ("skill", pa.string()),
+        ("importance", pa.float64()), ("source", pa.string()),
+    ])
+
+
+def export_career_skills(path: str, chunk_size: int = CHUNK_SIZE) -> int:
+    from career_skills_db import iter_career_skill_links
+
+    records = (dict(zip(CAREER_SKILL_FIELDS, row)) for row in iter_career_skill_links(chunk_size))
+    schema = _career_skill_schema() if _format_for(path) == "parquet" else None
+    return _write_records(path, records, schema, chunk_size)
+
+
+def import_career_skills(path: str, chunk_size: int = CHUNK_SIZE) -> int:
+    from career_skills_db import add_career_skill_links_bulk
+
+    links = (
+        (r["career"], r["skill"], r.get("importance"), r.get("source") or "import")
+        for r in _read_records(path, chunk_size)
+    )
+    return add_career_skill_links_bulk(links, batch_size=chunk_size)
+
+
+# ---------- career_guidance.db jobs ----------
+_SQLITE_TO_ARROW = {"INTEGER": "int64", "BOOLEAN": "bool_", "FLOAT": "float64", "REAL": "float64"}
+
+
+def _job_columns(conn: sqlite3.Connection) -> List[tuple]:
+    """(name, declared type) of the jobs table, as created by database.py."""
+    return [(row[1], row[2].split("(")[0].upper()) for row in conn.execute("PRAGMA table_info(jobs)")]
+
+
+def _jobs_schema(columns):
+    import pyarrow as pa
+    fields = [(name, getattr(pa, _SQLITE_TO_ARROW.get(decl, "string"))()) for name, decl in columns]
+    return pa.schema(fields + [("skills", pa.list_(pa.string()))])
+
+
+def _iter_jobs(conn: sqlite3.Connection, columns, chunk_size: int) -> Iterator[Dict]:
+    """Jobs in id order; the skills of each fetched chunk are loaded with one query."""
+    names = [name for name, _ in columns]
+    booleans = {name for name, decl in columns if decl == "BOOLEAN"}
+    cursor = conn.execute(f"SELECT {', '.join(names)} FROM jobs ORDER BY id")
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        jobs = [dict(zip(names, row)) for row in rows]
+        ids = [job["id"] for job in jobs]
+        skills = {job_id: [] for job_id in ids}
+        placeholders = ",".join("?" * len(ids))
+        for job_id, name in conn.execute(
+            f"SELECT js.job_id, s.name FROM job_skills js JOIN skills s ON s.id = js.skill_id "
+            f"WHERE js.job_id IN ({placeholders}) ORDER BY js.job_id, s.name", ids
+        ):
+            skills[job_id].append(name)
+        for job in jobs:
+            for name in booleans:
+                if job[name] is not None:
+                    job[name] = bool(job[name])
+            job["skills"] = skills[job["id"]]
+            yield job
+
+
+def export_jobs(path: str, db_path: str = None, chunk_size: int = CHUNK_SIZE) -> int:
+    from database import DB_PATH
+
+    conn = sqlite3.connect(db_path or DB_PATH)
+    try:
+        columns = _job_columns(conn)
+        schema = _jobs_schema(columns) if _format_for(path) == "parquet" else None
+        # Job chunks are smaller: each carries its description text
+        return _write_records(path, _iter_jobs(conn, columns, max(chunk_size // 5, 1)), schema, chunk_size)
+    finally:
+        conn.close()
+
+
+def _snapshot_job(record: Dict) -> Dict:
+    """A snapshot record as an add_jobs_bulk job: no id, parsed timestamps, skills_required."""
+    job = {k: v for k, v in record.items() if k not in ("id", "skills")}
+    for name in ("created_at", "updated_at"):
+        if isinstance(job.get(name), str):
+            job[name] = datetime.fromisoformat(job[name])
+    job["skills_required"] = record.get("skills") or []
+    return job
+
+
+def import_jobs(path: str, db_path: str = None, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Append jobs from a snapshot through DatabaseManager.add_jobs_bulk. Ids are
+    reassigned by the target database; jobs already present (same title,
+    company and source) are skipped and near-duplicates are merged into the
+    job they duplicate, as for scraped jobs. Returns the number of jobs inserted.
+    """
+    from database import DatabaseManager, db_manager
+
+    manager = DatabaseManager(f"sqlite:///{db_path}") if db_path else db_manager
+    jobs = (_snapshot_job(record) for record in _read_records(path, chunk_size))
+    # Job chunks are smaller: each carries its description text
+    stats = manager.add_jobs_bulk(jobs, chunk_size=max(chunk_size // 5, 1))
+    return stats["stored_count"]
+
+
+# ---------- ML training data ----------
+def _training_schema():
+    import pyarrow as pa
+    fields = [("job_id", pa.int64())]
+    fields += [(name, pa.string()) for name in ("title", "company", "location", "description", "source",
+                                                "job_type", "experience_level", "salary", "application_url")]
+    return pa.schema(fields + [("skills", pa.list_(pa.string()))])
+
+
+def export_training_data(path: str, records: Iterable[Dict] = None, chunk_size: int = CHUNK_SIZE) -> int:
+    """Write ML training records (default: db_manager.iter_training_records()) to `path`."""
+    if records is None:
+        from database import db_manager
+        records = db_manager.iter_training_records()
+    schema = _training_schema() if _format_for(path) == "parquet" else None
+    # Records carry description text: smaller chunks, as for jobs
+    return _write_records(path, records, schema, max(chunk_size // 5, 1))
+
+
+def export_snapshot(dataset: str, path: str, chunk_size: int = CHUNK_SIZE) -> int:
+    """Export `dataset` ("career_skills" or "jobs") to `path`. Returns the record count."""
+    if dataset == "career_skills":
+        return export_career_skills(path, chunk_size)
+    if dataset == "jobs":
+        return export_jobs(path, chunk_size=chunk_size)
+    if dataset == "training":
+        return export_training_data(path, chunk_size=chunk_size)
+    raise ValueError(f"dataset must be one of {DATASETS}")
+
+
+def import_snapshot(dataset: str, path: str, chunk_size: int = CHUNK_SIZE) -> int:
+    """Import a snapshot written by export_snapshot. Returns the record count."""
+    if dataset == "career_skills":
+        return import_career_skills(path, chunk_size)
+    if dataset == "jobs":
+        return import_jobs(path, chunk_size=chunk_size)
+    if dataset == "training":
+        raise ValueError("training data is export only")
+    raise ValueError(f"dataset must be one of {DATASETS}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ("export", "import") or sys.argv[2] not in DATASETS:
+        print(f"Usage: python snapshots.py export|import {'|'.join(DATASETS)} <file.ndjson|file.parquet>")
+        sys.exit(1)
+    action, dataset, path = sys.argv[1:]
+    count = (export_snapshot if action == "export" else import_snapshot)(dataset, path)
+    print(f"{action.capitalize()}ed {count} {dataset} records {'to' if action == 'export' else 'from'} {path}")
@@ -0,0 +1,165 @@
+"""
+Raw text extraction for PDF, DOCX and DOC resumes.
+
+Kept free of NLP imports so extraction workers (see extraction_worker.py)
+start quickly and stay small.
+"""
+import re
+import logging
+import zipfile
+import subprocess
+import xml.etree.ElementTree as ET
+
+import pdfplumber
+
+logger = logging.getLogger(__name__)
+
+ANTIWORD_TIMEOUT = 20  # seconds
+
+
+def extract_text_from_pdf(file_path):
+    text = ""
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages:
+            content = page.extract_text()
+            if content:
+                text += content + "\n"
+    return text
+
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_DOCX_CONTAINERS = {_W + "body", _W + "hdr", _W + "ftr"}
+
+
+def _iter_docx_part_lines(stream):
+    """
+    Stream one WordprocessingML part and yield its text line by line in reading
+    order. Paragraphs become lines, table rows become tab-separated lines, and
+    text boxes are read once (their VML fallback copies are skipped). Completed
+    blocks are cleared from the tree so memory stays flat on large documents.
+    """
+    paragraphs = []  # run-text buffers of open paragraphs (text boxes nest them)
+    cells = []       # line buffers of open table cells
+    rows = []        # cell-text buffers of open table rows
+    pending = []     # finished lines not yet yielded
+    fallback_depth = 0
+    container = None
+
+    def emit(line):
+        if cells:
+            cells[-1].append(line)
+        else:
+            pending.append(line)
+
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag == _MC_FALLBACK:
+                fallback_depth += 1
+            elif fallback_depth:
+                continue
+            elif tag == _W + "p":
+                paragraphs.append([])
+            elif tag == _W + "tc":
+                cells.append([])
+            elif tag == _W + "tr":
+                rows.append([])
+            elif tag in _DOCX_CONTAINERS:
+                container = elem
+            continue
+
+        if tag == _MC_FALLBACK:
+            fallback_depth -= 1
+            continue
+        if fallback_depth:
+            continue
+
+        if tag == _W + "t":
+            if paragraphs:
+                paragraphs[-1].append(elem.text or "")
+        elif tag == _W + "tab":
+            if paragraphs:
+                paragraphs[-1].append("\t")
+        elif tag in (_W + "br", _W + "cr"):
+            if paragraphs:
+                paragraphs[-1].append("\n")
+        elif tag == _W + "p":
+            emit("".join(paragraphs.pop()))
+        elif tag == _W + "tc":
+            cell_lines = cells.pop()
+            rows[-1].append(" ".join(l.strip() for l in cell_lines if l.strip()))
+        elif tag == _W + "tr":
+            emit("\t".join(c for c in rows.pop() if c))
+
+        # Drop finished top-level blocks from the partially built tree
+        if container is not None and not paragraphs and not rows and tag in (_W + "p", _W + "tbl"):
+            container.clear()
+        if pending:
+            yield from pending
+            pending.clear()
+
+
+def _numbered_parts(names, kind):
+    """word/<kind>N.xml parts in numeric order (header2.xml before header10.xml)."""
+    parts = []
+    for name in names:
+        m = re.fullmatch(rf"word/{kind}(\d*)\.xml", name)
+        if m:
+            parts.append((int(m.group(1) or 0), name))
+    return [name for _, name in sorted(parts)]
+
+
+def extract_text_from_docx(file_path):
+    """
+    Extract DOCX text straight from the zip without loading the whole package:
+    headers first, then the body (paragraphs, tables, text boxes), then footers.
+    Media parts are never read.
+    """
+    lines = []
+    with zipfile.ZipFile(file_path) as zf:
+        names = zf.namelist()
+        headers = _numbered_parts(names, "header")
+        footers = _numbered_parts(names, "footer")
+
+        seen_parts = set()
+        for part in headers + ["word/document.xml"] + footers:
+            if part not in names:
+                continue
+            with zf.open(part) as stream:
+                part_lines = list(_iter_docx_part_lines(stream))
+            # Different-first-page / even-page headers often repeat the same text
+            if part != "word/document.xml":
+                key = "\n".join(part_lines).strip()
+                if not key or key in seen_parts:
+                    continue
+                seen_parts.add(key)
+            lines.extend(part_lines)
+    return "\n".join(lines)
+
+
+def extract_text_from_doc(file_path):
+    """Basic support for .doc files using antiword if installed"""
+    try:
+        result = subprocess.run(
+            ["antiword", file_path], capture_output=True, text=True, timeout=ANTIWORD_TIMEOUT
+        )
+        return result.stdout
+    except subprocess.TimeoutExpired:
+        logger.warning(f"antiword timed out after {ANTIWORD_TIMEOUT}s on {file_path}")
+        return ""
+    except Exception:
+        logger.warning("antiword not available. .doc extraction limited.")
+        return ""
+
+
+def extract_text(file_path):
+    """Dispatch to the extractor for the file's extension."""
+    lower = file_path.lower()
+    if lower.endswith(".pdf"):
+        return extract_text_from_pdf(file_path)
+    if lower.endswith(".docx"):
+        return extract_text_from_docx(file_path)
+    if lower.endswith(".doc"):
+        return extract_text_from_doc(file_path)
+    return ""
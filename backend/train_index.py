@@ -16,7 +16,8 @@ def detect_or_create_table():
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    # career_skills is a view over the normalized tables once career_skills_db has migrated
+    cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")
     tables = [t[0] for t in cursor.fetchall()]
     
     # Prefer career_skills, then job_training_data, else pick first table